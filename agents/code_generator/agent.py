@@ -1,8 +1,15 @@
 import os
-import yaml
 from pathlib import Path
 from typing import Dict
 
+from agents.common import lambda_profile
+from agents.common.emitter import ArtifactEmitter
+from agents.common.manifest import Manifest, file_hash, inputs_hash
+from agents.common.nfr import collect_constraints, latency_budgets, spec_md_for
+from agents.common.openapi import OpenApiDocument, infer_base_path, load_openapi
+from agents.code_generator import perf as perf_codegen
+from agents.code_generator import routes as routes_codegen
+
 
 LAMBDA_HANDLER_TEMPLATE = """\
 import json
@@ -30,6 +37,7 @@ service: {service_name}
 provider:
   name: aws
   runtime: python3.11
+  architecture: {architecture}
   region: {region}
   stage: dev
   iam:
@@ -44,24 +52,29 @@ provider:
           Resource: "*"
 
 functions:
-  health:
-    handler: handler.health
-    events:
-      - http:
-          path: {base_path}/health
-          method: get
-{dynamic_functions}
+{functions}
 plugins:
   - serverless-python-requirements
 
+custom:
+  pythonRequirements:
+    # Provided by the Lambda runtime or only needed for tests
+    noDeploy: [{no_deploy}]
+
 package:
   patterns:
     - '!node_modules/**'
     - '!__pycache__/**'
+    - '!tests/**'
+    - '!.pytest_cache/**'
 """
 
+# pytest and moto run the generated tests (test_perf_routes.py skips without moto); both are
+# dev-only, so the packager and serverless.yml's noDeploy leave them out of the bundle
 REQUIREMENTS_TXT = """\
 boto3
+pytest
+moto[dynamodb]
 """
 
 MAKEFILE = """\
@@ -96,94 +109,132 @@ class CodeGeneratorAgent:
     """
     Reads an OpenAPI file and scaffolds a minimal AWS Lambda API project.
     """
-    def __init__(self, openapi_path: str, service_dir: str = "services/customer-alerts", region: str = "us-east-1"):
+    def __init__(self, openapi_path: str, service_dir: str = "services/customer-alerts", region: str = "us-east-1",
+                 manifest: Manifest = None):
         self.openapi_path = Path(openapi_path)
         self.service_dir = Path(service_dir)
         self.region = region
+        self.manifest = manifest or Manifest()
 
     def run(self, input: Dict):
         """
         input may include overrides like:
         {
           "service_name": "customer-alerts",
-          "runtime": "lambda"
+          "runtime": "lambda",
+          "constraints": ["Latency P95 < 200ms for GET /alerts"],  # or via "ticket": {"constraints": [...]}
+          "performance_profile": {"architecture": "arm64", "functions": {"get_alerts": {"memory_size": 2048}}},
+          "force": False,   # regenerate even if nothing changed / overwrite hand edits
+          "dry_run": False, # don't write; return a unified diff of what would change
+          "bus": None       # an ArtifactBus: read the spec from it and put the files on it
         }
         """
-        if not self.openapi_path.exists():
+        input = dict(input)
+        bus = input.pop("bus", None)
+        if not (bus.exists(self.openapi_path) if bus is not None else self.openapi_path.exists()):
             raise FileNotFoundError(f"OpenAPI not found: {self.openapi_path}")
 
-        self.service_dir.mkdir(parents=True, exist_ok=True)
-        openapi = yaml.safe_load(self.openapi_path.read_text(encoding="utf-8"))
-        base_path = self._infer_base_path(openapi)
+        # Skip the whole stage if the spec, overrides and generator are unchanged
+        force = input.get("force", False)
+        dry_run = input.get("dry_run", False)
+        stage = f"code_generator:{self.service_dir.as_posix()}"
+        input_hash = inputs_hash(self.openapi_path, spec_md_for(self.openapi_path), input, self.region,
+                                 Path(__file__), Path(routes_codegen.__file__), Path(perf_codegen.__file__),
+                                 Path(lambda_profile.__file__),
+                                 hasher=bus.file_hash if bus is not None else file_hash)
+        if not force and self.manifest.is_fresh(stage, input_hash):
+            print(f"[CodeGenerator] {self.service_dir} up to date. Skipping.")
+            return dict(self.manifest.entry(stage)["result"], skipped=True)
+        hand_edited = [] if force else self.manifest.hand_edited(stage)
+
+        openapi = bus.openapi(self.openapi_path) if bus is not None else load_openapi(self.openapi_path)
+        base_path = self._infer_base_path(openapi.data)
         service_name = input.get("service_name", "customer-alerts")
+        constraints = collect_constraints(input, self.openapi_path, bus)
+        profile = lambda_profile.build_profile(openapi, constraints, input.get("performance_profile"))
+        files = {}
 
-        # 1) Create handler
-        (self.service_dir / "handler.py").write_text(LAMBDA_HANDLER_TEMPLATE, encoding="utf-8")
+        # 1) Create handler (stub only; never replaces an implemented handler.py)
+        files["handler.py"] = LAMBDA_HANDLER_TEMPLATE
 
-        # 2) Map OpenAPI paths -> lambda routes (basic GET/POST scaffolding)
-        dynamic_functions = self._generate_routes(openapi, base_path)
+        # 2) Map OpenAPI paths -> lambda routes; routes.py validates requests and delegates to handler.py
+        functions = self._generate_routes(openapi, profile)
+        names = lambda_profile.function_names(openapi)
+        function_name = lambda route, method: names[(method.upper(), route)]
+        files["routes.py"] = routes_codegen.render_routes_module(openapi, self.openapi_path.name, function_name)
 
         # 3) serverless.yml for quick deploy
-        serverless_yaml = SERVERLESS_YAML_TEMPLATE.format(
+        files["serverless.yml"] = SERVERLESS_YAML_TEMPLATE.format(
             service_name=service_name,
             region=self.region,
-            base_path=base_path,
-            dynamic_functions=dynamic_functions
+            architecture=profile["architecture"],
+            functions=functions,
+            no_deploy=", ".join(lambda_profile.RUNTIME_PROVIDED + lambda_profile.DEV_ONLY),
         )
-        (self.service_dir / "serverless.yml").write_text(serverless_yaml, encoding="utf-8")
 
         # 4) dependencies, tests, makefile
-        (self.service_dir / "requirements.txt").write_text(REQUIREMENTS_TXT, encoding="utf-8")
-        tests_dir = self.service_dir / "tests"
-        tests_dir.mkdir(exist_ok=True)
-        (tests_dir / "test_health.py").write_text(TEST_SAMPLE, encoding="utf-8")
-        (self.service_dir / "Makefile").write_text(MAKEFILE, encoding="utf-8")
-
-        # 5) Echo summary
-        return {
+        files["requirements.txt"] = REQUIREMENTS_TXT
+        files["tests/test_health.py"] = TEST_SAMPLE
+        files["Makefile"] = MAKEFILE
+
+        # 5) Per-route latency tests from the NFRs (ticket constraints, spec.md, x-latency-pNN)
+        budgets = latency_budgets(openapi, constraints, base_path)
+        perf_tests = perf_codegen.render_perf_tests(openapi, budgets, self.openapi_path.name,
+                                                    function_name, base_path)
+        if perf_tests:
+            files["tests/test_perf_routes.py"] = perf_tests
+
+        emitter = bus.emitter() if bus is not None and not dry_run else ArtifactEmitter(dry_run=dry_run)
+        for rel, content in files.items():
+            path = self.service_dir / rel
+            if str(path) in hand_edited:
+                print(f"[CodeGenerator] {path} was edited by hand. Keeping it (pass force=True to overwrite).")
+                emitter.keep(path)
+                continue
+            emitter.emit(path, content, create_only=(rel == "handler.py" and not force))
+
+        # 6) Echo summary
+        result = {
             "status": "ok",
             "service_dir": str(self.service_dir),
-            "routes": self._summarize_routes(openapi)
+            "routes": self._summarize_routes(openapi),
+            "latency_budgets": [f"{m} {r} p{p:g} <= {b['budget_ms']:g}ms" for (m, r, p), b in sorted(budgets.items())],
+            "performance_profile": profile
         }
+        if not dry_run:
+            record = lambda: self.manifest.record(stage, input_hash, [self.service_dir / rel for rel in files], result,
+                                                  hand_edited)
+            if bus is not None:
+                bus.on_flush(record)  # the manifest hashes the files as written
+            else:
+                record()
+        return dict(result, skipped=False, hand_edited=hand_edited, files=emitter.summary())
 
     def _infer_base_path(self, openapi: Dict) -> str:
-        # Try servers[0].url or default to /api
-        servers = openapi.get("servers") or []
-        if servers:
-            url = servers[0].get("url", "/api")
-            return url if url.startswith("/") else f"/{url}"
-        return "/api"
-
-    def _generate_routes(self, openapi: Dict, base_path: str) -> str:
+        return infer_base_path(openapi)
+
+    def _generate_routes(self, openapi: OpenApiDocument, profile: Dict) -> str:
         """
-        Returns YAML fragment for dynamic functions based on OpenAPI paths.
-        For demo purposes we route to a generic not_implemented handler and create stubs.
+        Returns YAML fragment for all functions (health + one per operation) based on OpenAPI paths,
+        with the per-function performance profile. Each operation gets its own generated entrypoint
+        in routes.py (see routes.render_routes_module).
         """
-        paths = openapi.get("paths", {})
         lines = []
-        for route, methods in paths.items():
-            if route == "/health":
-                # already added
-                continue
-            for method, meta in methods.items():
-                method = method.lower()
-                func_name = self._function_name(route, method)
-                lines.append(f"  {func_name}:")
-                lines.append(f"    handler: handler.not_implemented")
-                lines.append(f"    events:")
-                lines.append(f"      - http:")
-                lines.append(f"          path: {base_path}{route}")
-                lines.append(f"          method: {method}")
+        for fn in lambda_profile.lambda_functions(openapi):
+            settings = profile["functions"][fn["name"]]
+            lines.append(f"  {fn['name']}:")
+            lines.append(f"    handler: {fn['handler']}")
+            lines.append(f"    memorySize: {settings['memory_size']}")
+            lines.append(f"    timeout: {settings['timeout']}")
+            if settings.get("reserved_concurrency") is not None:
+                lines.append(f"    reservedConcurrency: {settings['reserved_concurrency']}")
+            if settings.get("provisioned_concurrency"):
+                lines.append(f"    provisionedConcurrency: {settings['provisioned_concurrency']}")
+            lines.append(f"    events:")
+            lines.append(f"      - http:")
+            lines.append(f"          path: {fn['path']}")
+            lines.append(f"          method: {fn['method'].lower()}")
         return "\n".join(lines) + ("\n" if lines else "")
 
-    def _function_name(self, route: str, method: str) -> str:
-        safe = route.strip("/").replace("/", "_").replace("{", "").replace("}", "")
-        safe = safe if safe else "root"
-        return f"{method}_{safe}"
-
-    def _summarize_routes(self, openapi: Dict):
-        summary = []
-        for route, methods in (openapi.get("paths") or {}).items():
-            for m in methods.keys():
-                summary.append(f"{m.upper()} {route}")
-        return summary
\ No newline at end of file
+    def _summarize_routes(self, openapi: OpenApiDocument):
+        return openapi.route_summary()
\ No newline at end of file
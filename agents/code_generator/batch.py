@@ -0,0 +1,105 @@
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agents.code_generator.agent import CodeGeneratorAgent
+
+SPEC_SUFFIX = "-openapi.yaml"
+
+
+def discover_specs(specs_dir: str = "docs/specs") -> List[Path]:
+    return sorted(Path(specs_dir).glob(f"*{SPEC_SUFFIX}"))
+
+
+def service_name_for(spec_path: Path, service_names: Optional[Dict[str, str]] = None) -> str:
+    """
+    <TICKET>-openapi.yaml -> service "<ticket>" (lower-case slug), unless mapped explicitly.
+    Derived from the file name only, so names are known before any spec is parsed (run_batch
+    rejects a batch where two specs map to the same name).
+    """
+    stem = spec_path.name[: -len(SPEC_SUFFIX)]
+    if service_names and stem in service_names:
+        return service_names[stem]
+    return re.sub(r"[^a-z0-9]+", "-", stem.lower()).strip("-")
+
+
+def _scaffold_one(job: Dict) -> Dict:
+    """
+    Worker entrypoint (module-level so it pickles). Never raises: failures come back as data.
+    """
+    start = time.perf_counter()
+    out = {"spec": job["spec"], "service_dir": job["service_dir"]}
+    try:
+        agent = CodeGeneratorAgent(job["spec"], service_dir=job["service_dir"], region=job["region"])
+        result = agent.run(dict(job["input"], service_name=job["service_name"]))
+        out.update(status="ok", skipped=result.get("skipped", False), routes=len(result.get("routes", [])))
+    except Exception as e:
+        out.update(status="failed", error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    out["elapsed_s"] = round(time.perf_counter() - start, 4)
+    return out
+
+
+def run_batch(specs_dir: str = "docs/specs", services_root: str = "services", region: str = "us-east-1",
+              service_names: Optional[Dict[str, str]] = None, max_workers: Optional[int] = None,
+              input: Optional[Dict] = None) -> Dict:
+    """
+    Scaffolds one service per *-openapi.yaml in specs_dir, in a process pool (codegen is CPU-bound:
+    YAML parsing and template rendering, so threads would serialise on the GIL).
+    A failing spec is reported in the summary and doesn't stop the others.
+    max_workers=1 runs inline, without a pool.
+    Raises ValueError, before scaffolding anything, when two specs map to one service
+    (TKT_1 and tkt-1 both slug to tkt-1): their workers would write the same directory.
+    """
+    start = time.perf_counter()
+    specs = discover_specs(specs_dir)
+    owners: Dict[str, List[str]] = {}
+    for spec in specs:
+        owners.setdefault(service_name_for(spec, service_names), []).append(spec.name)
+    clashes = [f"{name}: {', '.join(names)}" for name, names in owners.items() if len(names) > 1]
+    if clashes:
+        raise ValueError("Specs map to the same service (rename one or pass service_names):\n  "
+                         + "\n  ".join(clashes))
+
+    jobs = []
+    for spec in specs:
+        name = service_name_for(spec, service_names)
+        jobs.append({
+            "spec": str(spec),
+            "service_dir": str(Path(services_root) / name),
+            "service_name": name,
+            "region": region,
+            "input": input or {},
+        })
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1) or 1
+    results = []
+    if workers == 1:
+        results = [_scaffold_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_scaffold_one, job): job for job in jobs}
+            for fut in as_completed(futures):
+                job = futures[fut]
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    # Worker process died (e.g. BrokenProcessPool): still isolate to this spec
+                    results.append({"spec": job["spec"], "service_dir": job["service_dir"],
+                                    "status": "failed", "error": f"{type(e).__name__}: {e}"})
+    results.sort(key=lambda r: r["spec"])
+
+    failed = [r for r in results if r["status"] != "ok"]
+    return {
+        "status": "ok" if not failed else ("failed" if len(failed) == len(results) else "partial"),
+        "total": len(results),
+        "succeeded": len(results) - len(failed),
+        "skipped": sum(1 for r in results if r.get("skipped")),
+        "failed": len(failed),
+        "workers": workers,
+        "elapsed_s": round(time.perf_counter() - start, 4),
+        "services": results,
+    }
@@ -0,0 +1,164 @@
+import json
+import pprint
+from typing import Dict, Optional, Tuple
+
+from agents.common.openapi import OpenApiDocument
+
+PERF_TEST_TEMPLATE = """\
+# Generated by CodeGeneratorAgent from {spec_name}. Regenerated on every run; don't edit.
+# Latency budgets come from the spec/ticket NFRs and x-latency-pNN OpenAPI extensions.
+# Each route is driven with synthetic events against a local (moto) DynamoDB table.
+import copy
+import importlib
+import math
+import os
+import time
+
+import pytest
+
+moto = pytest.importorskip("moto")
+import boto3
+
+SAMPLES = int(os.getenv("PERF_SAMPLES", "100"))
+TABLE = "perf-local"
+
+CASES = {cases}
+
+
+@pytest.fixture(scope="module")
+def local_store():
+    env = {{"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+           "AWS_DEFAULT_REGION": "us-east-1", "TABLE_NAME": TABLE, "ALERTS_TABLE": TABLE}}
+    saved = {{k: os.environ.get(k) for k in env}}
+    os.environ.update(env)
+    try:
+        with moto.mock_aws():
+            table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+                TableName=TABLE,
+                KeySchema=[{{"AttributeName": "PK", "KeyType": "HASH"}},
+                           {{"AttributeName": "SK", "KeyType": "RANGE"}}],
+                AttributeDefinitions=[{{"AttributeName": "PK", "AttributeType": "S"}},
+                                      {{"AttributeName": "SK", "AttributeType": "S"}}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            yield table
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["id"] for c in CASES])
+def test_route_latency_budget(local_store, case):
+    fn = getattr(importlib.import_module(case["module"]), case["function"])
+    first = fn(copy.deepcopy(case["event"]), None)  # warm-up (imports, clients)
+    if first["statusCode"] == 501:
+        pytest.skip(f"{{case['id']}} is not implemented yet")
+
+    samples = []
+    for _ in range(SAMPLES):
+        event = copy.deepcopy(case["event"])
+        start = time.perf_counter()
+        fn(event, None)
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    observed = _percentile(samples, case["percentile"])
+    assert observed <= case["budget_ms"], (
+        f"{{case['id']}}: p{{case['percentile']}} = {{observed:.1f}}ms exceeds budget {{case['budget_ms']}}ms"
+    )
+"""
+
+
+def example_for(schema: Optional[Dict], doc: OpenApiDocument, depth: int = 0):
+    """
+    A plausible value for a schema: example/default/enum first, else a type-based placeholder.
+    """
+    schema = doc.deref(schema or {})
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if schema.get("allOf"):
+        merged = {}
+        for sub in schema["allOf"]:
+            part = example_for(sub, doc, depth + 1)
+            if isinstance(part, dict):
+                merged.update(part)
+        return merged
+    kind = schema.get("type") or ("object" if "properties" in schema else "string")
+    if kind == "object":
+        if depth > 4:
+            return {}
+        return {k: example_for(v, doc, depth + 1) for k, v in (schema.get("properties") or {}).items()}
+    if kind == "array":
+        return [] if depth > 4 else [example_for(schema.get("items"), doc, depth + 1)]
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        return float(schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return True
+    fmt = schema.get("format")
+    if fmt == "date-time":
+        return "2024-01-01T00:00:00Z"
+    if fmt == "uuid":
+        return "00000000-0000-4000-8000-000000000000"
+    min_length = int(schema.get("minLength", 0))
+    return "x" * min_length if min_length > 6 else "sample"
+
+
+def synthetic_event(doc: OpenApiDocument, method: str, route: str, op: Dict, base_path: str = "") -> Dict:
+    params = {}
+    for p in list((doc.paths.get(route) or {}).get("parameters") or []) + list(op.get("parameters") or []):
+        p = doc.deref(p)
+        params[(p.get("in"), p.get("name"))] = p
+    sources = {"path": {}, "query": {}, "header": {}}
+    for (location, name), p in params.items():
+        if location in sources:
+            value = example_for(p.get("schema"), doc)
+            sources[location][name.lower() if location == "header" else name] = (
+                json.dumps(value) if isinstance(value, bool) else str(value))
+
+    body = doc.deref(op.get("requestBody") or {})
+    schema = ((body.get("content") or {}).get("application/json") or {}).get("schema")
+    return {
+        "httpMethod": method,
+        "path": base_path.rstrip("/") + route,
+        "headers": sources["header"] or {"content-type": "application/json"},
+        "pathParameters": sources["path"] or None,
+        "queryStringParameters": sources["query"] or None,
+        "body": json.dumps(example_for(schema, doc)) if schema is not None else None,
+    }
+
+
+def render_perf_tests(doc: OpenApiDocument, budgets: Dict[Tuple, Dict], spec_name: str,
+                      function_name, base_path: str = "") -> Optional[str]:
+    """
+    Source for tests/test_perf_routes.py, or None when the spec carries no latency budgets.
+    """
+    cases = []
+    for (method, route, pct), budget in sorted(budgets.items()):
+        op = doc.operation(method, route) or {}
+        if route == "/health":
+            module, func = "handler", "health"
+        else:
+            module, func = "routes", function_name(route, method.lower())
+        cases.append({
+            "id": f"{method} {route} p{pct:g}",
+            "module": module,
+            "function": func,
+            "percentile": pct,
+            "budget_ms": budget["budget_ms"],
+            "event": synthetic_event(doc, method, route, op, base_path),
+        })
+    if not cases:
+        return None
+    return PERF_TEST_TEMPLATE.format(spec_name=spec_name, cases=pprint.pformat(cases, width=100, sort_dicts=False))
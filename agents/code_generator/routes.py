@@ -0,0 +1,291 @@
+import json
+import re
+from typing import Dict, List, Optional
+
+from agents.common.openapi import OpenApiDocument
+
+ROUTES_PRELUDE = """\
+# Generated by CodeGeneratorAgent from {spec_name}. Regenerated on every run; don't edit.
+# Request validators are plain Python compiled from the OpenAPI schemas, so they are built
+# once at import and each request pays only a few dict/isinstance checks.
+import base64
+import json
+import re
+
+import handler as _impl
+
+_MISSING = object()
+
+
+def _response(status, payload):
+    return {{
+        "statusCode": status,
+        "headers": {{"Content-Type": "application/json"}},
+        "body": json.dumps(payload)
+    }}
+
+
+def _coerce(raw, kind, items=None):
+    # Path/query/header values arrive as strings. Arrays arrive comma-separated ("a,b": form or
+    # simple style, and HTTP API events join repeated query keys that way), or as a list from
+    # a REST API event's multiValueQueryStringParameters
+    if kind == "array":
+        values = raw if isinstance(raw, list) else str(raw).split(",")
+        return [_coerce(item, items) for item in values]
+    try:
+        if kind == "integer":
+            return int(raw)
+        if kind == "number":
+            return float(raw)
+        if kind == "boolean":
+            return {{"true": True, "false": False}}.get(raw.lower(), raw)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return raw
+
+
+def _json_body(event):
+    raw = event.get("body")
+    if raw is None or raw == "":
+        return _MISSING
+    if event.get("isBase64Encoded"):
+        raw = base64.b64decode(raw)
+    return json.loads(raw)
+
+
+def _delegate(name, event, context):
+    impl = getattr(_impl, name, None)
+    if impl is None:
+        return _response(501, {{"message": f"Not implemented: handler.{{name}}"}})
+    return impl(event, context)
+"""
+
+_PARAM_SOURCES = {
+    "query": "queryStringParameters",
+    "path": "pathParameters",
+    "header": "headers",
+}
+
+
+class SchemaCompiler:
+    """
+    Turns JSON-schema fragments (OpenAPI flavour) into Python validator functions:
+        def _v_n(value, path, errors): ...   # appends "path: problem" strings to errors
+    Component $refs compile to one shared named function each, so recursive schemas work.
+    Supported: type, nullable, enum, required, properties, additionalProperties: false,
+    items, allOf, min/maxLength, pattern, minimum/maximum (+ exclusive), min/maxItems.
+    """
+    def __init__(self, doc: OpenApiDocument):
+        self.doc = doc
+        self.functions: List[str] = []
+        self.constants: List[str] = []
+        self._named: Dict[str, str] = {}
+        self._inline: Dict[str, str] = {}
+        self._count = 0
+
+    def source(self) -> str:
+        return "\n".join(self.constants) + ("\n\n\n" if self.constants else "") + "\n\n\n".join(self.functions)
+
+    def compile(self, schema: Optional[Dict]) -> Optional[str]:
+        if not schema:
+            return None
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+        # Identical inline schemas (every `type: string`, say) share one function
+        key = json.dumps(schema, sort_keys=True, default=str)
+        if key not in self._inline:
+            self._inline[key] = self._name("v")
+            self._define(self._inline[key], schema)
+        return self._inline[key]
+
+    def _compile_ref(self, ref: str) -> str:
+        if ref in self._named:
+            return self._named[ref]
+        name = self._name("v_" + re.sub(r"\W", "_", ref.rsplit("/", 1)[-1]))
+        self._named[ref] = name  # before compiling the target, for recursion
+        self._define(name, self.doc.resolve(ref) or {})
+        return name
+
+    def _name(self, hint: str) -> str:
+        self._count += 1
+        return f"_{hint}_{self._count}"
+
+    def _const(self, hint: str, expr: str) -> str:
+        name = self._name(hint).upper()
+        self.constants.append(f"{name} = {expr}")
+        return name
+
+    def _define(self, name: str, schema: Dict):
+        lines = self._body(schema)
+        self.functions.append(f"def {name}(value, path, errors):\n" + "\n".join("    " + l for l in (lines or ["pass"])))
+
+    def _body(self, schema: Dict) -> List[str]:
+        lines = []
+        if schema.get("nullable"):
+            lines.append("if value is None:")
+            lines.append("    return")
+
+        kind = schema.get("type")
+        check = {
+            "object": "isinstance(value, dict)",
+            "array": "isinstance(value, list)",
+            "string": "isinstance(value, str)",
+            "integer": "isinstance(value, int) and not isinstance(value, bool)",
+            "number": "isinstance(value, (int, float)) and not isinstance(value, bool)",
+            "boolean": "isinstance(value, bool)",
+        }.get(kind)
+        if check:
+            lines.append(f"if not ({check}):")
+            lines.append(f"    errors.append(path + {': expected ' + kind!r})")
+            lines.append("    return")
+
+        if "enum" in schema:
+            const = self._const("enum", repr(tuple(schema["enum"])))
+            lines.append(f"if value not in {const}:")
+            lines.append(f"    errors.append(path + {': must be one of ' + ', '.join(map(str, schema['enum']))!r})")
+
+        for sub in schema.get("allOf") or []:
+            fn = self.compile(sub)
+            if fn:
+                lines.append(f"{fn}(value, path, errors)")
+
+        if kind == "string" or (kind is None and any(k in schema for k in ("minLength", "maxLength", "pattern"))):
+            guard = "" if kind == "string" else "isinstance(value, str) and "
+            if "minLength" in schema:
+                lines.append(f"if {guard}len(value) < {int(schema['minLength'])}:")
+                lines.append(f"    errors.append(path + {': shorter than ' + str(schema['minLength'])!r})")
+            if "maxLength" in schema:
+                lines.append(f"if {guard}len(value) > {int(schema['maxLength'])}:")
+                lines.append(f"    errors.append(path + {': longer than ' + str(schema['maxLength'])!r})")
+            if "pattern" in schema:
+                const = self._const("re", f"re.compile({schema['pattern']!r})")
+                lines.append(f"if {guard}not {const}.search(value):")
+                lines.append(f"    errors.append(path + {': does not match ' + schema['pattern']!r})")
+
+        if kind in ("integer", "number"):
+            for key, op, exclusive_op in (("minimum", "<", "<="), ("maximum", ">", ">=")):
+                if key in schema:
+                    exclusive = schema.get("exclusiveM" + key[1:])
+                    cmp = exclusive_op if exclusive is True else op
+                    lines.append(f"if value {cmp} {schema[key]!r}:")
+                    lines.append(f"    errors.append(path + {': out of range (' + key + ' ' + str(schema[key]) + ')'!r})")
+
+        if kind == "array":
+            if "minItems" in schema:
+                lines.append(f"if len(value) < {int(schema['minItems'])}:")
+                lines.append(f"    errors.append(path + {': fewer than ' + str(schema['minItems']) + ' items'!r})")
+            if "maxItems" in schema:
+                lines.append(f"if len(value) > {int(schema['maxItems'])}:")
+                lines.append(f"    errors.append(path + {': more than ' + str(schema['maxItems']) + ' items'!r})")
+            fn = self.compile(schema.get("items"))
+            if fn:
+                lines.append("for i, item in enumerate(value):")
+                lines.append(f"    {fn}(item, f'{{path}}[{{i}}]', errors)")
+
+        if kind == "object" or (kind is None and ("properties" in schema or "required" in schema)):
+            guard = [] if kind == "object" else ["if not isinstance(value, dict):", "    return"]
+            lines.extend(guard)
+            for key in schema.get("required") or []:
+                lines.append(f"if {key!r} not in value:")
+                lines.append(f"    errors.append(path + {'.' + key + ': is required'!r})")
+            properties = schema.get("properties") or {}
+            for key, sub in properties.items():
+                fn = self.compile(sub)
+                if fn:
+                    lines.append(f"v = value.get({key!r}, _MISSING)")
+                    lines.append("if v is not _MISSING:")
+                    lines.append(f"    {fn}(v, path + {'.' + key!r}, errors)")
+            if schema.get("additionalProperties") is False:
+                const = self._const("keys", repr(frozenset(properties)))
+                lines.append(f"extra = value.keys() - {const}")
+                lines.append("if extra:")
+                lines.append("    errors.append(path + ': unexpected properties ' + ', '.join(sorted(extra)))")
+        return lines
+
+
+def implementation_name(op: Dict, func_name: str) -> str:
+    """
+    The handler.py function a generated route delegates to: operationId if given, else the route's name.
+    """
+    op_id = op.get("operationId")
+    return re.sub(r"\W", "_", op_id) if op_id else func_name
+
+
+def render_routes_module(doc: OpenApiDocument, spec_name: str, function_name) -> str:
+    """
+    Python source for routes.py: one Lambda entrypoint per operation (except /health) that
+    validates path/query/header parameters and the JSON body, answers 400 with every problem
+    found, and otherwise delegates to handler.<operationId>.
+    """
+    compiler = SchemaCompiler(doc)
+    handlers = []
+    for method, route, op in doc.iter_operations():
+        if route == "/health":
+            continue
+        func_name = function_name(route, method.lower())
+        lines = [f"def {func_name}(event, context):", "    errors = []"]
+
+        params = {}
+        for p in (doc.paths.get(route) or {}).get("parameters") or []:
+            p = doc.deref(p)
+            params[(p.get("in"), p.get("name"))] = p
+        for p in op.get("parameters") or []:
+            p = doc.deref(p)
+            params[(p.get("in"), p.get("name"))] = p
+        if any(location == "header" for location, _ in params):
+            # HTTP API (v2) events lowercase header names; REST API (v1) events keep the client's casing
+            lines.append("    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}")
+        for (location, name), p in params.items():
+            if location not in _PARAM_SOURCES:
+                continue
+            schema = doc.deref(p.get("schema") or {})
+            fn = compiler.compile(schema)
+            array = schema.get("type") == "array"
+            if location == "header":
+                lines.append(f"    v = headers.get({name.lower()!r})")
+            elif location == "query" and array and p.get("explode", p.get("style", "form") == "form"):
+                # ?id=1&id=2: every value, where the event keeps them apart
+                lines.append(f"    v = (event.get('multiValueQueryStringParameters') or {{}}).get({name!r}) or "
+                             f"(event.get('queryStringParameters') or {{}}).get({name!r})")
+            else:
+                lines.append(f"    v = (event.get({_PARAM_SOURCES[location]!r}) or {{}}).get({name!r})")
+            lines.append("    if v is None:")
+            if p.get("required") or location == "path":
+                lines.append(f"        errors.append({location + '.' + name + ': is required'!r})")
+            else:
+                lines.append("        pass")
+            if fn:
+                lines.append("    else:")
+                coerce = f"_coerce(v, {schema.get('type')!r}"
+                if array:
+                    coerce += f", {doc.deref(schema.get('items') or {}).get('type')!r}"
+                lines.append(f"        {fn}({coerce}), {location + '.' + name!r}, errors)")
+
+        body = doc.deref(op.get("requestBody") or {})
+        schema = doc.deref(((body.get("content") or {}).get("application/json") or {}).get("schema") or {})
+        if body:
+            fn = compiler.compile(schema)
+            lines.append("    try:")
+            lines.append("        body = _json_body(event)")
+            lines.append("    except ValueError:")
+            lines.append("        return _response(400, {\"errors\": [\"body: invalid JSON\"]})")
+            lines.append("    if body is _MISSING:")
+            if body.get("required"):
+                lines.append("        errors.append('body: is required')")
+            else:
+                lines.append("        pass")
+            if fn:
+                lines.append("    else:")
+                lines.append(f"        {fn}(body, 'body', errors)")
+
+        lines.append("    if errors:")
+        lines.append("        return _response(400, {\"errors\": errors})")
+        lines.append(f"    return _delegate({implementation_name(op, func_name)!r}, event, context)")
+        handlers.append("\n".join(lines))
+
+    parts = [ROUTES_PRELUDE.format(spec_name=spec_name)]
+    validators = compiler.source()
+    if validators:
+        parts.append(validators)
+    parts.extend(handlers)
+    return "\n\n\n".join(p.rstrip("\n") for p in parts) + "\n"
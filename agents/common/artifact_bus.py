@@ -0,0 +1,171 @@
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from agents.common import tracing
+from agents.common.emitter import KEPT, WRITTEN, ArtifactEmitter
+from agents.common.manifest import file_hash, tree_hash
+from agents.common.openapi import OpenApiDocument, SafeLoader, load_openapi
+
+BUFFERED = "buffered"
+
+
+class _Artifact:
+    __slots__ = ("content", "digest", "create_only", "dirty", "doc")
+
+    def __init__(self, content: str, create_only: bool = False, dirty: bool = True):
+        self.content = content
+        self.digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self.create_only = create_only
+        self.dirty = dirty
+        self.doc: Optional[OpenApiDocument] = None
+
+
+class BusEmitter:
+    """
+    ArtifactEmitter's interface, putting files on the bus instead of writing them.
+    """
+    def __init__(self, bus: "ArtifactBus"):
+        self.bus = bus
+        self.results: List[Tuple[str, str]] = []
+
+    def emit(self, path, content: str, create_only: bool = False) -> str:
+        self.bus.put(path, content, create_only=create_only)
+        self.results.append((str(path), BUFFERED))
+        return BUFFERED
+
+    def keep(self, path):
+        self.results.append((str(path), KEPT))
+
+    def summary(self) -> Dict:
+        counts = {BUFFERED: 0, KEPT: 0}
+        for _, status in self.results:
+            counts[status] += 1
+        return dict(counts, files=dict(self.results))
+
+
+class ArtifactBus:
+    """
+    In-memory hand-off of generated files between the agents of one pipeline run. The spec
+    writer puts the spec and OpenAPI text on the bus; code generation and IaC read the text
+    (and the OpenAPI document, parsed once and shared) from it instead of from disk, and put
+    their own files on it. Nothing is written until flush(), at the end of the run or when a
+    stage needs the files on disk (packaging, deploying); writes go through ArtifactEmitter,
+    so unchanged files keep their mtimes.
+    Paths are the keys, so the supervisor's context (and its checkpoints) still deal in
+    paths. Anything not on the bus is read from disk. Stages that record manifest entries
+    register them with on_flush(), since the manifest hashes the files as written.
+    """
+    def __init__(self):
+        self._artifacts: Dict[str, _Artifact] = {}
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.stats = {"puts": 0, "reads": 0, "parses": 0, "flushes": 0, "written": 0}
+
+    @staticmethod
+    def _key(path) -> str:
+        return Path(path).as_posix()
+
+    def put(self, path, content: str, create_only: bool = False):
+        """
+        create_only: a scaffold the user owns (see ArtifactEmitter.emit); only written when missing.
+        """
+        with self._lock:
+            self._artifacts[self._key(path)] = _Artifact(content, create_only)
+            self.stats["puts"] += 1
+
+    def emitter(self) -> BusEmitter:
+        return BusEmitter(self)
+
+    def _live(self, path) -> Optional[_Artifact]:
+        # A create-only scaffold never replaces the file already on disk, so neither do its reads
+        artifact = self._artifacts.get(self._key(path))
+        if artifact is not None and artifact.create_only and Path(path).is_file():
+            return None
+        return artifact
+
+    def has(self, path) -> bool:
+        return self._key(path) in self._artifacts
+
+    def exists(self, path) -> bool:
+        return self.has(path) or Path(path).is_file()
+
+    def read_text(self, path) -> Optional[str]:
+        """
+        The file's content: from the bus, else from disk (None when it's in neither).
+        """
+        artifact = self._live(path)
+        if artifact is not None:
+            self.stats["reads"] += 1
+            return artifact.content
+        path = Path(path)
+        return path.read_text(encoding="utf-8") if path.is_file() else None
+
+    def file_hash(self, path) -> Optional[str]:
+        """
+        Drop-in for manifest.file_hash: the sha256 the file will have once flushed.
+        """
+        artifact = self._live(path)
+        return artifact.digest if artifact is not None else file_hash(path)
+
+    def tree_hash(self, path) -> Optional[str]:
+        """
+        Drop-in for manifest.tree_hash: the directory as it will be once flushed.
+        """
+        return tree_hash(path, hasher=self.file_hash, extra=self.files(path))
+
+    def openapi(self, path) -> OpenApiDocument:
+        """
+        The parsed OpenAPI document, parsed at most once per run however many agents ask.
+        """
+        with self._lock:
+            artifact = self._artifacts.get(self._key(path))
+            if artifact is None:
+                return load_openapi(path)
+            if artifact.doc is None:
+                with tracing.span("yaml.parse", path=self._key(path), bytes=len(artifact.content)):
+                    data = yaml.load(artifact.content, Loader=SafeLoader)
+                artifact.doc = OpenApiDocument(data, artifact.digest)
+                self.stats["parses"] += 1
+            return artifact.doc
+
+    def files(self, prefix="") -> Dict[str, str]:
+        """
+        The artifacts under a directory (e.g. a generated service), path -> content.
+        """
+        prefix = self._key(prefix) if prefix else ""
+        with self._lock:
+            return {key: a.content for key, a in self._artifacts.items()
+                    if not prefix or key == prefix or key.startswith(prefix.rstrip("/") + "/")}
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return sorted(key for key, a in self._artifacts.items() if a.dirty)
+
+    def on_flush(self, callback: Callable[[], None]):
+        """
+        Runs callback after the next flush has written everything pending.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def flush(self) -> Dict:
+        """
+        Writes every pending artifact (once), then runs the on_flush callbacks. Flushed
+        artifacts stay readable from the bus.
+        """
+        with self._lock:
+            pending = [(key, a) for key, a in sorted(self._artifacts.items()) if a.dirty]
+            callbacks, self._callbacks = self._callbacks, []
+            emitter = ArtifactEmitter()
+            for key, artifact in pending:
+                emitter.emit(key, artifact.content, create_only=artifact.create_only)
+                artifact.dirty = False
+            self.stats["flushes"] += 1
+            self.stats["written"] += sum(1 for _, status in emitter.results if status == WRITTEN)
+        for callback in callbacks:
+            callback()
+        return emitter.summary()
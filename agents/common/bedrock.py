@@ -0,0 +1,328 @@
+import bisect
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional
+
+from agents.common import tracing
+
+# Error codes Bedrock/botocore return when the service is overloaded or briefly unavailable.
+RETRYABLE_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "InternalServerException",
+    "RequestTimeout",
+}
+
+
+class BedrockUnavailable(Exception):
+    """Raised when a call cannot be served by Bedrock; callers should use their fallback."""
+
+
+class CircuitOpenError(BedrockUnavailable):
+    pass
+
+
+class DeadlineExceeded(BedrockUnavailable):
+    pass
+
+
+def error_code(exc: BaseException) -> Optional[str]:
+    """
+    Returns the AWS error code of a botocore-style ClientError, or None.
+    """
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        return (response.get("Error") or {}).get("Code")
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError, DeadlineExceeded)):
+        return True
+    return error_code(exc) in RETRYABLE_CODES
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram (seconds). Bucket bounds grow by ~25% from 1ms to ~2min,
+    so percentiles are accurate to one bucket width while memory stays constant.
+    """
+    def __init__(self, min_value: float = 0.001, max_value: float = 120.0, growth: float = 1.25):
+        bounds = []
+        bound = min_value
+        while bound < max_value:
+            bounds.append(bound)
+            bound *= growth
+        bounds.append(max_value)
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        idx = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket holding quantile q (0..1), or None when empty.
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, int(round(q * self.count)))
+            seen = 0
+            for idx, c in enumerate(self.counts):
+                seen += c
+                if seen >= rank:
+                    return self.bounds[idx] if idx < len(self.bounds) else self.max
+            return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": (self.total / self.count) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open once `reset_timeout` seconds have passed; the next call is a probe, and
+    other callers are refused until it reports back.
+    half_open -> closed on success, back to open on failure.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        # Caller holds self._lock
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Admits a call. In half_open only the first caller gets through, as the probe.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == self.OPEN or (self._state == self.HALF_OPEN and self._probing):
+                return False
+            if self._state == self.HALF_OPEN:
+                self._probing = True
+            return True
+
+    def release(self):
+        """
+        Ends a call that said nothing about health (e.g. a validation error), freeing the probe.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+def _record_usage(span, response):
+    """
+    Adds token counts to a traced invoke_model span: from Bedrock's token-count headers when
+    present, else from the body's `usage` block (the body is read and replaced by a fresh stream).
+    """
+    headers = (response.get("ResponseMetadata") or {}).get("HTTPHeaders") or {}
+    if "x-amzn-bedrock-input-token-count" in headers:
+        span.set(input_tokens=int(headers["x-amzn-bedrock-input-token-count"]),
+                 output_tokens=int(headers.get("x-amzn-bedrock-output-token-count", 0)))
+        return response
+    body = response.get("body")
+    if body is None or not hasattr(body, "read"):
+        return response
+    raw = body.read()
+    try:
+        usage = json.loads(raw).get("usage") or {}
+        span.set(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+    except (ValueError, AttributeError):
+        pass
+    return dict(response, body=io.BytesIO(raw))
+
+
+class ResilientBedrockClient:
+    """
+    Wraps a boto3 `bedrock-runtime` client (or a compatible fake) with:
+      - jittered exponential retries on throttling / transient errors
+      - a per-call deadline covering every attempt and backoff sleep
+      - optional hedging: a duplicate request is fired once an attempt outlives the observed p95
+      - a circuit breaker per modelId that fails fast while that model is degraded (a throttled
+        primary doesn't short-circuit calls to a fallback model)
+      - a latency histogram of successful attempts (`self.latency`)
+
+    `invoke_model` keeps the boto3 signature and return value, so callers don't change.
+    """
+    def __init__(
+        self,
+        client,
+        max_retries: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        deadline: float = 60.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        rng: Optional[random.Random] = None,
+        sleep=time.sleep,
+    ):
+        self.client = client
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_factory = breaker_factory
+        self.breakers: Dict[Optional[str], CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.stats = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "failures": 0, "short_circuited": 0}
+        self._rng = rng or random.Random()
+        self._sleep = sleep
+        # Attempts that outlive their deadline keep running in the pool; size it for a few of those.
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bedrock")
+
+    def breaker(self, model_id: Optional[str]) -> CircuitBreaker:
+        with self._breakers_lock:
+            if model_id not in self.breakers:
+                self.breakers[model_id] = self.breaker_factory()
+            return self.breakers[model_id]
+
+    def available(self, model_ids: Optional[Iterable[str]] = None) -> bool:
+        """
+        Whether any of the models (default: any model called so far) may be called. Doesn't
+        take a half_open probe slot.
+        """
+        ids = list(model_ids) if model_ids is not None else list(self.breakers)
+        return not ids or any(self.breaker(m).state != CircuitBreaker.OPEN for m in ids)
+
+    def invoke_model(self, deadline: Optional[float] = None, **kwargs):
+        self.stats["calls"] += 1
+        breaker = self.breaker(kwargs.get("modelId"))
+        if not breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError(f"Bedrock circuit for {kwargs.get('modelId')} is open; skipping call")
+
+        budget = self.deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + budget
+        attempt = 0
+        with tracing.span("bedrock.invoke_model", model_id=kwargs.get("modelId")) as span:
+            while True:
+                remaining = deadline_at - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise DeadlineExceeded(f"invoke_model exceeded its {budget:.2f}s deadline")
+                    self.stats["attempts"] += 1
+                    response = self._attempt(kwargs, deadline_at)
+                    breaker.record_success()
+                    if span is not tracing.NOOP_SPAN:
+                        response = _record_usage(span, response)
+                        span.set(attempts=attempt + 1)
+                    return response
+                except Exception as e:
+                    retryable = is_retryable(e)
+                    remaining = deadline_at - time.monotonic()
+                    if not retryable or attempt >= self.max_retries or remaining <= 0:
+                        if retryable:
+                            # Only overload/timeouts say anything about service health.
+                            breaker.record_failure()
+                        else:
+                            breaker.release()
+                        self.stats["failures"] += 1
+                        span.set(attempts=attempt + 1)
+                        raise
+                    delay = self._backoff(attempt)
+                    self.stats["retries"] += 1
+                    self._sleep(min(delay, remaining))
+                    attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)].
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or self.latency.count < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_quantile)
+
+    def _attempt(self, kwargs: Dict, deadline_at: float):
+        start = time.monotonic()
+        pending = {self._pool.submit(self.client.invoke_model, **kwargs)}
+        hedge_delay = self._hedge_delay()
+        hedge_at = start + hedge_delay if hedge_delay is not None else None
+        error: Optional[BaseException] = None
+
+        while pending:
+            now = time.monotonic()
+            remaining = deadline_at - now
+            if remaining <= 0:
+                raise DeadlineExceeded("Bedrock attempt did not finish before the deadline")
+            timeout = remaining if hedge_at is None else min(remaining, max(hedge_at - now, 0))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                exc = fut.exception()
+                if exc is None:
+                    self.latency.record(time.monotonic() - start)
+                    return fut.result()
+                error = exc
+            if hedge_at is not None and pending and time.monotonic() >= hedge_at:
+                self.stats["hedges"] += 1
+                pending.add(self._pool.submit(self.client.invoke_model, **kwargs))
+                hedge_at = None
+
+        raise error
+
+    def latency_snapshot(self) -> Dict:
+        return self.latency.snapshot()
@@ -0,0 +1,119 @@
+import difflib
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from agents.common import tracing
+
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+KEPT = "kept"
+
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def _process_umask() -> int:
+    """
+    The process umask, read on first use. Linux reports it in /proc; elsewhere os.umask() can
+    only read it by setting it, so that happens once, under a lock.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", encoding="ascii") as fh:
+                    _umask = next(int(line.split()[1], 8) for line in fh if line.startswith("Umask:"))
+            except (OSError, ValueError, StopIteration):
+                _umask = os.umask(0o022)
+                os.umask(_umask)
+        return _umask
+
+
+class ArtifactEmitter:
+    """
+    Writes generated files only when their content actually changes, so unchanged artifacts keep
+    their mtimes (build/pytest caches and deploy diffing stay warm). Writes are atomic
+    (temp file + os.replace). With dry_run=True nothing touches disk; `diff()` returns a unified
+    diff of what would change instead.
+    """
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.results: List[Tuple[str, str]] = []
+        self._diffs: List[str] = []
+
+    def emit(self, path, content: str, create_only: bool = False) -> str:
+        """
+        create_only: the file is a scaffold the user is expected to own (e.g. handler.py);
+        write it when missing, never replace it.
+        """
+        path = Path(path)
+        data = content.encode("utf-8")
+        current = path.read_bytes() if path.is_file() else None
+
+        if current is not None and create_only:
+            status = KEPT
+        elif current is not None and hashlib.sha256(current).digest() == hashlib.sha256(data).digest():
+            status = UNCHANGED
+        else:
+            status = WRITTEN
+            if self.dry_run:
+                self._record_diff(path, current, content)
+            else:
+                with tracing.span("artifact.write", path=str(path), bytes=len(data)):
+                    self._atomic_write(path, data)
+        self.results.append((str(path), status))
+        return status
+
+    def keep(self, path):
+        """
+        Records a file deliberately left alone (e.g. hand-edited).
+        """
+        self.results.append((str(path), KEPT))
+
+    def _atomic_write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            # mkstemp makes the file 0600: keep the mode of the file being replaced, else
+            # give it the mode a plain open() would (0666 minus the umask)
+            os.chmod(tmp, self._mode(path))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _mode(path: Path) -> int:
+        try:
+            return stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            return 0o666 & ~_process_umask()
+
+    def _record_diff(self, path: Path, current, content: str):
+        before = current.decode("utf-8", errors="replace").splitlines(keepends=True) if current is not None else []
+        after = content.splitlines(keepends=True)
+        self._diffs.append("".join(difflib.unified_diff(
+            before, after,
+            fromfile=f"a/{path.as_posix()}" if current is not None else "/dev/null",
+            tofile=f"b/{path.as_posix()}",
+        )))
+
+    def diff(self) -> str:
+        return "".join(self._diffs)
+
+    def summary(self) -> Dict:
+        counts = {WRITTEN: 0, UNCHANGED: 0, KEPT: 0}
+        for _, status in self.results:
+            counts[status] += 1
+        out = dict(counts, dry_run=self.dry_run, files=dict(self.results))
+        if self.dry_run:
+            out["diff"] = self.diff()
+        return out
@@ -0,0 +1,87 @@
+import io
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Union
+
+
+class FakeClientError(Exception):
+    """
+    Mimics botocore's ClientError shape (`.response["Error"]["Code"]`) without importing botocore.
+    """
+    def __init__(self, code: str, message: str = "", operation_name: str = "InvokeModel"):
+        super().__init__(f"An error occurred ({code}) when calling the {operation_name} operation: {message}")
+        self.response = {"Error": {"Code": code, "Message": message}}
+        self.operation_name = operation_name
+
+
+def throttling(message: str = "Rate exceeded") -> FakeClientError:
+    return FakeClientError("ThrottlingException", message)
+
+
+def validation(message: str = "Malformed input request") -> FakeClientError:
+    return FakeClientError("ValidationException", message)
+
+
+class FakeBedrockClient:
+    """
+    Local stand-in for a boto3 `bedrock-runtime` client.
+
+    - `responder(payload) -> str` produces the model text (defaults to a short echo).
+    - `latency` is seconds per call, or a callable returning seconds.
+    - `tokens_per_s` is the generation rate (a number, or a callable returning one): each
+      call also takes output_tokens / tokens_per_s, so long answers are slower, as they are
+      on a real model. None (the default) answers at once.
+    - `inject(fault, times=1)` queues faults; a fault is an exception to raise or a float
+      meaning "sleep this long before answering" (a slow call).
+    """
+    def __init__(
+        self,
+        responder: Optional[Callable[[Dict], str]] = None,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        tokens_per_s: Union[None, float, Callable[[], float]] = None,
+    ):
+        self.responder = responder or (lambda payload: "ok")
+        self.latency = latency
+        self.tokens_per_s = tokens_per_s
+        self.calls = []
+        self._faults = deque()
+        self._lock = threading.Lock()
+
+    def inject(self, fault, times: int = 1):
+        with self._lock:
+            for _ in range(times):
+                self._faults.append(fault)
+
+    def invoke_model(self, modelId: str, body, contentType: str = "application/json",
+                     accept: str = "application/json", **kwargs):
+        payload = json.loads(body)
+        with self._lock:
+            self.calls.append({"modelId": modelId, "payload": payload})
+            fault = self._faults.popleft() if self._faults else None
+
+        delay = self.latency() if callable(self.latency) else self.latency
+        if isinstance(fault, (int, float)):
+            delay = fault
+        elif isinstance(fault, BaseException):
+            if delay:
+                time.sleep(delay)
+            raise fault
+
+        text = self.responder(payload)
+        usage = {"input_tokens": len(json.dumps(payload)) // 4, "output_tokens": len(text) // 4}
+        rate = self.tokens_per_s() if callable(self.tokens_per_s) else self.tokens_per_s
+        if rate:
+            delay += usage["output_tokens"] / rate
+        if delay:
+            time.sleep(delay)
+
+        out = {
+            "output": {"message": {"role": "assistant", "content": [{"type": "text", "text": text}]}},
+            "usage": usage,
+        }
+        return {
+            "body": io.BytesIO(json.dumps(out).encode("utf-8")),
+            "contentType": "application/json",
+        }
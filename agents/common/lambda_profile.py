@@ -0,0 +1,115 @@
+import copy
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agents.common.nfr import latency_budgets
+from agents.common.openapi import OpenApiDocument
+
+DEFAULT_PROFILE = {
+    # Graviton: ~20% cheaper per GB-s and typically faster for Python handlers
+    "architecture": "arm64",
+    "defaults": {
+        "memory_size": 512,
+        "timeout": 10,
+        "reserved_concurrency": None,
+        "provisioned_concurrency": 0,
+    },
+    # Routes whose tightest latency budget is at or under this are latency-critical
+    "critical_budget_ms": 250,
+    "critical": {
+        # More memory = more vCPU share, and a warm pool removes cold starts from p95
+        "memory_size": 1024,
+        "provisioned_concurrency": 1,
+    },
+    "functions": {},
+}
+MIN_TIMEOUT_S = 3
+MAX_TIMEOUT_S = 29  # API Gateway integration limit
+# Distributions never bundled with a function, by both the packager and serverless.yml's noDeploy:
+# shipped by the AWS Lambda Python runtime (bundling them only adds cold-start weight) ...
+RUNTIME_PROVIDED = ("boto3", "botocore", "s3transfer", "jmespath", "python-dateutil", "six", "urllib3")
+# ... or needed to develop/test the service, never at runtime
+DEV_ONLY = ("pytest", "pytest-cov", "coverage", "moto", "mypy", "ruff", "flake8", "black")
+
+
+def function_name(route: str, method: str) -> str:
+    # /user-prefs/{id}.json -> user_prefs_id_json: a Python identifier, whatever the path holds
+    safe = re.sub(r"\W", "_", route.strip("/").replace("{", "").replace("}", ""))
+    safe = safe if safe else "root"
+    return f"{method.lower()}_{safe}"
+
+
+def function_names(doc: Optional[OpenApiDocument]) -> Dict[Tuple[str, str], str]:
+    """
+    (METHOD, route) -> function name for every operation but /health, unique within the spec:
+    routes that slug alike (/user-prefs and /user_prefs) get _2, _3, ... in spec order.
+    """
+    names, used = {}, {"health"}
+    for method, route, _ in (doc.iter_operations() if doc else []):
+        if route == "/health":
+            continue
+        base = name = function_name(route, method)
+        n = 2
+        while name in used:
+            name, n = f"{base}_{n}", n + 1
+        used.add(name)
+        names[(method.upper(), route)] = name
+    return names
+
+
+def lambda_functions(doc: Optional[OpenApiDocument]) -> List[Dict]:
+    """
+    One Lambda per operation, as both the serverless.yml and the CDK stack lay them out:
+    health -> handler.health, everything else -> routes.<method>_<path>.
+    """
+    base_path = doc.base_path if doc else "/api"
+    functions = [{"name": "health", "handler": "handler.health", "method": "GET",
+                  "route": "/health", "path": f"{base_path}/health"}]
+    for (method, route), name in function_names(doc).items():
+        functions.append({"name": name, "handler": f"routes.{name}", "method": method,
+                          "route": route, "path": f"{base_path}{route}"})
+    return functions
+
+
+def _merge(base: Dict, override: Optional[Dict]) -> Dict:
+    out = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def build_profile(doc: Optional[OpenApiDocument], constraints: Iterable[str] = (),
+                  explicit: Optional[Dict] = None) -> Dict:
+    """
+    Resolves per-function Lambda settings. Precedence, lowest first:
+      profile defaults -> NFR-derived (latency budgets) -> explicit["functions"][name]
+    NFR-derived: a function with a budget gets timeout = 10x its tightest budget (clamped to
+    3..29s); one at or under critical_budget_ms also gets the "critical" settings.
+    Returns {"architecture": ..., "functions": {name: {memory_size, timeout, ...}}}.
+    """
+    profile = _merge(DEFAULT_PROFILE, explicit)
+    tightest = {}
+    if doc is not None:
+        names = function_names(doc)
+        for (method, route, _pct), budget in latency_budgets(doc, constraints, doc.base_path).items():
+            name = "health" if route == "/health" else names.get((method.upper(), route), function_name(route, method))
+            tightest[name] = min(tightest.get(name, float("inf")), budget["budget_ms"])
+
+    resolved = {}
+    for fn in lambda_functions(doc):
+        name = fn["name"]
+        settings = dict(profile["defaults"])
+        if name in tightest:
+            budget_ms = tightest[name]
+            timeout = math.ceil(budget_ms * 10 / 1000.0)
+            settings["timeout"] = max(MIN_TIMEOUT_S, min(MAX_TIMEOUT_S, settings["timeout"], timeout))
+            if budget_ms <= profile["critical_budget_ms"]:
+                settings.update(profile["critical"])
+            settings["latency_budget_ms"] = budget_ms
+        settings.update(profile["functions"].get(name) or {})
+        resolved[name] = settings
+    return {"architecture": profile["architecture"], "functions": resolved}
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+MANIFEST_FILE = ".copilot-manifest.json"
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path) -> Optional[str]:
+    path = Path(path)
+    if not path.is_file():
+        return None
+    return sha256_bytes(path.read_bytes())
+
+
+def tree_hash(path, hasher=file_hash, extra: Iterable = ()) -> Optional[str]:
+    """
+    Hash of a directory's files (relative paths and contents), None when it has none.
+    Caches and dot-directories (__pycache__, .pytest_cache, .serverless) don't count.
+    extra: more file paths under it (e.g. ones still on an ArtifactBus, hashed via hasher).
+    """
+    root = Path(path)
+    files = {p for p in root.rglob("*") if p.is_file()} if root.is_dir() else set()
+    files |= {Path(p) for p in extra}
+    h = hashlib.sha256()
+    count = 0
+    for file in sorted(files, key=lambda p: p.as_posix()):
+        rel = file.relative_to(root)
+        if any(part.startswith(".") or part == "__pycache__" for part in rel.parts[:-1]):
+            continue
+        h.update(rel.as_posix().encode("utf-8") + b"\0" + (hasher(file) or "missing").encode() + b"\0")
+        count += 1
+    return h.hexdigest() if count else None
+
+
+def inputs_hash(*parts, hasher=file_hash) -> str:
+    """
+    Stable hash of a stage's inputs. Parts may be JSON-serialisable values or Paths
+    (hashed by content, so a moved-but-identical file doesn't count as a change).
+    hasher: how to hash a Path's content (ArtifactBus.file_hash for files not written yet).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            h.update(b"file:" + (hasher(part) or "missing").encode())
+        else:
+            h.update(b"json:" + json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    Records, per stage (e.g. "code_generator:services/customer-alerts"), the hash of its inputs
+    and of every output it wrote, plus the result it returned. Lets agents:
+      - skip a stage whose inputs and outputs are unchanged since the last run
+      - spot outputs that were edited by hand after generation (and keep spotting them: a
+        file kept as hand-edited stays so until it is deleted or the stage is forced)
+    Saves merge with what's on disk under a file lock, so agents sharing one manifest
+    (including batch workers in other processes) don't drop each other's entries.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = Path(path)
+
+    def _load(self) -> Dict:
+        if not self.path.exists():
+            return {"version": 1, "stages": {}}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"version": 1, "stages": {}}
+
+    def entry(self, stage: str) -> Optional[Dict]:
+        return self._load()["stages"].get(stage)
+
+    def is_fresh(self, stage: str, input_hash: str) -> bool:
+        entry = self.entry(stage)
+        if not entry or entry.get("inputs") != input_hash:
+            return False
+        return all(file_hash(p) == h for p, h in entry.get("outputs", {}).items())
+
+    def hand_edited(self, stage: str) -> List[str]:
+        """
+        Outputs that still exist but no longer match what this stage last wrote, or that an
+        earlier run already kept as hand-edited.
+        """
+        entry = self.entry(stage) or {}
+        kept = set(entry.get("hand_edited", []))
+        edited = []
+        for p, h in entry.get("outputs", {}).items():
+            current = file_hash(p)
+            if current is not None and (current != h or p in kept):
+                edited.append(p)
+        return edited
+
+    def record(self, stage: str, input_hash: str, outputs: Iterable, result: Optional[Dict] = None,
+               hand_edited: Iterable = ()):
+        """
+        hand_edited: outputs this run kept instead of writing. Their current hash is recorded
+        (so an unchanged stage still skips), and they are remembered as hand-edited.
+        """
+        entry = {
+            "inputs": input_hash,
+            "outputs": {str(p): file_hash(p) for p in outputs},
+            "hand_edited": sorted(str(p) for p in hand_edited),
+            "result": result,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock, self._file_lock():
+            data = self._load()
+            data["stages"][stage] = entry
+            self._write(data)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write(self, data: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=".manifest-")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
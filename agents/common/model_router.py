@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class ModelRoute:
+    model_id: str
+    max_tokens: int = 2000
+    temperature: float = 0.2
+    latency_budget: Optional[float] = None  # p95 target in seconds; None = never considered slow
+    timeout: Optional[float] = None         # per-call deadline passed to the Bedrock client
+
+
+def default_routes(primary: Optional[str] = None, fast: Optional[str] = None) -> Dict[str, List[ModelRoute]]:
+    """
+    Spec writing stays on the primary model; the short, deterministic OpenAPI draft may
+    drop to BEDROCK_FAST_MODEL_ID when the primary is running slow.
+    """
+    primary = primary or os.getenv("BEDROCK_MODEL_ID")
+    fast = fast or os.getenv("BEDROCK_FAST_MODEL_ID")
+    routes = {
+        "spec": [ModelRoute(primary, max_tokens=3000, temperature=0.2, latency_budget=45.0)],
+        "openapi": [ModelRoute(primary, max_tokens=1500, temperature=0.0, latency_budget=10.0)],
+    }
+    if fast and fast != primary:
+        routes["openapi"].append(ModelRoute(fast, max_tokens=1500, temperature=0.0))
+    return routes
+
+
+class _ModelStats:
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class ModelRouter:
+    """
+    Maps each generation task to an ordered list of ModelRoutes (primary first) and picks one
+    per call from recently observed latency and success:
+
+      - a route is healthy while its recent p95 <= latency_budget and success rate >= min_success_rate,
+        both observed on calls for that task (budgets are per task, and a model serving a slow
+        task shouldn't look slow to a fast one)
+      - the first healthy route wins; with none healthy, the fastest observed route wins
+      - every `probe_every`-th call for a task goes to the primary so it can recover
+    """
+    def __init__(self, routes: Optional[Dict[str, List[ModelRoute]]] = None, window: int = 50,
+                 min_samples: int = 5, min_success_rate: float = 0.8, probe_every: int = 20):
+        self.routes = routes if routes is not None else default_routes()
+        self.window = window
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+        self.probe_every = probe_every
+        self._stats: Dict[Tuple[str, str], _ModelStats] = {}
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, task: str) -> List[ModelRoute]:
+        """
+        All routes for the task, the one to try first at the head.
+        """
+        routes = [r for r in self.routes.get(task, []) if r.model_id]
+        if not routes:
+            raise KeyError(f"No model route configured for task '{task}'")
+        with self._lock:
+            n = self._calls[task] = self._calls.get(task, 0) + 1
+        if len(routes) == 1 or (self.probe_every and n % self.probe_every == 0):
+            return routes
+        chosen = self._choose(task, routes)
+        return [chosen] + [r for r in routes if r is not chosen]
+
+    def select(self, task: str) -> ModelRoute:
+        return self.candidates(task)[0]
+
+    def record(self, task: str, model_id: str, latency: float, ok: bool):
+        with self._lock:
+            stats = self._stats.setdefault((task, model_id), _ModelStats(self.window))
+            stats.outcomes.append(1 if ok else 0)
+            if ok:
+                stats.latencies.append(latency)
+
+    def healthy(self, task: str, route: ModelRoute) -> bool:
+        stats = self._stats.get((task, route.model_id))
+        if stats is None or len(stats.outcomes) < self.min_samples:
+            return True
+        if stats.success_rate() < self.min_success_rate:
+            return False
+        p95 = stats.p95()
+        return route.latency_budget is None or p95 is None or p95 <= route.latency_budget
+
+    def _choose(self, task: str, routes: List[ModelRoute]) -> ModelRoute:
+        for route in routes:
+            if self.healthy(task, route):
+                return route
+
+        def observed(route):
+            stats = self._stats.get((task, route.model_id))
+            p95 = stats.p95() if stats else None
+            return p95 if p95 is not None else float("inf")
+        return min(routes, key=observed)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            out: Dict[str, Dict] = {}
+            for (task, model_id), s in self._stats.items():
+                out.setdefault(task, {})[model_id] = {
+                    "samples": len(s.outcomes),
+                    "p95": s.p95(),
+                    "success_rate": s.success_rate(),
+                }
+            return out
@@ -0,0 +1,100 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from agents.common.openapi import OpenApiDocument
+
+# "Latency P95 < 200ms for GET /alerts", "P95 < 200ms for read APIs", "p99 under 1s"
+_CONSTRAINT_RE = re.compile(
+    r"\bp(?P<pct>\d{2}(?:\.\d+)?)\s*(?:<=?|≤|under|below|within)\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>ms|s)\b"
+    r"(?:\s*(?:for|on)\s+(?:(?P<method>GET|PUT|POST|DELETE|OPTIONS|HEAD|PATCH|TRACE)\s+)?"
+    r"(?P<target>/\S*|read\b|reads\b|write\b|writes\b|all\b))?",
+    re.IGNORECASE,
+)
+_EXTENSION_RE = re.compile(r"^x-latency-p(\d{2}(?:\.\d+)?)$")
+
+
+def _to_ms(value, unit: str = "ms") -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().lower()
+    m = re.match(r"^(\d+(?:\.\d+)?)\s*(ms|s)?$", text)
+    if not m:
+        raise ValueError(f"Unrecognised latency value: {value!r}")
+    number, suffix = float(m.group(1)), m.group(2) or unit
+    return number * 1000.0 if suffix == "s" else number
+
+
+def parse_constraints(lines: Iterable[str]) -> List[Dict]:
+    """
+    Extracts latency NFRs from free text. Each rule: percentile, budget_ms, and what it applies to
+    (method and/or route, or a read/write class, or everything).
+    """
+    rules = []
+    for line in lines:
+        for m in _CONSTRAINT_RE.finditer(line or ""):
+            target = (m.group("target") or "").lower()
+            rules.append({
+                "percentile": float(m.group("pct")),
+                "budget_ms": _to_ms(m.group("value"), m.group("unit").lower()),
+                "method": (m.group("method") or "").upper() or None,
+                "route": target.rstrip(".,;)") if target.startswith("/") else None,
+                "scope": "read" if target.startswith("read") else "write" if target.startswith("write") else None,
+                "source": line.strip(),
+            })
+    return rules
+
+
+def _rule_matches(rule: Dict, method: str, route: str, base_path: str) -> bool:
+    if rule["method"] and rule["method"] != method:
+        return False
+    if rule["route"]:
+        wanted = rule["route"]
+        if base_path and wanted.startswith(base_path.rstrip("/") + "/"):
+            wanted = wanted[len(base_path.rstrip("/")):]
+        if wanted.rstrip("/") != route.rstrip("/"):
+            return False
+    if rule["scope"] == "read" and method not in ("GET", "HEAD"):
+        return False
+    if rule["scope"] == "write" and method in ("GET", "HEAD", "OPTIONS"):
+        return False
+    return True
+
+
+def latency_budgets(doc: OpenApiDocument, constraints: Iterable[str] = (), base_path: str = "") -> Dict[Tuple, Dict]:
+    """
+    (METHOD, route, percentile) -> {"budget_ms", "source"}.
+    Text rules apply in order, more specific ones (naming a route) winning; an operation's own
+    x-latency-pNN extension overrides both.
+    """
+    rules = sorted(parse_constraints(constraints), key=lambda r: r["route"] is not None)
+    budgets = {}
+    for method, route, op in doc.iter_operations():
+        for rule in rules:
+            if _rule_matches(rule, method, route, base_path):
+                budgets[(method, route, rule["percentile"])] = {
+                    "budget_ms": rule["budget_ms"], "source": rule["source"]}
+        for key, value in op.items():
+            m = _EXTENSION_RE.match(str(key))
+            if m:
+                budgets[(method, route, float(m.group(1)))] = {"budget_ms": _to_ms(value), "source": key}
+    return budgets
+
+
+def collect_constraints(input: Dict, openapi_path, bus=None) -> List[str]:
+    """
+    NFR text for a service: explicit input/ticket constraints plus the sibling <ticket>-spec.md
+    (from the artifact bus, when given, before disk).
+    """
+    constraints = list(input.get("constraints") or input.get("ticket", {}).get("constraints") or [])
+    spec_md = spec_md_for(openapi_path)
+    if bus is not None:
+        constraints += (bus.read_text(spec_md) or "").splitlines()
+    elif spec_md.is_file():
+        constraints += spec_md.read_text(encoding="utf-8").splitlines()
+    return constraints
+
+
+def spec_md_for(openapi_path) -> Path:
+    openapi_path = Path(openapi_path)
+    return openapi_path.with_name(openapi_path.name.replace("-openapi.yaml", "-spec.md"))
@@ -0,0 +1,242 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from agents.common import tracing
+
+try:
+    # libyaml-backed loader is ~10x faster on large specs; same semantics as SafeLoader
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+CACHE_DIR = ".copilot-cache/openapi"
+
+
+def infer_base_path(data: Dict) -> str:
+    # Try servers[0].url or default to /api
+    servers = (data or {}).get("servers") or []
+    if servers:
+        url = servers[0].get("url", "/api")
+        return url if url.startswith("/") else f"/{url}"
+    return "/api"
+
+
+class OpenApiDocument:
+    """
+    A parsed OpenAPI document with indexes built once up front:
+      - operations: (METHOD, path) -> operation object
+      - refs: "#/components/<section>/<name>" -> object, with $ref chains resolved on first use
+    so route and schema lookups are O(1) regardless of spec size.
+    Treat `data` as read-only: documents are shared through the parse cache.
+    """
+    def __init__(self, data: Dict, digest: Optional[str] = None):
+        self.data = data or {}
+        self.digest = digest
+        self.operations: Dict[Tuple[str, str], Dict] = {}
+        for route, item in (self.data.get("paths") or {}).items():
+            for method, op in (item or {}).items():
+                if method.lower() in HTTP_METHODS:
+                    self.operations[(method.upper(), route)] = op or {}
+        self.refs: Dict[str, object] = {}
+        for section, entries in (self.data.get("components") or {}).items():
+            for name, obj in (entries or {}).items():
+                self.refs[f"#/components/{section}/{name}"] = obj
+        self._resolved: Dict[str, object] = {}
+
+    @property
+    def base_path(self) -> str:
+        return infer_base_path(self.data)
+
+    @property
+    def paths(self) -> Dict:
+        return self.data.get("paths") or {}
+
+    def iter_operations(self) -> Iterator[Tuple[str, str, Dict]]:
+        for (method, route), op in self.operations.items():
+            yield method, route, op
+
+    def operation(self, method: str, route: str) -> Optional[Dict]:
+        return self.operations.get((method.upper(), route))
+
+    def schema(self, name: str):
+        return self.resolve(f"#/components/schemas/{name}")
+
+    def resolve(self, ref: str):
+        """
+        Follows a $ref (and any chain of $refs behind it) to the target object.
+        """
+        if ref in self._resolved:
+            return self._resolved[ref]
+        seen = set()
+        current = ref
+        while True:
+            if current in seen:
+                raise ValueError(f"Circular $ref chain at {current}")
+            seen.add(current)
+            target = self.refs.get(current)
+            if target is None:
+                target = self._walk_pointer(current)
+                self.refs[current] = target
+            if isinstance(target, dict) and set(target) == {"$ref"}:
+                current = target["$ref"]
+                continue
+            break
+        for r in seen:
+            self._resolved[r] = target
+        return target
+
+    def deref(self, obj):
+        """
+        Returns obj, or what it points at when it's a {"$ref": ...} node.
+        """
+        if isinstance(obj, dict) and "$ref" in obj:
+            return self.resolve(obj["$ref"])
+        return obj
+
+    def _walk_pointer(self, ref: str):
+        if not ref.startswith("#/"):
+            raise KeyError(f"Only local $refs are supported: {ref}")
+        node = self.data
+        for token in ref[2:].split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        return node
+
+    def route_summary(self) -> List[str]:
+        return [f"{method} {route}" for method, route, _ in self.iter_operations()]
+
+
+# Tags for the YAML values plain JSON can't carry (non-string keys, timestamps, binary, sets)
+_TAGS = ("__map__", "__datetime__", "__date__", "__bytes__", "__set__")
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not any(k in _TAGS for k in value):
+            return {k: _encode(v) for k, v in value.items()}
+        return {"__map__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_encode(v) for v in value]}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"can't cache {type(value).__name__}")
+
+
+def _decode(obj: Dict):
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag == "__map__":
+            return {k: v for k, v in value}
+        if tag == "__datetime__":
+            return datetime.fromisoformat(value)
+        if tag == "__date__":
+            return date.fromisoformat(value)
+        if tag == "__bytes__":
+            return base64.b64decode(value)
+        if tag == "__set__":
+            return set(value)
+    return obj
+
+
+class OpenApiLoader:
+    """
+    Parses OpenAPI YAML with libyaml when available and caches the result by content hash:
+    in-process (LRU) and optionally on disk as JSON, which loads far faster than YAML
+    re-parsing on the next run. An edited spec gets a new hash, so stale entries are never served.
+    The disk cache is plain data and is never executed, but it is trusted as much as the
+    specs themselves: whoever can write cache_dir can change what a spec parses to. Point it
+    outside the checkout (or pass cache_dir=None) where the working tree isn't trusted.
+    """
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR, max_entries: int = 32):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[str, OpenApiDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"parsed": 0, "memory_hits": 0, "disk_hits": 0}
+
+    def load(self, path) -> OpenApiDocument:
+        raw = Path(path).read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            doc = self._memo.get(digest)
+            if doc is not None:
+                self._memo.move_to_end(digest)
+                self.stats["memory_hits"] += 1
+                return doc
+
+        data = self._read_disk(digest)
+        if data is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            with tracing.span("yaml.parse", path=str(path), bytes=len(raw)):
+                data = yaml.load(raw, Loader=SafeLoader)
+            self.stats["parsed"] += 1
+            self._write_disk(digest, data)
+
+        doc = OpenApiDocument(data, digest)
+        with self._lock:
+            self._memo[digest] = doc
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return doc
+
+    def _read_disk(self, digest: str):
+        if not self.cache_dir:
+            return None
+        entry = self.cache_dir / f"{digest}.json"
+        try:
+            with open(entry, "rb") as fh:
+                return json.load(fh, object_hook=_decode)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt/incompatible cache entry: reparse
+            return None
+
+    def _write_disk(self, digest: str, data):
+        if not self.cache_dir:
+            return
+        try:
+            payload = json.dumps(_encode(data), separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError):
+            return  # something YAML built that the cache can't represent: just reparse next time
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.cache_dir), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(payload)
+            os.replace(tmp, self.cache_dir / f"{digest}.json")
+        except OSError as e:
+            print(f"[OpenApiLoader] Could not write parse cache: {e}")
+
+
+_default_loader = None
+
+
+def load_openapi(path) -> OpenApiDocument:
+    """
+    Loads a spec through the process-wide loader (shared in-process + on-disk cache).
+    """
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = OpenApiLoader()
+    return _default_loader.load(path)
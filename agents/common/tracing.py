@@ -0,0 +1,184 @@
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TRACE_ENV = "COPILOT_TRACE"
+
+
+class _NoopSpan:
+    """
+    Returned by span() while tracing is off: a shared object whose methods do nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_tracer: Optional["Tracer"] = None
+_local = threading.local()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "tid", "start_ns", "end_ns", "attrs")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = next(tracer._ids)
+        if parent is None:
+            stack = getattr(_local, "stack", None)
+            parent = stack[-1] if stack else None
+        self.parent_id = parent.span_id if isinstance(parent, Span) else None
+        self.tid = threading.get_ident()
+        self.start_ns = self.end_ns = 0
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        stack = _local.stack
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread": self.tid,
+            "start_us": (self.start_ns - self.tracer.origin_ns) / 1000.0,
+            "duration_us": (self.end_ns - self.start_ns) / 1000.0,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects finished spans in memory (newest max_spans kept) for export as JSON lines or as
+    Chrome trace events (load the file in chrome://tracing or ui.perfetto.dev).
+    """
+    def __init__(self, max_spans: int = 100_000):
+        self.origin_ns = time.perf_counter_ns()
+        self.spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def span(self, name: str, parent: Optional[Span] = None, attrs: Optional[Dict] = None) -> Span:
+        return Span(self, name, parent, attrs or {})
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            spans = list(self.spans)
+        return [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)]
+
+    def export_jsonl(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            for record in self.records():
+                fh.write(json.dumps(record, default=str) + "\n")
+        return path
+
+    def export_chrome(self, path) -> Path:
+        events = [{
+            "name": r["name"],
+            "cat": r["name"].split(".", 1)[0].split(" ", 1)[0],
+            "ph": "X",  # complete event: ts + dur
+            "ts": r["start_us"],
+            "dur": r["duration_us"],
+            "pid": os.getpid(),
+            "tid": r["thread"],
+            "args": dict(r["attrs"], span_id=r["span_id"], parent_id=r["parent_id"]),
+        } for r in self.records()]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str),
+                        encoding="utf-8")
+        return path
+
+
+def span(name: str, parent: Optional[Span] = None, **attrs):
+    """
+    `with span("yaml.parse", bytes=n) as s: ...; s.set(k=v)`. While tracing is disabled this
+    is one global lookup returning a shared no-op object.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.span(name, parent, attrs)
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def current() -> Optional[Span]:
+    """
+    The innermost open span on this thread: pass it as `parent` to spans opened on other threads.
+    """
+    if _tracer is None:
+        return None
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def enable(tracer: Optional[Tracer] = None) -> Tracer:
+    global _tracer
+    _tracer = tracer or Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def enable_from_env() -> Optional[Tracer]:
+    """
+    COPILOT_TRACE=<path prefix> turns tracing on for this process and writes
+    <prefix>.jsonl and <prefix>.chrome.json when it exits.
+    """
+    prefix = os.getenv(TRACE_ENV)
+    if not prefix:
+        return None
+    tracer = enable()
+
+    def _export():
+        tracer.export_jsonl(f"{prefix}.jsonl")
+        tracer.export_chrome(f"{prefix}.chrome.json")
+        print(f"[Tracing] Wrote {prefix}.jsonl and {prefix}.chrome.json ({len(tracer.spans)} spans)")
+    atexit.register(_export)
+    return tracer
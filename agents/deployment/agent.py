@@ -1,3 +1,242 @@
-class Agent:
-    def run(self, input):
-        return {"status": "ok", "message": "agent placeholder"}
\ No newline at end of file
+import json
+import math
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from agents.common import tracing
+from agents.common.nfr import collect_constraints, latency_budgets
+from agents.common.openapi import OpenApiDocument, load_openapi
+
+SMOKE_VALUE = "smoke"
+# Methods safe to fire repeatedly at a live API; the rest create/change data on every call
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def sample_value(doc: OpenApiDocument, schema: Optional[Dict], name: str = SMOKE_VALUE):
+    """
+    A minimal valid value for a schema: its example/default/first enum, else a typed placeholder.
+    """
+    schema = doc.deref(schema or {})
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        props = schema.get("properties") or {}
+        required = schema.get("required") or list(props)
+        return {key: sample_value(doc, props.get(key), key) for key in required}
+    if kind == "array":
+        return [sample_value(doc, schema.get("items"), name)]
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 1)
+    return f"{SMOKE_VALUE}-{name}"
+
+
+def build_probe(doc: OpenApiDocument, method: str, route: str, op: Dict, overrides: Optional[Dict] = None) -> Dict:
+    """
+    The request a probe sends to one operation: required path/query parameters and the
+    request body filled from the spec (or from overrides {"path", "query", "body"}).
+    """
+    overrides = overrides or {}
+    path_params, query = {}, {}
+    params = list(doc.paths.get(route, {}).get("parameters") or []) + list(op.get("parameters") or [])
+    for param in (doc.deref(p) for p in params):
+        if param.get("in") == "path":
+            path_params[param["name"]] = sample_value(doc, param.get("schema"), param["name"])
+        elif param.get("in") == "query" and param.get("required"):
+            query[param["name"]] = sample_value(doc, param.get("schema"), param["name"])
+    synthetic_ids = any(name not in (overrides.get("path") or {}) for name in path_params)
+    path_params.update(overrides.get("path") or {})
+    query.update(overrides.get("query") or {})
+
+    url_path = route
+    for name, value in path_params.items():
+        url_path = url_path.replace("{" + name + "}", quote(str(value), safe=""))
+    body = overrides.get("body")
+    if body is None and op.get("requestBody"):
+        content = doc.deref(op["requestBody"]).get("content") or {}
+        schema = (content.get("application/json") or {}).get("schema")
+        body = sample_value(doc, schema) if schema else None
+    return {
+        "method": method,
+        "route": route,
+        "path": url_path + (f"?{urlencode(query)}" if query else ""),
+        "body": json.dumps(body) if body is not None else None,
+        "documented": sorted(str(code) for code in (op.get("responses") or {})),
+        # made-up path ids: a 404 means "no such item", not a broken route
+        "synthetic_ids": synthetic_ids,
+    }
+
+
+class DeploymentAgent:
+    """
+    Verifies a deployed API before it is promoted: for every operation in the OpenAPI spec,
+    fires `requests_per_route` probes at base_url (all routes interleaved, `concurrency` at a
+    time) and computes per-route latency percentiles.
+    Promotion is blocked when a route fails its smoke check (connection error, timeout, 5xx,
+    or a 4xx the operation doesn't document: a wrong stage path, missing auth or an undeployed
+    route answers 403/404 everywhere; a 404 for a made-up path id is fine) or misses a latency
+    budget from the spec (x-latency-pNN on the operation, or NFR
+    text such as "P95 < 200ms for read APIs" in the ticket constraints / <ticket>-spec.md).
+    Only safe methods (GET/HEAD/OPTIONS) are load-tested: POST/PUT/PATCH/DELETE routes get a
+    single smoke probe, since nothing cleans up what probes write, and their budgets go
+    unchecked unless the input (or ticket) sets "load_test_writes".
+    The first `warmup` probes per route count for the smoke check but not for latency, so one
+    cold start doesn't decide the gate.
+    """
+    def __init__(self, requests_per_route: int = 20, concurrency: int = 8, timeout_s: float = 5.0,
+                 warmup: int = 1):
+        self.requests_per_route = requests_per_route
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self.warmup = warmup
+
+    def run(self, input: Dict) -> Dict:
+        """
+        input:
+        {
+          "base_url": "https://abc.execute-api.us-east-1.amazonaws.com/prod",  # or COPILOT_DEPLOY_BASE_URL
+          "openapi_path": "docs/specs/TKT-DEMO-openapi.yaml",
+          "constraints": ["P95 < 200ms for GET /alerts"],  # or via "ticket": {"constraints": [...]}
+          "probes": {"PATCH /alerts/{id}": {"path": {"id": "..."}, "body": {...}}},
+          "requests_per_route": 20, "concurrency": 8,
+          "load_test_writes": False  # True: fire requests_per_route at mutating routes too
+        }
+        """
+        base_url = input.get("base_url") or os.getenv("COPILOT_DEPLOY_BASE_URL")
+        openapi_path = input.get("openapi_path")
+        if not base_url or not openapi_path:
+            print("[DeploymentAgent] No base_url/openapi_path given. Skipping smoke and latency checks.")
+            return {"status": "ok", "verified": False, "promote": None,
+                    "reason": "no deployed endpoint to verify"}
+
+        doc = load_openapi(openapi_path)
+        budgets = latency_budgets(doc, collect_constraints(input, openapi_path), doc.base_path)
+        root = base_url.rstrip("/") + doc.base_path.rstrip("/")
+        overrides = input.get("probes") or {}
+        probes = [build_probe(doc, method, route, op, overrides.get(f"{method} {route}"))
+                  for method, route, op in doc.iter_operations()]
+        n = input.get("requests_per_route", self.requests_per_route)
+        load_test_writes = input.get("load_test_writes", (input.get("ticket") or {}).get("load_test_writes", False))
+        load_tested = {(p["method"], p["route"]): load_test_writes or p["method"] in SAFE_METHODS for p in probes}
+        count = {key: n if tested else 1 for key, tested in load_tested.items()}
+
+        with tracing.span("deploy.verify", base_url=base_url, routes=len(probes), requests=sum(count.values())):
+            with ThreadPoolExecutor(max_workers=input.get("concurrency", self.concurrency),
+                                    thread_name_prefix="probe") as pool:
+                # Round-robin over routes so every route sees the same concurrent load
+                futures = [(probe, i, pool.submit(self._send, root, probe)) for i in range(n) for probe in probes
+                           if i < count[(probe["method"], probe["route"])]]
+                samples = {(p["method"], p["route"]): [] for p in probes}
+                for probe, i, future in futures:
+                    samples[(probe["method"], probe["route"])].append((i, future.result()))
+
+        routes, violations, failures = [], [], []
+        for probe in probes:
+            key = (probe["method"], probe["route"])
+            route = self._summarize(probe, samples[key], budgets, load_tested[key])
+            routes.append(route)
+            failures += [f"{probe['method']} {probe['route']}: {e}" for e in route["errors"][:1]]
+            violations += [dict(b, method=probe["method"], route=probe["route"])
+                           for b in route["budgets"] if b["ok"] is False]
+
+        promote = not failures and not violations
+        for line in failures:
+            print(f"[DeploymentAgent] Smoke check failed: {line}")
+        for v in violations:
+            print(f"[DeploymentAgent] {v['method']} {v['route']} p{v['percentile']:g} "
+                  f"{v['observed_ms']}ms exceeds its {v['budget_ms']:g}ms budget ({v['source']})")
+        return {
+            "status": "ok" if promote else "blocked",
+            "verified": True,
+            "promote": promote,
+            "base_url": base_url,
+            "routes": routes,
+            "smoke_failures": failures,
+            "violations": violations,
+        }
+
+    def _send(self, root: str, probe: Dict) -> Dict:
+        data = probe["body"].encode("utf-8") if probe["body"] is not None else None
+        request = urllib.request.Request(root + probe["path"], data=data, method=probe["method"],
+                                         headers={"Content-Type": "application/json", "Accept": "application/json"})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except Exception as e:
+            return {"status": None, "error": f"{type(e).__name__}: {e}",
+                    "latency_ms": (time.perf_counter() - start) * 1000}
+        return {"status": status, "error": None, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    def _summarize(self, probe: Dict, samples, budgets: Dict, load_tested: bool = True) -> Dict:
+        codes: Dict[str, int] = {}
+        errors = []
+        for _, result in samples:
+            if result["status"] is None:
+                errors.append(result["error"])
+                continue
+            code = str(result["status"])
+            codes[code] = codes.get(code, 0) + 1
+            if result["status"] >= 500:
+                errors.append(f"HTTP {code}")
+            elif (result["status"] >= 400 and code not in probe["documented"]
+                  and "default" not in probe["documented"] and not (code == "404" and probe["synthetic_ids"])):
+                errors.append(f"HTTP {code} (not a documented response)")
+        latencies = sorted(r["latency_ms"] for i, r in samples if i >= self.warmup and r["status"] is not None)
+        if not latencies:  # too few probes to discard the warm-up
+            latencies = sorted(r["latency_ms"] for _, r in samples if r["status"] is not None)
+
+        method, route = probe["method"], probe["route"]
+        checks = []
+        for (b_method, b_route, pct), budget in sorted(budgets.items()):
+            if (b_method, b_route) != (method, route):
+                continue
+            observed = percentile(latencies, pct) if load_tested else None
+            check = {
+                "percentile": pct,
+                "budget_ms": budget["budget_ms"],
+                "observed_ms": round(observed, 2) if observed is not None else None,
+                "ok": observed is not None and observed <= budget["budget_ms"],
+                "source": budget["source"],
+            }
+            if not load_tested:
+                check.update(ok=None, skipped="writes aren't load-tested (set load_test_writes)")
+            checks.append(check)
+        p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+        return {
+            "method": method,
+            "route": route,
+            "requests": len(samples),
+            "load_tested": load_tested,
+            "status_codes": codes,
+            "undocumented": sorted(c for c in codes if c not in probe["documented"] and "default" not in probe["documented"]),
+            "errors": errors,
+            "p50_ms": round(p50, 2) if p50 is not None else None,
+            "p95_ms": round(p95, 2) if p95 is not None else None,
+            "max_ms": round(latencies[-1], 2) if latencies else None,
+            "budgets": checks,
+        }
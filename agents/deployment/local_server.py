@@ -0,0 +1,147 @@
+import argparse
+import importlib.util
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from agents.common.openapi import OpenApiDocument, load_openapi
+
+
+def _route_pattern(route: str):
+    # "/alerts/{id}" -> ^/alerts/(?P<id>[^/]+)$
+    parts = re.split(r"(\{[^}/]+\})", route)
+    regex = "".join(f"(?P<{p[1:-1]}>[^/]+)" if p.startswith("{") else re.escape(p) for p in parts)
+    return re.compile(f"^{regex}/?$")
+
+
+def load_handler_module(service_dir):
+    path = Path(service_dir) / "handler.py"
+    spec = importlib.util.spec_from_file_location(f"_local_{Path(service_dir).name.replace('-', '_')}_handler", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LambdaProxyServer:
+    """
+    Serves a service's handler.py over HTTP the way API Gateway's Lambda proxy integration
+    would: each request under the spec's base path is matched to an OpenAPI operation,
+    turned into a proxy event (path/query parameters, body) and dispatched to the handler
+    function named by the operation's operationId (/health -> health). For offline smoke
+    and latency tests of DeploymentAgent; it is not a production server.
+    """
+    def __init__(self, service_dir, openapi_path, host: str = "127.0.0.1", port: int = 0):
+        self.doc: OpenApiDocument = load_openapi(openapi_path)
+        self.module = load_handler_module(service_dir)
+        self.base_path = self.doc.base_path.rstrip("/")
+        self.routes: List[Tuple[str, str, object, Optional[object]]] = []
+        for method, route, op in self.doc.iter_operations():
+            name = op.get("operationId") or ("health" if route == "/health" else None)
+            fn = getattr(self.module, name, None) if name else None
+            self.routes.append((method, route, _route_pattern(route), fn))
+        self._server = ThreadingHTTPServer((host, port), self._request_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="lambda-proxy")
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def dispatch(self, method: str, url: str, headers: Dict, body: Optional[str]) -> Tuple[int, Dict, str]:
+        parts = urlsplit(url)
+        path = parts.path
+        if self.base_path and path.startswith(self.base_path + "/"):
+            path = path[len(self.base_path):]
+        elif self.base_path:
+            return 404, {}, json.dumps({"message": "Not Found"})
+
+        allowed = False
+        for op_method, route, pattern, fn in self.routes:
+            m = pattern.match(path)
+            if not m:
+                continue
+            allowed = True
+            if op_method != method:
+                continue
+            if fn is None:
+                return 501, {}, json.dumps({"message": f"no handler for {method} {route}"})
+            event = {
+                "resource": route,
+                "path": parts.path,
+                "httpMethod": method,
+                "headers": headers,
+                "queryStringParameters": dict(parse_qsl(parts.query)) or None,
+                "pathParameters": m.groupdict() or None,
+                "body": body or None,
+                "isBase64Encoded": False,
+                "requestContext": {"stage": "local", "resourcePath": route, "httpMethod": method},
+            }
+            try:
+                response = fn(event, None)
+            except Exception as e:
+                return 502, {}, json.dumps({"message": f"handler raised {type(e).__name__}: {e}"})
+            return response.get("statusCode", 200), response.get("headers") or {}, response.get("body") or ""
+        if allowed:
+            return 405, {}, json.dumps({"message": "Method Not Allowed"})
+        return 404, {}, json.dumps({"message": "Not Found"})
+
+    def _request_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else None
+                status, headers, payload = server.dispatch(self.command, self.path, dict(self.headers), body)
+                data = payload.encode("utf-8")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a service's handler.py locally behind its OpenAPI routes")
+    parser.add_argument("service_dir", nargs="?", default="services/customer-alerts")
+    parser.add_argument("--openapi", default="docs/specs/TKT-DEMO-openapi.yaml")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    server = LambdaProxyServer(args.service_dir, args.openapi, port=args.port)
+    print(f"[LocalServer] Serving {args.service_dir} at {server.base_url}{server.base_path}")
+    server.serve_forever()
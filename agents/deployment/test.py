@@ -1 +1,38 @@
-print("hello world")
+"""
+Smoke and latency gate for a deployed API (exits 1 when promotion would be blocked):
+
+    python agents/deployment/test.py --base-url https://abc.execute-api.us-east-1.amazonaws.com/prod
+    python agents/deployment/test.py --local services/customer-alerts   # handler.py behind a local server
+
+With --local the handler talks to whatever DynamoDB table ALERTS_TABLE and the AWS credentials point at.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath("."))
+
+from agents.deployment.agent import DeploymentAgent
+from agents.deployment.local_server import LambdaProxyServer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url")
+    target.add_argument("--local", metavar="SERVICE_DIR")
+    parser.add_argument("--openapi", default="docs/specs/TKT-DEMO-openapi.yaml")
+    parser.add_argument("--requests", type=int, default=20, help="probes per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--constraint", action="append", help='e.g. "P95 < 200ms for GET /alerts"')
+    args = parser.parse_args()
+
+    request = {"openapi_path": args.openapi, "requests_per_route": args.requests,
+               "concurrency": args.concurrency, "constraints": args.constraint or []}
+    if args.local:
+        with LambdaProxyServer(args.local, args.openapi) as server:
+            out = DeploymentAgent().run(dict(request, base_url=server.base_url))
+    else:
+        out = DeploymentAgent().run(dict(request, base_url=args.base_url))
+    print(json.dumps(out, indent=2))
+    sys.exit(0 if out["promote"] else 1)
@@ -1,11 +1,20 @@
 import os
+import pprint
 from pathlib import Path
 from typing import Dict
 
+from agents.common import lambda_profile
+from agents.common.emitter import ArtifactEmitter
+from agents.common.manifest import Manifest, file_hash, inputs_hash
+from agents.common.nfr import collect_constraints, spec_md_for
+from agents.common.openapi import load_openapi
+from agents.devops_iac.packager import build_package
+
 CDK_REQUIREMENTS = """\
 aws-cdk-lib==2.132.0
 constructs>=10.0.0,<11.0.0
 boto3
+PyYAML  # the "Build Lambda package" step runs agents.devops_iac.packager, which reads the spec
 pytest
 """
 
@@ -27,17 +36,66 @@ AlertsApiStack(app, "AlertsApiStack", env=env)
 app.synth()
 """
 
-STACK_PY = """\
+STACK_HEADER = """\
 from aws_cdk import (
+    CfnOutput,
     Duration,
     RemovalPolicy,
     Stack,
-    aws_apigateway as apigw,
+{api_imports}
     aws_lambda as _lambda,
     aws_dynamodb as ddb,
 )
 from constructs import Construct
 
+# Rendered by DevOpsIacAgent from the OpenAPI routes and the performance profile
+# (same per-function settings as the service's serverless.yml).
+# ASSET_PATH is the pruned, precompiled zip from agents/devops_iac/packager.py.
+ASSET_PATH = {asset_path!r}
+ARCHITECTURE = {architecture!r}
+FUNCTIONS = {functions}
+
+
+def _construct_id(name: str) -> str:
+    return "".join(part.capitalize() for part in name.split("_")) + "Fn"
+
+
+def _lambda_targets(scope: Construct, table):
+    \"\"\"
+    One function per route; yields (spec, function, invoke target). Functions with
+    provisioned concurrency are invoked through a warm "live" alias.
+    \"\"\"
+    code = _lambda.Code.from_asset(ASSET_PATH)
+    architecture = _lambda.Architecture.ARM_64 if ARCHITECTURE == "arm64" else _lambda.Architecture.X86_64
+    for spec in FUNCTIONS:
+        fn_id = _construct_id(spec["name"])
+        fn = _lambda.Function(
+            scope, fn_id,
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            architecture=architecture,
+            handler=spec["handler"],
+            code=code,
+            memory_size=spec["memory_size"],
+            timeout=Duration.seconds(spec["timeout"]),
+            reserved_concurrent_executions=spec["reserved_concurrency"],
+            environment={{
+                "TABLE_NAME": table.table_name,
+                "ALERTS_TABLE": table.table_name,
+            }},
+        )
+        table.grant_read_write_data(fn)
+
+        target = fn
+        if spec["provisioned_concurrency"]:
+            target = _lambda.Alias(
+                scope, f"{{fn_id}}Live",
+                alias_name="live",
+                version=fn.current_version,
+                provisioned_concurrent_executions=spec["provisioned_concurrency"],
+            )
+        yield spec, fn, target
+
+
 class AlertsApiStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
@@ -49,44 +107,81 @@ class AlertsApiStack(Stack):
             billing_mode=ddb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.DESTROY
         )
+"""
 
-        fn = _lambda.Function(
-            self, "AlertsHandler",
-            runtime=_lambda.Runtime.PYTHON_3_11,
-            handler="handler.health",
-            code=_lambda.Code.from_asset("../services/customer-alerts"),
-            timeout=Duration.seconds(10),
-            environment={
-                "TABLE_NAME": table.table_name,
-            },
-        )
-        table.grant_read_write_data(fn)
+REST_API_IMPORTS = "    aws_apigateway as apigw,"
+
+REST_API_BODY = """\
 
+        # REST API. GET routes with a cache TTL are served from the stage cache, keyed on
+        # their path and query parameters.
+        cached = [f for f in FUNCTIONS if f["cache_ttl"]]
         api = apigw.RestApi(
             self, "AlertsApi",
             deploy=True,
             cloud_watch_role=True,
+            deploy_options=apigw.StageOptions(
+                cache_cluster_enabled=bool(cached),
+                cache_cluster_size={cache_cluster_size!r} if cached else None,
+                method_options={{
+                    f"{{f['path']}}/{{f['method']}}": apigw.MethodDeploymentOptions(
+                        caching_enabled=True, cache_ttl=Duration.seconds(f["cache_ttl"]))
+                    for f in cached
+                }},
+            ),
             default_cors_preflight_options=apigw.CorsOptions(
                 allow_origins=apigw.Cors.ALL_ORIGINS,
-                allow_methods=["GET","POST","PATCH","OPTIONS"]
+                allow_methods=sorted({{f["method"] for f in FUNCTIONS}} | {{"OPTIONS"}})
             )
         )
 
-        base = api.root.add_resource("api")
-        base.add_resource("health").add_method("GET", apigw.LambdaIntegration(fn))
+        self.functions = {{}}
+        for spec, fn, target in _lambda_targets(self, table):
+            api.root.resource_for_path(spec["path"]).add_method(
+                spec["method"],
+                apigw.LambdaIntegration(target, cache_key_parameters=spec["cache_keys"] or None),
+                request_parameters={{key: False for key in spec["cache_keys"]}} or None,
+            )
+            self.functions[spec["name"]] = fn
+
+        self.api_url = api.url
 
-        # NOTE: The handler currently routes only /health.
-        # After you implement alert routes in handler.py, split functions or add Lambda proxy.
-        alerts = base.add_resource("alerts")
-        alerts.add_method("GET", apigw.LambdaIntegration(fn))
-        alerts.add_method("POST", apigw.LambdaIntegration(fn))
-        alert_id = alerts.add_resource("{id}")
-        alert_id.add_method("PATCH", apigw.LambdaIntegration(fn))
+        # Output is visible in 'cdk deploy'
+        CfnOutput(self, "ApiBaseUrl", value=api.url)
+"""
+
+HTTP_API_IMPORTS = """\
+    aws_apigatewayv2 as apigwv2,
+    aws_apigatewayv2_integrations as integrations,"""
+
+HTTP_API_BODY = """\
+
+        # HTTP API (API Gateway v2): lower latency and cost than REST for a plain JSON API.
+        # Payload format 1.0 keeps the REST proxy event shape the handlers expect.
+        api = apigwv2.HttpApi(
+            self, "AlertsApi",
+            cors_preflight=apigwv2.CorsPreflightOptions(
+                allow_origins=["*"],
+                allow_methods=[getattr(apigwv2.CorsHttpMethod, m)
+                               for m in sorted({{f["method"] for f in FUNCTIONS}} | {{"OPTIONS"}})],
+            ),
+        )
+
+        self.functions = {{}}
+        for spec, fn, target in _lambda_targets(self, table):
+            api.add_routes(
+                path=spec["path"],
+                methods=[getattr(apigwv2.HttpMethod, spec["method"])],
+                integration=integrations.HttpLambdaIntegration(
+                    f"{{_construct_id(spec['name'])}}Integration", target,
+                    payload_format_version=apigwv2.PayloadFormatVersion.VERSION_1_0,
+                ),
+            )
+            self.functions[spec["name"]] = fn
 
         self.api_url = api.url
 
         # Output is visible in 'cdk deploy'
-        from aws_cdk import CfnOutput
         CfnOutput(self, "ApiBaseUrl", value=api.url)
 """
 
@@ -95,8 +190,10 @@ PYPROJECT_TOML = """\
 pythonpath = ["services/customer-alerts"]
 """
 
+WORKFLOW_PATH = ".github/workflows/ci-cd.yml"
+
 GHA_WORKFLOW = """\
-name: ci-cd
+name: {name}
 
 on:
   push:
@@ -115,7 +212,7 @@ jobs:
           python-version: "3.11"
 
       - name: Install service deps & run tests
-        working-directory: services/customer-alerts
+        working-directory: {service_dir}
         run: |
           python -m pip install -U pip
           if [ -f requirements.txt ]; then pip install -r requirements.txt; fi
@@ -135,8 +232,8 @@ jobs:
       - name: Configure AWS credentials (OIDC)
         uses: aws-actions/configure-aws-credentials@v4
         with:
-          role-to-assume: ${{ secrets.AWS_CDK_ROLE_ARN }}
-          aws-region: ${{ secrets.AWS_DEFAULT_REGION || 'us-east-1' }}
+          role-to-assume: ${{{{ secrets.AWS_CDK_ROLE_ARN }}}}
+          aws-region: ${{{{ secrets.AWS_DEFAULT_REGION || 'us-east-1' }}}}
 
       - name: Set up Python
         uses: actions/setup-python@v5
@@ -147,55 +244,189 @@ jobs:
         run: |
           npm i -g aws-cdk
           python -m pip install -U pip
-          python -m pip install -r infra/cdk/requirements.txt
+          python -m pip install -r {cdk_dir}/requirements.txt
+
+      - name: Build Lambda package
+        run: python -m agents.devops_iac.packager {service_dir} --out-dir {package_dir} --force
 
       - name: CDK synth
-        working-directory: infra/cdk
+        working-directory: {cdk_dir}
         run: cdk synth
 
       - name: CDK deploy
-        working-directory: infra/cdk
+        working-directory: {cdk_dir}
         run: cdk deploy --require-approval never
 """
 
+MAX_CACHE_TTL_S = 3600  # API Gateway stage cache limit
+
+
 class DevOpsIacAgent:
     """
     Generates a CDK (Python) app and a GitHub Actions workflow for CI/CD.
     """
-    def __init__(self, cdk_dir: str = "infra/cdk"):
+    def __init__(self, cdk_dir: str = "infra/cdk", manifest: Manifest = None, workflow_path: str = WORKFLOW_PATH):
         self.cdk_dir = Path(cdk_dir)
+        self.workflow_path = Path(workflow_path)
+        self.manifest = manifest or Manifest()
 
     def run(self, input: Dict):
         """
         input keys (optional):
           region: str
           service_dir: str
+          package_dir: str             # where the Lambda zip is built (default .build/lambda)
+          package: bool                # build the zip now (default True); False when the code isn't generated yet
+          openapi_path: str            # routes to wire up (default: the demo spec, if present)
+          constraints: [str]           # latency NFRs, as for CodeGeneratorAgent
+          performance_profile: dict    # explicit overrides, see lambda_profile.build_profile
+          api_type: "rest" | "http"    # API Gateway REST API (default) or HTTP API (v2)
+          cache: {"GET /route": ttl_s} # REST only: stage-cache TTLs, on top of x-cache-ttl in the spec
+          cache_cluster_size: str      # REST only: stage cache size in GB (default "0.5")
+          bus: ArtifactBus             # read the spec from it and put the stack files on it
+          force: bool   # regenerate even if nothing changed / overwrite hand edits
+          dry_run: bool # don't write; return a unified diff of what would change
         """
+        input = dict(input)
+        bus = input.pop("bus", None)
         region = input.get("region", "us-east-1")
         service_dir = Path(input.get("service_dir", "services/customer-alerts"))
-
-        # Create CDK skeleton
-        (self.cdk_dir / "stacks").mkdir(parents=True, exist_ok=True)
-        (self.cdk_dir / "requirements.txt").write_text(CDK_REQUIREMENTS, encoding="utf-8")
-        (self.cdk_dir / "app.py").write_text(APP_PY, encoding="utf-8")
-        (self.cdk_dir / "stacks" / "alerts_api_stack.py").write_text(STACK_PY, encoding="utf-8")
-        (self.cdk_dir / "pyproject.toml").write_text(PYPROJECT_TOML, encoding="utf-8")
+        openapi_path = Path(input.get("openapi_path", "docs/specs/TKT-DEMO-openapi.yaml"))
+        package_dir = Path(input.get("package_dir", ".build/lambda"))
+        force = input.get("force", False)
+        dry_run = input.get("dry_run", False)
+
+        # The package tracks the service sources, so it's rebuilt (or skipped) on its own
+        package = None
+        if input.get("package", True) and not dry_run and bus is not None and bus.files(service_dir):
+            bus.flush()  # the packager reads the service from disk
+        if input.get("package", True) and not dry_run and service_dir.is_dir():
+            architecture = (input.get("performance_profile") or {}).get(
+                "architecture", lambda_profile.DEFAULT_PROFILE["architecture"])
+            package = build_package(service_dir, package_dir, architecture=architecture,
+                                    manifest=self.manifest, force=force)
+            print(f"[DevOpsIac] Lambda package {package['path']}: {package['size_bytes']} bytes, "
+                  f"sha256 {package['sha256'][:12]}{' (unchanged)' if package['skipped'] else ''}")
+
+        # Skip if the inputs and generator are unchanged and nothing was deleted
+        stage = f"devops_iac:{self.cdk_dir.as_posix()}"
+        input_hash = inputs_hash(input, openapi_path, spec_md_for(openapi_path), Path(__file__),
+                                 Path(lambda_profile.__file__),
+                                 hasher=bus.file_hash if bus is not None else file_hash)
+        if not force and self.manifest.is_fresh(stage, input_hash):
+            print(f"[DevOpsIac] {self.cdk_dir} up to date. Skipping.")
+            return dict(self.manifest.entry(stage)["result"], skipped=True, package=package)
+        hand_edited = [] if force else self.manifest.hand_edited(stage)
+
+        # Same routes + performance profile as CodeGeneratorAgent renders into serverless.yml
+        if bus is not None:
+            openapi = bus.openapi(openapi_path) if bus.exists(openapi_path) else None
+        else:
+            openapi = load_openapi(openapi_path) if openapi_path.is_file() else None
+        if openapi is None:
+            print(f"[DevOpsIac] {openapi_path} not found. Stack will only expose /health.")
+        profile = lambda_profile.build_profile(
+            openapi, collect_constraints(input, openapi_path, bus), input.get("performance_profile"))
+
+        files = {
+            # CDK skeleton
+            self.cdk_dir / "requirements.txt": CDK_REQUIREMENTS,
+            self.cdk_dir / "app.py": APP_PY,
+            self.cdk_dir / "stacks" / "alerts_api_stack.py": self._render_stack(
+                openapi, profile, package_dir / f"{service_dir.name}.zip", api_type=input.get("api_type", "rest"),
+                cache=input.get("cache"), cache_cluster_size=input.get("cache_cluster_size", "0.5")),
+            self.cdk_dir / "pyproject.toml": PYPROJECT_TOML,
+            # GitHub Actions workflow
+            self.workflow_path: GHA_WORKFLOW.format(
+                name=self.workflow_path.stem, service_dir=service_dir.as_posix(),
+                cdk_dir=self.cdk_dir.as_posix(), package_dir=package_dir.as_posix()),
+        }
+        emitter = bus.emitter() if bus is not None and not dry_run else ArtifactEmitter(dry_run=dry_run)
+        for path, content in files.items():
+            if str(path) in hand_edited:
+                print(f"[DevOpsIac] {path} was edited by hand. Keeping it (pass force=True to overwrite).")
+                emitter.keep(path)
+                continue
+            emitter.emit(path, content)
 
         # Ensure service dir exists
-        service_dir.mkdir(parents=True, exist_ok=True)
-
-        # GitHub Actions workflow
-        workflows = Path(".github/workflows")
-        workflows.mkdir(parents=True, exist_ok=True)
-        (workflows / "ci-cd.yml").write_text(GHA_WORKFLOW, encoding="utf-8")
+        if not dry_run:
+            service_dir.mkdir(parents=True, exist_ok=True)
 
-        return {
+        result = {
             "status": "ok",
             "cdk_dir": str(self.cdk_dir),
-            "workflow": ".github/workflows/ci-cd.yml",
+            "workflow": self.workflow_path.as_posix(),
+            "performance_profile": profile,
             "notes": [
                 "Set GitHub secret AWS_CDK_ROLE_ARN to an IAM Role ARN trusted for GitHub OIDC.",
                 "Set AWS_DEFAULT_REGION secret if different from us-east-1.",
-                "Run: npm i -g aws-cdk && pip install -r infra/cdk/requirements.txt && cdk bootstrap"
+                f"Run: npm i -g aws-cdk && pip install -r {self.cdk_dir.as_posix()}/requirements.txt && cdk bootstrap"
             ]
-        }
\ No newline at end of file
+        }
+        if not dry_run:
+            record = lambda: self.manifest.record(stage, input_hash, list(files), result, hand_edited)
+            if bus is not None:
+                bus.on_flush(record)  # the manifest hashes the files as written
+            else:
+                record()
+        return dict(result, skipped=False, hand_edited=hand_edited, package=package, files=emitter.summary())
+
+    def _cache_settings(self, openapi, fn: Dict, overrides: Dict) -> Dict:
+        """
+        Stage-cache TTL and cache keys for one route. Only GET routes are cached: those marked
+        `x-cache-ttl: <seconds>` in the spec, or listed in input["cache"] as {"GET /alerts": 60}
+        (0 turns caching off). Every path and query parameter is a cache key, so responses for
+        different users/ids never collide.
+        """
+        if fn["method"] != "GET":
+            return {"cache_ttl": 0, "cache_keys": []}
+        op = (openapi.operation(fn["method"], fn["route"]) if openapi else None) or {}
+        ttl = overrides.get(f"GET {fn['route']}", op.get("x-cache-ttl", 0))
+        if not isinstance(ttl, int) or not 0 <= ttl <= MAX_CACHE_TTL_S:
+            raise ValueError(f"Cache TTL for GET {fn['route']} must be 0..{MAX_CACHE_TTL_S} seconds, got {ttl!r}")
+        keys = []
+        if ttl:
+            path_item = openapi.paths.get(fn["route"]) or {}
+            for p in list(path_item.get("parameters") or []) + list(op.get("parameters") or []):
+                p = openapi.deref(p)
+                location = {"path": "path", "query": "querystring"}.get(p.get("in"))
+                if location:
+                    keys.append(f"method.request.{location}.{p['name']}")
+        return {"cache_ttl": ttl, "cache_keys": sorted(set(keys))}
+
+    def _render_stack(self, openapi, profile: Dict, package_path: Path, api_type: str = "rest",
+                      cache: Dict = None, cache_cluster_size: str = "0.5") -> str:
+        functions = []
+        for fn in lambda_profile.lambda_functions(openapi):
+            settings = profile["functions"][fn["name"]]
+            entry = {
+                "name": fn["name"],
+                "handler": fn["handler"],
+                "method": fn["method"],
+                "path": fn["path"],
+                "memory_size": settings["memory_size"],
+                "timeout": settings["timeout"],
+                "reserved_concurrency": settings.get("reserved_concurrency"),
+                "provisioned_concurrency": settings.get("provisioned_concurrency") or 0,
+            }
+            if api_type == "rest":
+                entry.update(self._cache_settings(openapi, fn, cache or {}))
+            functions.append(entry)
+
+        if api_type == "http":
+            if cache and any(cache.values()):
+                print("[DevOpsIac] HTTP APIs have no stage cache. Ignoring cache settings.")
+            imports, body = HTTP_API_IMPORTS, HTTP_API_BODY.format()
+        elif api_type == "rest":
+            imports, body = REST_API_IMPORTS, REST_API_BODY.format(cache_cluster_size=cache_cluster_size)
+        else:
+            raise ValueError(f"api_type must be 'rest' or 'http', got {api_type!r}")
+
+        return STACK_HEADER.format(
+            api_imports=imports,
+            # cdk synth runs from the CDK dir, so the asset path is relative to it
+            asset_path=os.path.relpath(package_path, self.cdk_dir).replace(os.sep, "/"),
+            architecture=profile["architecture"],
+            functions=pprint.pformat(functions, width=100, sort_dicts=False),
+        ) + body
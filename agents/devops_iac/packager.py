@@ -0,0 +1,185 @@
+import argparse
+import compileall
+import csv
+import fnmatch
+import hashlib
+import json
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agents.common import tracing
+from agents.common.lambda_profile import DEV_ONLY, RUNTIME_PROVIDED
+from agents.common.manifest import Manifest, inputs_hash
+
+EXCLUDE = [
+    "tests/*", "test_*.py", "*_test.py", "conftest.py",
+    "__pycache__/*", "*.pyc", "*.pyo", ".pytest_cache/*", ".mypy_cache/*",
+    ".venv/*", "venv/*", "node_modules/*", ".serverless/*", "dist/*", ".build/*",
+    "requirements*.txt", "serverless.yml", "Makefile", "*.md", ".git*", ".copilot*",
+]
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+LAMBDA_TASK_ROOT = "/var/task"
+
+
+def _excluded(rel: str) -> bool:
+    parts = rel.split("/")
+    for pattern in EXCLUDE:
+        if fnmatch.fnmatch(rel, pattern) or fnmatch.fnmatch(parts[-1], pattern):
+            return True
+        # directory patterns ("tests/*") match at any depth
+        if pattern.endswith("/*") and pattern[:-2] in parts[:-1]:
+            return True
+    return False
+
+
+def source_files(service_dir: Path) -> List[Tuple[str, Path]]:
+    files = []
+    for path in sorted(service_dir.rglob("*")):
+        if path.is_file():
+            rel = path.relative_to(service_dir).as_posix()
+            if not _excluded(rel):
+                files.append((rel, path))
+    return files
+
+
+def runtime_requirements(service_dir: Path) -> Tuple[List[str], List[str]]:
+    """
+    Splits requirements.txt into (to_install, left_out) after dropping runtime-provided and dev-only packages.
+    """
+    req = service_dir / "requirements.txt"
+    keep, dropped = [], []
+    if not req.is_file():
+        return keep, dropped
+    for line in req.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        name = re.split(r"[\[<>=!~;\s]", line, 1)[0].lower().replace("_", "-")
+        (dropped if name in RUNTIME_PROVIDED + DEV_ONLY else keep).append(line)
+    return keep, dropped
+
+
+def _install(requirements: List[str], target: Path, architecture: str, python_version: str):
+    platform = "manylinux2014_aarch64" if architecture == "arm64" else "manylinux2014_x86_64"
+    subprocess.run(
+        [sys.executable, "-m", "pip", "install", "--quiet", "--no-compile", "--target", str(target),
+         "--platform", platform, "--implementation", "cp", "--python-version", python_version,
+         "--only-binary=:all:", *requirements],
+        check=True,
+    )
+    prune_runtime_provided(target)
+
+
+def _dist_name(dist_info: Path) -> str:
+    # python_dateutil-2.9.0.post0.dist-info -> python-dateutil
+    return re.split(r"-\d", dist_info.name, 1)[0].lower().replace("_", "-")
+
+
+def prune_runtime_provided(target: Path):
+    """
+    Transitive deps may drag the runtime-provided SDK back in. Each such distribution is
+    removed by its RECORD, which also covers import names that differ from the distribution
+    (python-dateutil -> dateutil/, six -> six.py).
+    """
+    root = target.resolve()
+    for dist_info in sorted(target.glob("*.dist-info")):
+        if _dist_name(dist_info) not in RUNTIME_PROVIDED:
+            continue
+        record = dist_info / "RECORD"
+        rows = csv.reader(record.read_text(encoding="utf-8").splitlines()) if record.is_file() else []
+        for row in rows:
+            path = (target / row[0]).resolve() if row else None
+            if path is not None and root in path.parents and path.is_file():
+                path.unlink()
+        shutil.rmtree(dist_info, ignore_errors=True)
+    # No RECORD to go by: fall back to top-level names matching the distribution
+    for entry in list(target.iterdir()):
+        if entry.name.replace("_", "-").lower().removesuffix(".py") in RUNTIME_PROVIDED:
+            shutil.rmtree(entry) if entry.is_dir() else entry.unlink()
+    for directory in sorted((d for d in target.rglob("*") if d.is_dir()), key=lambda d: len(d.parts), reverse=True):
+        if not any(directory.iterdir()):
+            directory.rmdir()
+
+
+def build_package(service_dir, out_dir: str = ".build/lambda", architecture: str = "arm64",
+                  python_version: str = "3.11", manifest: Optional[Manifest] = None, force: bool = False) -> Dict:
+    """
+    Builds <out_dir>/<service>.zip for Lambda:
+      - only runtime sources (no tests, caches, build/deploy files)
+      - requirements minus runtime-provided (boto3 & co.) and dev-only packages
+      - bytecode precompiled with hash-based (mtime-free) .pyc, when building on the target Python
+      - reproducible: sorted entries, fixed timestamps/permissions, so the same inputs give the same sha256
+    Skips the build when the sources and settings are unchanged (manifest stage "package:<service_dir>").
+    """
+    service_dir = Path(service_dir)
+    manifest = manifest or Manifest()
+    zip_path = Path(out_dir) / f"{service_dir.name}.zip"
+    files = source_files(service_dir)
+    to_install, left_out = runtime_requirements(service_dir)
+
+    stage = f"package:{service_dir.as_posix()}"
+    input_hash = inputs_hash([rel for rel, _ in files], *[p for _, p in files], to_install,
+                             architecture, python_version, Path(__file__))
+    if not force and manifest.is_fresh(stage, input_hash):
+        return dict(manifest.entry(stage)["result"], skipped=True)
+
+    precompile = f"{sys.version_info[0]}.{sys.version_info[1]}" == python_version
+    with tempfile.TemporaryDirectory() as tmp:
+        staging = Path(tmp) / "pkg"
+        staging.mkdir()
+        for rel, path in files:
+            dest = staging / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, dest)
+        if to_install:
+            _install(to_install, staging, architecture, python_version)
+        if precompile:
+            compileall.compile_dir(
+                str(staging), quiet=1, ddir=LAMBDA_TASK_ROOT,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+
+        zip_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_zip = zip_path.with_name(f".{zip_path.name}.tmp")
+        entries = sorted(p for p in staging.rglob("*") if p.is_file())
+        with tracing.span("artifact.write", path=str(zip_path), files=len(entries)):
+            with zipfile.ZipFile(tmp_zip, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+                for path in entries:
+                    info = zipfile.ZipInfo(path.relative_to(staging).as_posix(), date_time=ZIP_EPOCH)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    zf.writestr(info, path.read_bytes())
+            os.replace(tmp_zip, zip_path)
+
+    data = zip_path.read_bytes()
+    result = {
+        "path": str(zip_path),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size_bytes": len(data),
+        "files": len(entries),
+        "dependencies": to_install,
+        "left_out": left_out,
+        "precompiled": precompile,
+    }
+    manifest.record(stage, input_hash, [zip_path], result)
+    return dict(result, skipped=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a minimal, reproducible Lambda zip for a service")
+    parser.add_argument("service_dir")
+    parser.add_argument("--out-dir", default=".build/lambda")
+    parser.add_argument("--architecture", default="arm64", choices=["arm64", "x86_64"])
+    parser.add_argument("--python-version", default="3.11")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(build_package(args.service_dir, args.out_dir, args.architecture,
+                                   args.python_version, force=args.force), indent=2))
@@ -1,3 +1,267 @@
-class Agent:
-    def run(self, input):
-        return {"status": "ok", "message": "agent placeholder"}
\ No newline at end of file
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from agents.metrics.sketch import DDSketch
+
+METRICS_SNAPSHOT = ".copilot-metrics.json"
+TICKET = "ticket"  # pseudo-stage: one event per ticket, duration_s = lead time
+SNAPSHOT_VERSION = 1
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+class StageStats:
+    """
+    Counters by outcome plus a duration sketch, for one stage (in one window or all-time).
+    """
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.sketch = DDSketch(relative_accuracy)
+        self.outcomes: Dict[str, int] = {}
+
+    def add(self, duration_s: float, status: str):
+        self.sketch.add(max(0.0, duration_s))
+        self.outcomes[status] = self.outcomes.get(status, 0) + 1
+
+    def merge(self, other: "StageStats"):
+        self.sketch.merge(other.sketch)
+        for status, n in other.outcomes.items():
+            self.outcomes[status] = self.outcomes.get(status, 0) + n
+
+    def summary(self) -> Dict:
+        count = sum(self.outcomes.values())
+        failures = count - self.outcomes.get("ok", 0)
+        return {
+            "count": count,
+            "failures": failures,
+            "failure_rate": round(failures / count, 4) if count else None,
+            "p50_s": _round(self.sketch.quantile(0.5)),
+            "p95_s": _round(self.sketch.quantile(0.95)),
+            "mean_s": _round(self.sketch.mean()),
+            "outcomes": dict(self.outcomes),
+        }
+
+    def to_dict(self) -> Dict:
+        return {"sketch": self.sketch.to_dict(), "outcomes": self.outcomes}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StageStats":
+        stats = cls()
+        stats.sketch = DDSketch.from_dict(data["sketch"])
+        stats.outcomes = dict(data["outcomes"])
+        return stats
+
+
+class FileSnapshotStore:
+    def __init__(self, path: str = METRICS_SNAPSHOT):
+        self.path = Path(path)
+        self.location = str(self.path)
+
+    def load(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def save(self, data: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+class S3SnapshotStore:
+    """
+    Snapshots as one JSON object in S3 (or anything speaking its API: MinIO, moto).
+    """
+    def __init__(self, bucket: str, key: str = "metrics/snapshot.json", client=None,
+                 region: Optional[str] = None, endpoint_url: Optional[str] = None):
+        if client is None:
+            import boto3  # only when this backend is actually selected
+            client = boto3.client("s3", region_name=region or os.getenv("AWS_REGION", "us-east-1"),
+                                  endpoint_url=endpoint_url or os.getenv("AWS_ENDPOINT_URL_S3"))
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.location = f"s3://{bucket}/{key}"
+
+    def load(self) -> Optional[Dict]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return json.loads(obj["Body"].read())
+
+    def save(self, data: Dict):
+        self.client.put_object(Bucket=self.bucket, Key=self.key, Body=json.dumps(data).encode("utf-8"),
+                               ContentType="application/json")
+
+
+def snapshot_store(location: Optional[str] = None):
+    """
+    "s3://bucket/key" -> S3SnapshotStore, anything else is a local file.
+    Defaults to COPILOT_METRICS_SNAPSHOT, then .copilot-metrics.json.
+    """
+    location = location or os.getenv("COPILOT_METRICS_SNAPSHOT") or METRICS_SNAPSHOT
+    if location.startswith("s3://"):
+        bucket, _, key = location[len("s3://"):].partition("/")
+        return S3SnapshotStore(bucket, key or "metrics/snapshot.json")
+    return FileSnapshotStore(location)
+
+
+class MetricsAgent:
+    """
+    Streaming productivity metrics. Each event is one finished stage run of a ticket:
+
+        {"ticket_id", "stage", "status", "duration_s", "ts"}
+
+    (stage "ticket" carries the ticket's outcome with duration_s = lead time.) Events update
+    per-stage outcome counters and DDSketch duration sketches, all-time and per time window
+    (window_s wide, newest max_windows kept), so memory is bounded and reports never rescan
+    history: a report over the last N windows just merges N sketches.
+    State is restored from, and flushed to, a snapshot store (local file or S3).
+    """
+    def __init__(self, store=None, window_s: int = 3600, max_windows: int = 168,
+                 relative_accuracy: float = 0.01, clock=time.time):
+        self.store = store if store is not None else snapshot_store()
+        self.window_s = window_s
+        self.max_windows = max_windows
+        self.relative_accuracy = relative_accuracy
+        self.clock = clock
+        self.totals: Dict[str, StageStats] = {}
+        self.windows: Dict[int, Dict[str, StageStats]] = {}  # window start (epoch s) -> stage -> stats
+        self._lock = threading.Lock()
+        saved = self.store.load()
+        if saved:
+            self.merge(saved)
+
+    def record(self, event: Dict):
+        stage = event["stage"]
+        status = event.get("status", "ok")
+        duration = float(event.get("duration_s") or 0.0)
+        ts = event.get("ts")
+        ts = self.clock() if ts is None else ts
+        start = int(ts // self.window_s) * self.window_s
+        with self._lock:
+            self._stats(self.totals, stage).add(duration, status)
+            window = self.windows.get(start)
+            if window is None:
+                if len(self.windows) >= self.max_windows and start < min(self.windows):
+                    return  # older than anything retained: all-time totals only
+                window = self.windows[start] = {}
+                while len(self.windows) > self.max_windows:
+                    del self.windows[min(self.windows)]
+            self._stats(window, stage).add(duration, status)
+
+    def ingest(self, events: Iterable[Dict]) -> int:
+        n = 0
+        for event in events:
+            self.record(event)
+            n += 1
+        return n
+
+    def _stats(self, table: Dict[str, StageStats], stage: str) -> StageStats:
+        stats = table.get(stage)
+        if stats is None:
+            stats = table[stage] = StageStats(self.relative_accuracy)
+        return stats
+
+    def report(self, last_windows: Optional[int] = None) -> Dict:
+        """
+        Lead time and per-stage p50/p95/failure rate: all-time, or over the last N windows.
+        """
+        with self._lock:
+            if last_windows is None:
+                merged = {stage: stats for stage, stats in self.totals.items()}
+                span = "all"
+            else:
+                since = int(self.clock() // self.window_s - (last_windows - 1)) * self.window_s
+                merged = {}
+                for start, window in self.windows.items():
+                    if start >= since:
+                        for stage, stats in window.items():
+                            if stage not in merged:
+                                merged[stage] = StageStats(self.relative_accuracy)
+                            merged[stage].merge(stats)
+                span = {"from": _iso(since), "windows": last_windows, "window_s": self.window_s}
+            summaries = {stage: stats.summary() for stage, stats in merged.items()}
+        tickets = summaries.pop(TICKET, None) or StageStats().summary()
+        return {
+            "window": span,
+            "lead_time": {
+                "tickets": tickets["count"],
+                "failure_rate": tickets["failure_rate"],
+                "p50_s": tickets["p50_s"],
+                "p95_s": tickets["p95_s"],
+                "mean_s": tickets["mean_s"],
+            },
+            "stages": summaries,
+        }
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "version": SNAPSHOT_VERSION,
+                "window_s": self.window_s,
+                "taken_at": self.clock(),
+                "totals": {stage: stats.to_dict() for stage, stats in self.totals.items()},
+                "windows": {str(start): {stage: stats.to_dict() for stage, stats in window.items()}
+                            for start, window in self.windows.items()},
+            }
+
+    def merge(self, snapshot: Dict):
+        """
+        Folds in another snapshot (a previous run, or another worker's).
+        """
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("window_s") != self.window_s:
+            print(f"[MetricsAgent] Ignoring incompatible snapshot "
+                  f"(version {snapshot.get('version')}, window {snapshot.get('window_s')}s)")
+            return
+        with self._lock:
+            for stage, data in snapshot["totals"].items():
+                self._stats(self.totals, stage).merge(StageStats.from_dict(data))
+            for start, stages in snapshot["windows"].items():
+                window = self.windows.setdefault(int(start), {})
+                for stage, data in stages.items():
+                    self._stats(window, stage).merge(StageStats.from_dict(data))
+            while len(self.windows) > self.max_windows:
+                del self.windows[min(self.windows)]
+
+    def flush(self) -> str:
+        self.store.save(self.snapshot())
+        return self.store.location
+
+    def run(self, input: Dict) -> Dict:
+        """
+        input: optional "events" to ingest and "last_windows" for the report; the snapshot
+        is flushed on every run (the pipeline's report step).
+        """
+        ingested = self.ingest(input.get("events") or [])
+        location = self.flush()
+        out = {
+            "status": "ok",
+            "ingested": ingested,
+            "snapshot": location,
+            "report": self.report(input.get("last_windows")),
+        }
+        ticket = input.get("ticket")
+        if ticket:
+            out["ticket_id"] = ticket.get("id")
+        return out
@@ -2,10 +2,14 @@ import os
 import json
 import time
 import yaml
-import boto3
 from datetime import datetime
 from pathlib import Path
 
+from agents.common import tracing
+from agents.common.bedrock import CircuitOpenError, ResilientBedrockClient
+from agents.common.manifest import Manifest, inputs_hash
+from agents.common.model_router import ModelRouter, default_routes
+
 class SpecWriterAgent:
     """
     Turns a ticket into:
@@ -15,19 +19,29 @@ class SpecWriterAgent:
     Strategy:
       - If BEDROCK configured -> use LLM to write high-quality spec
       - Else -> render from templates + heuristics (fallback)
+
+    Bedrock calls go through ResilientBedrockClient (retries, deadline, circuit breaker),
+    so while Bedrock is degraded we go straight to the fallback instead of waiting on it.
+    Each generation task ("spec", "openapi") is routed to a model by ModelRouter.
     """
 
-    def __init__(self, model_id=None, region=None):
+    def __init__(self, model_id=None, region=None, bedrock_client=None, routes=None, manifest=None, **resilience):
         self.model_id = model_id or os.getenv("BEDROCK_MODEL_ID")
         self.region = region or os.getenv("AWS_REGION", "us-east-1")
+        self.router = ModelRouter(routes if routes is not None else default_routes(self.model_id))
         self.docs_dir = Path("docs/specs")
         self.templates_dir = Path("docs/templates")
         self.docs_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = manifest or Manifest()
 
         self.bedrock = None
         if self.model_id:
             try:
-                self.bedrock = boto3.client("bedrock-runtime", region_name=self.region)
+                raw = bedrock_client
+                if raw is None:
+                    import boto3  # deferred: ~150ms, and only needed when Bedrock is configured
+                    raw = boto3.client("bedrock-runtime", region_name=self.region)
+                self.bedrock = ResilientBedrockClient(raw, **resilience)
             except Exception as e:
                 print(f"[SpecWriter] Bedrock init failed: {e}. Will use fallback.")
 
@@ -40,29 +54,61 @@ class SpecWriterAgent:
              "description": "...",
              "acceptance_criteria": ["...", "..."],
              "constraints": ["...", "..."]
-          }
+          },
+          "force": False,  # regenerate even if nothing changed / overwrite hand edits
+          "bus": None      # an ArtifactBus: hand the files to the next agents instead of writing them
         }
         """
+        bus = input.get("bus")
         ticket = input.get("ticket", {})
         ticket_id = ticket.get("id", f"TKT-{int(time.time())}")
         title = ticket.get("title", "Untitled Feature")
+        force = input.get("force", False)
 
         spec_path = self.docs_dir / f"{ticket_id}-spec.md"
         openapi_path = self.docs_dir / f"{ticket_id}-openapi.yaml"
 
-        if self.bedrock:
+        # Skip regeneration when the ticket, model and templates are unchanged
+        stage = f"spec_writer:{ticket_id}"
+        input_hash = inputs_hash(
+            ticket, self.model_id, Path(__file__),
+            self.templates_dir / "spec_template.md", self.templates_dir / "openapi_skeleton.yaml",
+        )
+        if not force and self.manifest.is_fresh(stage, input_hash):
+            print(f"[SpecWriter] {ticket_id} unchanged. Skipping.")
+            return dict(self.manifest.entry(stage)["result"], skipped=True)
+        hand_edited = [] if force else self.manifest.hand_edited(stage)
+
+        degraded = False  # a model is configured, but this run got the template fallback
+        models = {r.model_id for routes in self.router.routes.values() for r in routes if r.model_id}
+        if self.bedrock and not self.bedrock.available(models):
+            print("[SpecWriter] Bedrock circuit open. Using fallback.")
+            spec_md, openapi_yaml = self._generate_with_fallback(ticket)
+            degraded = True
+        elif self.bedrock:
             try:
                 spec_md, openapi_yaml = self._generate_with_bedrock(ticket)
             except Exception as e:
                 print(f"[SpecWriter] Bedrock generation failed: {e}. Falling back.")
                 spec_md, openapi_yaml = self._generate_with_fallback(ticket)
+                degraded = True
+        elif self.model_id:
+            spec_md, openapi_yaml = self._generate_with_fallback(ticket)
+            degraded = True
         else:
             spec_md, openapi_yaml = self._generate_with_fallback(ticket)
 
-        spec_path.write_text(spec_md, encoding="utf-8")
-        openapi_path.write_text(openapi_yaml, encoding="utf-8")
-
-        return {
+        for path, content in ((spec_path, spec_md), (openapi_path, openapi_yaml)):
+            if str(path) in hand_edited:
+                print(f"[SpecWriter] {path} was edited by hand. Keeping it (pass force=True to overwrite).")
+                continue
+            if bus is not None:
+                bus.put(path, content)
+                continue
+            with tracing.span("artifact.write", path=str(path), bytes=len(content)):
+                path.write_text(content, encoding="utf-8")
+
+        result = {
             "status": "ok",
             "ticket_id": ticket_id,
             "outputs": {
@@ -70,6 +116,15 @@ class SpecWriterAgent:
                 "openapi_yaml": str(openapi_path)
             }
         }
+        # A degraded run records its outputs (for hand-edit detection) but not as fresh, so the
+        # next run tries the model again instead of keeping the template spec
+        record = lambda: self.manifest.record(stage, None if degraded else input_hash,
+                                              [spec_path, openapi_path], result, hand_edited)
+        if bus is not None:
+            bus.on_flush(record)  # the manifest hashes the files as written
+        else:
+            record()
+        return dict(result, skipped=False, hand_edited=hand_edited)
 
     # ---------- Bedrock path ----------
     def _generate_with_bedrock(self, ticket: dict):
@@ -84,44 +139,55 @@ class SpecWriterAgent:
         user_prompt = self._compose_user_prompt(ticket)
 
         # Note: Some models use 'messages' (Claude 3.5) structure. Adjust if needed for your chosen model.
-        payload = {
-            "messages": [
-                {"role": "system", "content": [{"type": "text", "text": system_prompt}]},
-                {"role": "user", "content": [{"type": "text", "text": user_prompt}]}
-            ],
-            "max_tokens": 3000,
-            "temperature": 0.2
-        }
-
-        response = self.bedrock.invoke_model(
-            modelId=self.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(payload).encode("utf-8"),
-        )
-
-        body = json.loads(response["body"].read())
-        # Extract text depending on model schema
-        spec_text = self._extract_text_from_body(body)
+        messages = [
+            {"role": "system", "content": [{"type": "text", "text": system_prompt}]},
+            {"role": "user", "content": [{"type": "text", "text": user_prompt}]}
+        ]
+        spec_text = self._invoke("spec", messages)
 
         # Ask for OpenAPI next (shorter, deterministic)
         openapi_prompt = self._compose_openapi_prompt(ticket)
-        payload["messages"].append({"role": "user", "content": [{"type": "text", "text": openapi_prompt}]})
-        payload["temperature"] = 0.0
-        response2 = self.bedrock.invoke_model(
-            modelId=self.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(payload).encode("utf-8"),
-        )
-        body2 = json.loads(response2["body"].read())
-        openapi_text = self._extract_text_from_body(body2)
+        messages.append({"role": "user", "content": [{"type": "text", "text": openapi_prompt}]})
+        openapi_text = self._invoke("openapi", messages)
         # Sanity: ensure YAML header exists
         if not str(openapi_text).strip().startswith("openapi:"):
             openapi_text = self._render_openapi_fallback(ticket)
 
         return spec_text, openapi_text
 
+    def _invoke(self, task: str, messages: list) -> str:
+        """
+        Calls the model routed for `task`, moving on to the next candidate route if it fails.
+        Observed latency/outcome is fed back to the router.
+        """
+        candidates = self.router.candidates(task)
+        for i, route in enumerate(candidates):
+            payload = {
+                "messages": messages,
+                "max_tokens": route.max_tokens,
+                "temperature": route.temperature
+            }
+            start = time.monotonic()
+            try:
+                response = self.bedrock.invoke_model(
+                    deadline=route.timeout,
+                    modelId=route.model_id,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=json.dumps(payload).encode("utf-8"),
+                )
+                body = json.loads(response["body"].read())
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):  # short-circuited: no new evidence about the model
+                    self.router.record(task, route.model_id, time.monotonic() - start, ok=False)
+                if i == len(candidates) - 1:
+                    raise
+                print(f"[SpecWriter] {task} on {route.model_id} failed: {e}. Trying {candidates[i + 1].model_id}.")
+                continue
+            self.router.record(task, route.model_id, time.monotonic() - start, ok=True)
+            # Extract text depending on model schema
+            return self._extract_text_from_body(body)
+
     def _extract_text_from_body(self, body):
         """
         Attempts to extract model text from Bedrock response (Claude-style).
@@ -190,6 +256,8 @@ class SpecWriterAgent:
         description = ticket.get("description", "")
         ac = ticket.get("acceptance_criteria", []) or []
         constraints = ticket.get("constraints", []) or []
+        ac_lines = "\n- ".join(ac) if ac else "N/A"
+        constraint_lines = "\n- ".join(constraints) if constraints else "None"
 
         return f"""
 Create a production-ready technical specification for this ticket.
@@ -200,10 +268,10 @@ Description:
 {description}
 
 Acceptance Criteria:
-- {"\n- ".join(ac) if ac else "N/A"}
+- {ac_lines}
 
 Constraints:
-- {"\n- ".join(constraints) if constraints else "None"}
+- {constraint_lines}
 
 Include sections: Summary, Business Context & Goals, Scope (in/out), Functional Requirements,
 APIs overview, Data Model, Non-Functional Requirements, Acceptance Criteria, Test Plan, Deployment & Ops (IaC/CI-CD).
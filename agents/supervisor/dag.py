@@ -0,0 +1,288 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from agents.common import tracing
+
+
+@dataclass
+class Stage:
+    """
+    One node of a pipeline DAG. `run` receives a dict of its declared `inputs` and returns a
+    dict; the keys listed in `outputs` are published for downstream stages. Dependencies are
+    derived from inputs/outputs: a stage waits for whichever stage produces each of its inputs.
+    """
+    name: str
+    run: Callable[[Dict], Dict]
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    timeout: Optional[float] = None  # seconds, measured from when the stage starts
+
+
+@dataclass
+class StageRun:
+    status: str = "pending"  # pending | ok | failed | timeout | cancelled
+    needs: List[str] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    started: Optional[float] = None   # seconds since the DAG started
+    finished: Optional[float] = None
+    resumed: bool = False             # restored from a checkpoint instead of run
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class DagExecutor:
+    """
+    Runs stages as soon as their inputs are available, independent ones concurrently on a
+    thread pool (the agents block on Bedrock/file I/O), so wall time tracks the critical path
+    rather than the sum of stages.
+    A stage that fails or overruns its timeout cancels everything downstream of it; unrelated
+    branches keep going. Python threads can't be killed, so a timed-out stage's thread is
+    abandoned and its late result discarded; stages that want to stop early can poll
+    `executor.cancelled` (also set by cancel()).
+    With a `checkpoint` (see supervisor.state.TicketCheckpoint) every stage's outcome is saved,
+    and stages that already succeeded with the same inputs are restored instead of re-run.
+    With `limits` (see supervisor.work_queue.ConcurrencyLimits, shared across tickets) a ready
+    stage waits for a slot of its worker type before it starts.
+    `on_stage(name, run)` is called (on the executor's thread) whenever a stage that actually
+    ran finishes, ok or not; resumed and cancelled stages are not reported.
+    """
+    def __init__(self, stages: List[Stage], max_workers: Optional[int] = None, clock=time.monotonic,
+                 checkpoint=None, limits=None, poll_interval: float = 0.01,
+                 on_stage: Optional[Callable[[str, StageRun], None]] = None):
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.max_workers = max_workers or len(stages) or 1
+        self.clock = clock
+        self.checkpoint = checkpoint
+        self.limits = limits
+        self.poll_interval = poll_interval
+        self.on_stage = on_stage
+        self.cancelled = threading.Event()
+
+        self.producers: Dict[str, str] = {}
+        for s in stages:
+            for key in s.outputs:
+                if key in self.producers:
+                    raise ValueError(f"{key!r} is produced by both {self.producers[key]} and {s.name}")
+                self.producers[key] = s.name
+        self.needs = {s.name: sorted({self.producers[k] for k in s.inputs if k in self.producers})
+                      for s in stages}
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.needs[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self, context: Dict) -> Dict:
+        """
+        context: initial values for inputs no stage produces (e.g. {"ticket": ...}).
+        Returns {"status", "elapsed_s", "context", "stages": {name: StageRun}, "critical_path", "critical_path_s"}.
+        """
+        for s in self.stages.values():
+            missing = [k for k in s.inputs if k not in self.producers and k not in context]
+            if missing:
+                raise ValueError(f"Stage {s.name} needs {missing}, which no stage produces and the context lacks")
+
+        context = dict(context)
+        runs = {name: StageRun(needs=list(self.needs[name])) for name in self.order}
+        start = self.clock()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag")
+        running = {}  # future -> stage name
+        hashes = {}   # stage name -> inputs hash, for checkpointing
+        unstarted = set(self.order)  # for the shared limits' backlog count
+        parent = tracing.current()  # stage spans run on pool threads; parent them here
+        if self.limits is not None:
+            for name in self.order:
+                self.limits.expect(name)
+
+        def now():
+            return self.clock() - start
+
+        def settle(name):
+            # The stage will never start (resumed or cancelled): drop it from the backlog
+            if name in unstarted:
+                unstarted.discard(name)
+                if self.limits is not None:
+                    self.limits.forget(name)
+
+        def cancel_downstream(name):
+            for other in self.order:
+                if runs[other].status == "pending" and name in self._ancestors(other):
+                    runs[other].status = "cancelled"
+                    runs[other].error = f"upstream stage {name} {runs[name].status}"
+                    settle(other)
+
+        try:
+            while True:
+                if self.cancelled.is_set():
+                    for name, run in runs.items():
+                        if run.status == "pending":
+                            run.status, run.error = "cancelled", "pipeline cancelled"
+                            settle(name)
+
+                in_flight = set(running.values())
+                for name in self.order:
+                    run = runs[name]
+                    if run.status != "pending" or name in in_flight:
+                        continue
+                    if all(runs[dep].status == "ok" for dep in run.needs):
+                        stage = self.stages[name]
+                        stage_inputs = {k: context[k] for k in stage.inputs}
+                        if self.checkpoint is not None and name not in hashes:
+                            hashes[name] = self.checkpoint.hash_inputs(stage_inputs)
+                            saved = None
+                            if all(runs[dep].resumed for dep in run.needs):
+                                saved = self.checkpoint.load(name, hashes[name])
+                            if saved is not None:
+                                context.update(saved["outputs"])
+                                run.status, run.result, run.resumed = "ok", saved["result"], True
+                                run.started = run.finished = now()
+                                settle(name)
+                                continue
+                        if self.limits is not None and not self.limits.try_acquire(name):
+                            continue  # all slots busy; retried on the next pass
+                        unstarted.discard(name)
+                        run.started = now()
+                        running[pool.submit(self._call, name, stage.run, stage_inputs, parent)] = name
+
+                blocked = any(runs[n].status == "pending" and all(runs[d].status == "ok" for d in runs[n].needs)
+                              for n in unstarted)
+                if not running:
+                    if not blocked:
+                        break
+                    time.sleep(self.poll_interval)  # slots free up as other tickets' stages finish
+                    continue
+
+                deadlines = [runs[n].started + self.stages[n].timeout
+                             for n in running.values() if self.stages[n].timeout is not None]
+                if blocked:
+                    deadlines.append(now() + self.poll_interval)
+                wait_for = max(0.0, min(deadlines) - now()) if deadlines else None
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = running.pop(future)
+                    run = runs[name]
+                    run.finished = now()
+                    try:
+                        result = future.result() or {}
+                        run.result = result
+                        for key in self.stages[name].outputs:
+                            if key not in result:
+                                raise KeyError(f"stage {name} did not return declared output {key!r}")
+                            context[key] = result[key]
+                        run.status = "ok"
+                    except Exception as e:
+                        run.status, run.error = "failed", f"{type(e).__name__}: {e}"
+                        cancel_downstream(name)
+                    self._save(name, run, hashes)
+                    self._notify(name, run)
+
+                for future, name in list(running.items()):
+                    timeout = self.stages[name].timeout
+                    if timeout is not None and now() - runs[name].started >= timeout:
+                        running.pop(future)
+                        future.cancel()
+                        run = runs[name]
+                        run.finished = now()
+                        run.status, run.error = "timeout", f"exceeded {timeout}s"
+                        cancel_downstream(name)
+                        self._save(name, run, hashes)
+                        self._notify(name, run)
+        finally:
+            for name in list(unstarted):
+                settle(name)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        path = self._critical_path(runs)
+        ok = all(r.status == "ok" for r in runs.values())
+        return {
+            "status": "completed" if ok else "failed",
+            "elapsed_s": round(now(), 4),
+            "context": context,
+            "stages": runs,
+            "critical_path": path,
+            "critical_path_s": round(sum(runs[n].duration for n in path), 4),
+        }
+
+    def _call(self, name: str, fn, inputs: Dict, parent=None):
+        # Runs on the pool; the slot is held until the work really ends, even after a timeout
+        try:
+            with tracing.span(f"stage {name}", parent=parent, stage=name) as span:
+                result = fn(inputs)
+                if isinstance(result, dict) and "status" in result:
+                    span.set(status=result["status"])
+                return result
+        finally:
+            if self.limits is not None:
+                self.limits.release(name)
+
+    def _save(self, name: str, run: StageRun, hashes: Dict[str, str]):
+        if self.checkpoint is None:
+            return
+        ok = run.status == "ok"
+        outputs = {k: run.result[k] for k in self.stages[name].outputs} if ok else {}
+        try:
+            self.checkpoint.save(name, run.status, hashes[name], outputs, run.result if ok else run.error)
+        except Exception as e:
+            # A lost checkpoint only costs a re-run later; don't fail the stage over it
+            print(f"[Supervisor] Could not checkpoint {name}: {e}")
+
+    def _notify(self, name: str, run: StageRun):
+        if self.on_stage is None:
+            return
+        try:
+            self.on_stage(name, run)
+        except Exception as e:
+            print(f"[Supervisor] on_stage hook failed for {name}: {e}")
+
+    def _ancestors(self, name: str) -> set:
+        seen, stack = set(), list(self.needs[name])
+        while stack:
+            dep = stack.pop()
+            if dep not in seen:
+                seen.add(dep)
+                stack.extend(self.needs[dep])
+        return seen
+
+    def _critical_path(self, runs: Dict[str, StageRun]) -> List[str]:
+        """
+        The chain of stages that bounded wall time: from the last stage to finish, repeatedly
+        step to the dependency that finished last.
+        """
+        finished = [n for n in self.order if runs[n].finished is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda n: runs[n].finished)]
+        while True:
+            deps = [d for d in self.needs[path[-1]] if runs[d].finished is not None]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda n: runs[n].finished))
+        return list(reversed(path))
@@ -0,0 +1,124 @@
+import importlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from agents.common import tracing
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = REPO_ROOT / "orchestration" / "agentcore-config.yml"
+
+_configs: Dict[str, Dict] = {}
+_configs_lock = threading.Lock()
+
+
+def load_config(path=CONFIG_PATH) -> Dict:
+    """
+    Parses the AgentCore config once per process (per path).
+    """
+    key = str(Path(path).resolve())
+    with _configs_lock:
+        if key not in _configs:
+            with tracing.span("yaml.parse", path=key):
+                _configs[key] = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+        return _configs[key]
+
+
+class WorkerRegistry:
+    """
+    Maps worker ids from agentcore-config.yml to agent classes. Entrypoints are validated up
+    front (cheap path checks), but a worker's module is only imported, and the agent only
+    constructed, the first time it's dispatched; instances are cached per constructor
+    arguments. A run that never touches the spec writer never pays for boto3.
+    Agents built without arguments are kept for good (they may hold state, like the metrics
+    agent's windows); those built with arguments go in an LRU of max_instances, since
+    per-ticket arguments (a code generator per spec and service dir) would otherwise grow the
+    cache for as long as a queue worker runs.
+    """
+    def __init__(self, config_path=CONFIG_PATH, root=REPO_ROOT, max_instances: int = 32):
+        self.root = Path(root)
+        self.config = load_config(config_path)
+        self.workers = self._validate()
+        self.max_instances = max_instances
+        self._classes = {}
+        self._singletons = {}
+        self._instances: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _validate(self) -> Dict[str, Dict]:
+        errors, workers = [], {}
+        for entry in self.config.get("workers") or []:
+            worker_id = entry.get("id")
+            entrypoint = entry.get("entrypoint", "")
+            if not worker_id:
+                errors.append(f"worker without an id: {entry}")
+                continue
+            if worker_id in workers:
+                errors.append(f"{worker_id}: duplicate worker id")
+            path = Path(entrypoint)
+            if path.is_absolute() or path.suffix != ".py" or not (self.root / path).is_file():
+                errors.append(f"{worker_id}: entrypoint {entrypoint!r} is not a Python file in the repo")
+            elif not all(part.isidentifier() for part in path.with_suffix("").parts):
+                errors.append(f"{worker_id}: entrypoint {entrypoint!r} is not an importable module path")
+            if not entry.get("class"):
+                errors.append(f"{worker_id}: no agent class given")
+            cap = entry.get("max_concurrency")
+            if cap is not None and (not isinstance(cap, int) or cap < 1):
+                errors.append(f"{worker_id}: max_concurrency must be a positive integer")
+            workers[worker_id] = {
+                "module": ".".join(path.with_suffix("").parts),
+                "class": entry.get("class"),
+                "entrypoint": entrypoint,
+                "max_concurrency": cap,
+            }
+        routed = ((self.config.get("supervisor") or {}).get("routing") or {}).get("workers") or []
+        errors += [f"supervisor routes to unknown worker {w}" for w in routed if w not in workers]
+        if errors:
+            raise ValueError("Invalid agentcore config:\n  " + "\n  ".join(errors))
+        return workers
+
+    def worker_ids(self) -> List[str]:
+        return list(self.workers)
+
+    def concurrency(self) -> Dict[str, int]:
+        """
+        Per-worker concurrency caps; workers without max_concurrency (CPU-bound ones) get the CPU count.
+        """
+        return {w: spec["max_concurrency"] or os.cpu_count() or 1 for w, spec in self.workers.items()}
+
+    def worker_class(self, worker_id: str):
+        if worker_id not in self.workers:
+            raise KeyError(f"Unknown worker {worker_id!r}; known: {', '.join(self.workers)}")
+        with self._lock:
+            if worker_id not in self._classes:
+                spec = self.workers[worker_id]
+                module = importlib.import_module(spec["module"])
+                self._classes[worker_id] = getattr(module, spec["class"])
+            return self._classes[worker_id]
+
+    def get(self, worker_id: str, **kwargs):
+        """
+        The worker's agent, constructed with kwargs on first use and reused after that.
+        """
+        key = (worker_id, json.dumps(kwargs, sort_keys=True, default=str))
+        cls = self.worker_class(worker_id)
+        with self._lock:
+            if not kwargs:
+                if worker_id not in self._singletons:
+                    self._singletons[worker_id] = cls()
+                return self._singletons[worker_id]
+            if key in self._instances:
+                self._instances.move_to_end(key)
+            else:
+                self._instances[key] = cls(**kwargs)
+                while len(self._instances) > self.max_instances:
+                    self._instances.popitem(last=False)
+            return self._instances[key]
+
+    def loaded(self) -> List[str]:
+        return [w for w in self.workers if w in self._classes]
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from agents.common.manifest import file_hash, inputs_hash, tree_hash
+
+DEFAULT_TTL_HOURS = 48
+STATE_DB = ".copilot-state.db"
+
+
+def _record(status: str, input_hash: str, outputs: Dict, result, now: float, ttl_s: float) -> Dict:
+    return {
+        "status": status,
+        "inputs": input_hash,
+        "outputs": outputs,
+        "result": result,
+        "updated_at": now,
+        "expires_at": now + ttl_s,
+    }
+
+
+class SqliteStateStore:
+    """
+    Per-ticket, per-stage checkpoints in a local SQLite file (":memory:" for throwaway runs).
+    Records expire ttl_hours after their last update; expired ones are never returned and
+    are deleted by purge_expired().
+    """
+    def __init__(self, path: str = STATE_DB, ttl_hours: float = DEFAULT_TTL_HOURS, clock=time.time):
+        self.path = path
+        self.ttl_s = ttl_hours * 3600
+        self.clock = clock
+        self._lock = threading.Lock()
+        # One shared connection: stages checkpoint from DAG worker threads
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS stages ("
+                " ticket_id TEXT NOT NULL, stage TEXT NOT NULL, record TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (ticket_id, stage))"
+            )
+
+    def get(self, ticket_id: str) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT stage, record FROM stages WHERE ticket_id = ? AND expires_at > ?",
+                (ticket_id, self.clock()),
+            ).fetchall()
+        return {stage: json.loads(record) for stage, record in rows}
+
+    def put(self, ticket_id: str, stage: str, status: str, input_hash: str, outputs: Dict, result=None):
+        record = _record(status, input_hash, outputs, result, self.clock(), self.ttl_s)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO stages (ticket_id, stage, record, expires_at) VALUES (?, ?, ?, ?)",
+                (ticket_id, stage, json.dumps(record, default=str), record["expires_at"]),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM stages WHERE expires_at <= ?", (self.clock(),)).rowcount
+
+
+class DynamoDbStateStore:
+    """
+    The same checkpoints in the AgentCore memory table (PK "TICKET#<id>", SK "STAGE#<name>").
+    `expires_at` (epoch seconds) is meant to be the table's TTL attribute; DynamoDB deletes
+    expired items lazily, so reads also filter them out.
+    """
+    def __init__(self, table: str = "agentic_devops_memory", ttl_hours: float = DEFAULT_TTL_HOURS,
+                 region: Optional[str] = None, client=None, clock=time.time):
+        if client is None:
+            import boto3  # only when this backend is actually selected
+            client = boto3.client("dynamodb", region_name=region or os.getenv("AWS_REGION", "us-east-1"))
+        self.client = client
+        self.table = table
+        self.ttl_s = ttl_hours * 3600
+        self.clock = clock
+
+    def get(self, ticket_id: str) -> Dict[str, Dict]:
+        records, kwargs = {}, {}
+        while True:
+            resp = self.client.query(
+                TableName=self.table,
+                KeyConditionExpression="PK = :pk AND begins_with(SK, :sk)",
+                FilterExpression="expires_at > :now",
+                ExpressionAttributeValues={
+                    ":pk": {"S": f"TICKET#{ticket_id}"},
+                    ":sk": {"S": "STAGE#"},
+                    ":now": {"N": str(int(self.clock()))},
+                },
+                **kwargs,
+            )
+            for item in resp.get("Items", []):
+                records[item["SK"]["S"][len("STAGE#"):]] = json.loads(item["record"]["S"])
+            if "LastEvaluatedKey" not in resp:
+                return records
+            kwargs = {"ExclusiveStartKey": resp["LastEvaluatedKey"]}
+
+    def put(self, ticket_id: str, stage: str, status: str, input_hash: str, outputs: Dict, result=None):
+        record = _record(status, input_hash, outputs, result, self.clock(), self.ttl_s)
+        self.client.put_item(TableName=self.table, Item={
+            "PK": {"S": f"TICKET#{ticket_id}"},
+            "SK": {"S": f"STAGE#{stage}"},
+            "record": {"S": json.dumps(record, default=str)},
+            "expires_at": {"N": str(int(record["expires_at"]))},
+        })
+
+    def purge_expired(self) -> int:
+        # Left to DynamoDB TTL; reads already ignore expired items
+        return 0
+
+
+def state_store_from_config(memory: Optional[Dict] = None, backend: Optional[str] = None):
+    """
+    Builds the store from agentcore-config.yml's `memory` block. Locally the default is SQLite
+    (COPILOT_STATE_BACKEND=dynamodb, or backend="dynamodb", selects the configured table).
+    """
+    memory = memory or {}
+    ttl_hours = memory.get("ttl_hours", DEFAULT_TTL_HOURS)
+    backend = backend or os.getenv("COPILOT_STATE_BACKEND", "sqlite")
+    if backend == "dynamodb":
+        return DynamoDbStateStore(memory.get("table", "agentic_devops_memory"), ttl_hours)
+    if backend == "sqlite":
+        return SqliteStateStore(os.getenv("COPILOT_STATE_DB", STATE_DB), ttl_hours)
+    raise ValueError(f"Unknown state backend {backend!r} (expected 'sqlite' or 'dynamodb')")
+
+
+class TicketCheckpoint:
+    """
+    DagExecutor's view of the store for one ticket. A stage resumes from its checkpoint only
+    if it last succeeded with the same inputs and none of its upstream stages re-ran (a
+    re-run upstream may have rewritten the files those inputs point at).
+    Inputs named *_path / *_dir are hashed by what they point at (a file's content, every
+    file under a directory), so an edited spec or service invalidates the stages reading it
+    even though the path is the same. With an ArtifactBus, files it hasn't flushed yet are
+    hashed as they will be written.
+    """
+    def __init__(self, store, ticket_id: str, resume: bool = True, bus=None):
+        self.store = store
+        self.ticket_id = ticket_id
+        self.saved = store.get(ticket_id) if resume else {}
+        self.bus = bus
+
+    def hash_inputs(self, inputs: Dict) -> str:
+        parts = {}
+        for key, value in inputs.items():
+            if isinstance(value, str) and key.endswith("_path"):
+                value = {"path": value, "content": (self.bus.file_hash if self.bus else file_hash)(value)}
+            elif isinstance(value, str) and key.endswith("_dir"):
+                value = {"path": value, "content": (self.bus.tree_hash if self.bus else tree_hash)(value)}
+            parts[key] = value
+        return inputs_hash(parts)
+
+    def load(self, stage: str, input_hash: str) -> Optional[Dict]:
+        record = self.saved.get(stage)
+        if record and record["status"] == "ok" and record["inputs"] == input_hash:
+            return record
+        return None
+
+    def save(self, stage: str, status: str, input_hash: str, outputs: Dict, result=None):
+        self.store.put(self.ticket_id, stage, status, input_hash, outputs, result)
@@ -0,0 +1,61 @@
+import math
+import random
+import threading
+import time
+
+from agents.supervisor.state import SqliteStateStore
+from agents.supervisor.supervisor import SupervisorAgent
+
+# Seconds per stage: a number, or (median, sigma) for a log-normal draw
+DEFAULT_STUB_LATENCY = {
+    "spec_writer_agent": (0.2, 0.5),    # Bedrock round trips
+    "code_generator_agent": (0.05, 0.3),
+    "devops_iac_agent": (0.05, 0.3),
+    "deployment_agent": (0.3, 0.4),
+    "metrics_agent": 0.01,
+}
+
+
+class StubSupervisor(SupervisorAgent):
+    """
+    A SupervisorAgent whose workers only sleep (and return the outputs the DAG expects),
+    for benchmarking orchestration: queueing, concurrency caps, backpressure.
+    Output claims are the real ones: tickets without a service_name share the default
+    output dirs, so they still run one at a time.
+    """
+    def __init__(self, latency=None, seed: int = 0, **kwargs):
+        kwargs.setdefault("state_store", SqliteStateStore(":memory:"))
+        super().__init__(**kwargs)
+        self.latency = dict(DEFAULT_STUB_LATENCY, **(latency or {}))
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _sleep(self, worker: str):
+        value = self.latency.get(worker, 0)
+        if isinstance(value, (tuple, list)):
+            median, sigma = value
+            with self._rng_lock:
+                value = self._rng.lognormvariate(math.log(median), sigma)
+        time.sleep(value)
+
+    def _write_spec(self, inputs, bus=None):
+        self._sleep("spec_writer_agent")
+        ticket_id = inputs["ticket"]["id"]
+        return {"status": "ok", "spec_md_path": f"docs/specs/{ticket_id}-spec.md",
+                "openapi_path": f"docs/specs/{ticket_id}-openapi.yaml"}
+
+    def _generate_code(self, inputs, bus=None):
+        self._sleep("code_generator_agent")
+        return {"status": "ok", "service_dir": self._service_dir(inputs["ticket"])}
+
+    def _generate_iac(self, inputs, bus=None):
+        self._sleep("devops_iac_agent")
+        return {"status": "ok", "cdk_dir": self._cdk_dir(inputs["ticket"])}
+
+    def _deploy(self, inputs, bus=None):
+        self._sleep("deployment_agent")
+        return {"status": "ok", "deployment": {"status": "ok"}}
+
+    def _report(self, inputs):
+        self._sleep("metrics_agent")
+        return {"status": "ok", "metrics": {"status": "ok"}}
@@ -1,52 +1,275 @@
-from agents.spec_writer.agent import SpecWriterAgent
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from agents.common import tracing
+from agents.common.artifact_bus import ArtifactBus
+from agents.devops_iac.agent import WORKFLOW_PATH
+from agents.devops_iac.packager import build_package
+from agents.supervisor.dag import DagExecutor, Stage
+from agents.supervisor.registry import WorkerRegistry
+from agents.supervisor.state import TicketCheckpoint, state_store_from_config
+from agents.supervisor.work_queue import ConcurrencyLimits
+
+# Per-stage wall-clock limits (seconds); the spec writer waits on Bedrock, deploys on CloudFormation
+DEFAULT_TIMEOUTS = {
+    "spec_writer_agent": 180,
+    "code_generator_agent": 120,
+    "devops_iac_agent": 120,
+    "deployment_agent": 900,
+    "metrics_agent": 60,
+}
+
 
 class SupervisorAgent:
-    def __init__(self, agent_runtime=None):
+    """
+    Runs a ticket through the worker pipeline as a DAG:
+
+        spec_writer -> code_generator --+
+                    -> devops_iac ------+-> deployment -> metrics
+
+    Code generation and IaC both only need the OpenAPI spec, so they run concurrently and
+    ticket latency is the critical path rather than the sum of all stages.
+    Workers come from orchestration/agentcore-config.yml via WorkerRegistry and are only
+    imported/constructed when a stage first needs them.
+    Every stage is checkpointed per ticket (the config's `memory` store: SQLite locally,
+    DynamoDB when COPILOT_STATE_BACKEND=dynamodb), so a retried ticket resumes after the
+    last stage that succeeded.
+    Stages of concurrently handled tickets share per-worker concurrency caps (the config's
+    max_concurrency, overridable via `concurrency`); see work_queue.QueueWorker for bulk runs.
+    Stage timings and outcomes stream into the metrics agent as each stage finishes.
+    When the ticket names a `base_url`, deployment probes it and fails (blocking promotion)
+    on a smoke failure or a missed latency budget.
+    With artifact_bus (the default), the spec, the parsed OpenAPI document and the generated
+    files pass between stages in memory (common.artifact_bus) and are written once: before
+    deployment packages them, and at the end of the run.
+    A ticket naming a `service_name` gets its own service, CDK app and CI workflow
+    (services/<name>, infra/cdk-<name>, .github/workflows/ci-cd-<name>.yml), so tickets for
+    different services run side by side; tickets sharing those outputs (e.g. none named, all
+    on the demo service) take turns, since they'd overwrite each other's files and deploys.
+    """
+    def __init__(self, agent_runtime=None, service_dir="services/customer-alerts", cdk_dir="infra/cdk",
+                 region="us-east-1", timeouts=None, max_workers=None, registry=None, state_store=None,
+                 concurrency=None, artifact_bus=True):
         self.runtime = agent_runtime
-        self.spec_writer = SpecWriterAgent()
+        self.registry = registry or WorkerRegistry()
+        self.limits = ConcurrencyLimits(dict(self.registry.concurrency(), **(concurrency or {})))
+        self._state = state_store
+        self.service_dir = service_dir
+        self.cdk_dir = cdk_dir
+        self.region = region
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.max_workers = max_workers
+        self.artifact_bus = artifact_bus
+        self._output_locks = {}
+        self._output_locks_lock = threading.Lock()
 
-    def handle_ticket(self, ticket):
-        # 1) Always start with spec generation
-        spec_result = self.spec_writer.run({"ticket": ticket})
+    def stages(self, bus=None):
+        def bind(adapter):
+            return partial(adapter, bus=bus) if bus is not None else adapter
+        return [
+            Stage("spec_writer_agent", bind(self._write_spec),
+                  inputs=["ticket"], outputs=["spec_md_path", "openapi_path"]),
+            Stage("code_generator_agent", bind(self._generate_code),
+                  inputs=["ticket", "openapi_path"], outputs=["service_dir"]),
+            Stage("devops_iac_agent", bind(self._generate_iac),
+                  inputs=["ticket", "openapi_path"], outputs=["cdk_dir"]),
+            Stage("deployment_agent", bind(self._deploy),
+                  inputs=["ticket", "service_dir", "cdk_dir", "openapi_path"], outputs=["deployment"]),
+            Stage("metrics_agent", self._report,
+                  inputs=["ticket", "deployment"], outputs=["metrics"]),
+        ]
 
-        # 2) Pass paths forward as context to other agents
-        context = {
-            "ticket": ticket,
-            "spec_md_path": spec_result["outputs"]["spec_md"],
-            "openapi_path": spec_result["outputs"]["openapi_yaml"]
-        }
+    @property
+    def state(self):
+        if self._state is None:
+            memory = (self.registry.config.get("agent_core") or {}).get("memory")
+            self._state = state_store_from_config(memory)
+        return self._state
 
-        # Example: you can still delegate to your runtime if you wire it later
-        results = [ {"agent": "spec_writer_agent", "result": spec_result} ]
-        # TODO: delegate to codegen/devops/deploy/metrics with 'context'
+    @property
+    def spec_writer(self):
+        return self.registry.get("spec_writer_agent")
 
+    def run_stage(self, worker_id, inputs):
+        """
+        Runs a single stage outside the DAG (its declared inputs must be in `inputs`).
+        """
+        stage = next((s for s in self.stages() if s.name == worker_id), None)
+        if stage is None:
+            raise KeyError(f"No pipeline stage for worker {worker_id!r}")
+        missing = [k for k in stage.inputs if k not in inputs]
+        if missing:
+            raise ValueError(f"{worker_id} needs {missing}")
+        return stage.run({k: inputs[k] for k in stage.inputs})
+
+    def handle_ticket(self, ticket, resume=True):
+        """
+        resume: restore stages that already succeeded for this ticket id with the same inputs
+        (False re-runs everything, still checkpointing as it goes).
+        """
+        with self._claim_outputs(ticket):
+            return self._handle_ticket(ticket, resume)
+
+    def _claim_outputs(self, ticket):
+        """
+        Holds the ticket's output directories for its whole run (generation through deploy).
+        """
+        keys = sorted({self._service_dir(ticket), self._cdk_dir(ticket), self._workflow_path(ticket)})
+        with self._output_locks_lock:
+            locks = [self._output_locks.setdefault(key, threading.Lock()) for key in keys]
+        stack = ExitStack()
+        for lock in locks:  # sorted: no lock-order deadlocks between tickets
+            stack.enter_context(lock)
+        return stack
+
+    def _handle_ticket(self, ticket, resume):
+        bus = ArtifactBus() if self.artifact_bus else None
+        stages = self.stages(bus)
+        for stage in stages:
+            stage.timeout = self.timeouts.get(stage.name)
+        checkpoint = None
+        if ticket.get("id"):
+            self.state.purge_expired()
+            checkpoint = TicketCheckpoint(self.state, ticket["id"], resume=resume, bus=bus)
+        executor = DagExecutor(stages, max_workers=self.max_workers, checkpoint=checkpoint, limits=self.limits,
+                               on_stage=self._stage_observer(ticket))
+        with tracing.span("ticket", ticket_id=ticket.get("id")) as span:
+            out = executor.run({"ticket": ticket})
+            span.set(status=out["status"], critical_path=out["critical_path"])
+        if bus is not None:
+            bus.flush()  # whatever the run produced, including stages upstream of a failure
+
+        results = []
+        for name, run in out["stages"].items():
+            entry = {"agent": name, "status": run.status, "resumed": run.resumed, "result": run.result,
+                     "started_s": run.started, "duration_s": round(run.duration, 4)}
+            if run.error:
+                entry["error"] = run.error
+            results.append(entry)
+        for entry in results:
+            if entry["status"] not in ("ok", "cancelled"):
+                print(f"[Supervisor] {entry['agent']} {entry['status']}: {entry['error']}")
+
+        context = {k: v for k, v in out["context"].items() if k not in ("deployment", "metrics")}
         return {
-            "status": "completed",
+            "status": out["status"],
             "outputs": results,
-            "context": context
+            "context": context,
+            "elapsed_s": out["elapsed_s"],
+            "critical_path": out["critical_path"],
+            "critical_path_s": out["critical_path_s"],
+            "artifacts": dict(bus.stats) if bus is not None else None,
         }
 
+    def _stage_observer(self, ticket):
+        """
+        Streams each finished stage to the metrics agent as it happens. The ticket's own event
+        (lead time: ticket created_at, else pipeline start, to deployed) is sent once, when
+        deployment succeeds or at the first stage that fails.
+        """
+        metrics = self.registry.get("metrics_agent")
+        start = _epoch(ticket.get("created_at")) or time.time()
+        outcome = []
+
+        def on_stage(name, run):
+            now = time.time()
+            events = [{"ticket_id": ticket.get("id"), "stage": name, "status": run.status,
+                       "duration_s": run.duration, "ts": now}]
+            if not outcome and (run.status != "ok" or name == "deployment_agent"):
+                outcome.append(run.status)
+                events.append({"ticket_id": ticket.get("id"), "stage": "ticket", "status": run.status,
+                               "duration_s": now - start, "ts": now})
+            metrics.ingest(events)
+        return on_stage
+
+    # --- stage adapters: pull declared inputs, call the worker, publish outputs ---
+
+    def _write_spec(self, inputs, bus=None):
+        result = self.spec_writer.run({"ticket": inputs["ticket"], "bus": bus})
+        return dict(result,
+                    spec_md_path=result["outputs"]["spec_md"],
+                    openapi_path=result["outputs"]["openapi_yaml"])
+
+    def _generate_code(self, inputs, bus=None):
+        service_dir = self._service_dir(inputs["ticket"])
+        agent = self.registry.get("code_generator_agent", openapi_path=inputs["openapi_path"],
+                                  service_dir=service_dir, region=self.region)
+        result = agent.run({"ticket": inputs["ticket"], "service_name": Path(service_dir).name, "bus": bus})
+        return dict(result, service_dir=service_dir)
+
+    def _generate_iac(self, inputs, bus=None):
+        ticket = inputs["ticket"]
+        agent = self.registry.get("devops_iac_agent", cdk_dir=self._cdk_dir(ticket),
+                                  workflow_path=self._workflow_path(ticket))
+        result = agent.run({
+            "ticket": inputs["ticket"],
+            "region": self.region,
+            "service_dir": self._service_dir(inputs["ticket"]),
+            "openapi_path": inputs["openapi_path"],
+            # The service code is being generated concurrently; deployment packages it
+            "package": False,
+            "bus": bus,
+        })
+        return dict(result, cdk_dir=self._cdk_dir(ticket))
+
+    def _deploy(self, inputs, bus=None):
+        if bus is not None:
+            bus.flush()  # packaging and the deployment agent read the files from disk
+        package = build_package(inputs["service_dir"])
+        ticket = inputs["ticket"]
+        result = self.registry.get("deployment_agent").run({
+            "ticket": ticket, "package": package, "cdk_dir": inputs["cdk_dir"],
+            "openapi_path": inputs["openapi_path"], "base_url": ticket.get("base_url"),
+        })
+        if result.get("promote") is False:
+            # Fails the stage: metrics and anything else downstream don't treat it as shipped
+            problems = result["smoke_failures"] + [
+                f"{v['method']} {v['route']} p{v['percentile']:g} {v['observed_ms']}ms > {v['budget_ms']:g}ms"
+                for v in result["violations"]]
+            raise RuntimeError("promotion blocked: " + "; ".join(problems))
+        return dict(result, package=package, deployment=result)
+
+    def _report(self, inputs):
+        result = self.registry.get("metrics_agent").run(
+            {"ticket": inputs["ticket"], "deployment": inputs["deployment"]})
+        return dict(result, metrics=result)
+
+    def _service_dir(self, ticket):
+        name = ticket.get("service_name")
+        return str(Path(self.service_dir).parent / name) if name else self.service_dir
+
+    def _cdk_dir(self, ticket):
+        name = ticket.get("service_name")
+        cdk_dir = Path(self.cdk_dir)
+        return str(cdk_dir.parent / f"{cdk_dir.name}-{name}") if name else self.cdk_dir
+
+    def _workflow_path(self, ticket):
+        name = ticket.get("service_name")
+        return f".github/workflows/ci-cd-{name}.yml" if name else WORKFLOW_PATH
 
     def create_subtasks(self, ticket):
+        """
+        The pipeline as a list of subtasks, each naming the workers it waits on.
+        """
+        dag = DagExecutor(self.stages())
         return [
             {
-                "worker": "spec_writer_agent",
-                "payload": {"ticket": ticket}
-            },
-            {
-                "worker": "code_generator_agent",
-                "payload": {"ticket": ticket}
-            },
-            {
-                "worker": "devops_iac_agent",
-                "payload": {"ticket": ticket}
-            },
-            {
-                "worker": "deployment_agent",
-                "payload": {"ticket": ticket}
-            },
-            {
-                "worker": "metrics_agent",
-                "payload": {"ticket": ticket}
+                "worker": name,
+                "payload": {"ticket": ticket},
+                "needs": dag.needs[name],
             }
-        ]
\ No newline at end of file
+            for name in dag.order
+        ]
+
+
+def _epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
@@ -0,0 +1,230 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class ConcurrencyLimits:
+    """
+    Per-worker-type caps shared by every ticket in flight (e.g. few Bedrock-bound spec writers,
+    CPU-count codegen). DagExecutor only starts a stage once it gets a slot, so time spent
+    waiting for one doesn't count against the stage's timeout.
+    `pending` counts, per worker type, stages of in-flight tickets that haven't started yet
+    (expect() on admission, cleared when the stage starts or will never run). That backlog
+    is the signal QueueWorker uses for backpressure.
+    """
+    def __init__(self, caps: Dict[str, int]):
+        self.caps = {name: max(1, int(cap)) for name, cap in caps.items()}
+        self.active = {name: 0 for name in self.caps}
+        self.pending = {name: 0 for name in self.caps}
+        self.peak = {name: 0 for name in self.caps}
+        self._lock = threading.Lock()
+
+    def expect(self, name: str):
+        if name in self.caps:
+            with self._lock:
+                self.pending[name] += 1
+
+    def forget(self, name: str):
+        if name in self.caps:
+            with self._lock:
+                self.pending[name] -= 1
+
+    def try_acquire(self, name: str) -> bool:
+        """
+        Takes a slot for an expected stage, if one is free.
+        """
+        if name not in self.caps:
+            return True
+        with self._lock:
+            if self.active[name] >= self.caps[name]:
+                return False
+            self.active[name] += 1
+            self.pending[name] -= 1
+            self.peak[name] = max(self.peak[name], self.active[name])
+            return True
+
+    def release(self, name: str):
+        if name in self.caps:
+            with self._lock:
+                self.active[name] -= 1
+
+    def saturated(self, factor: float) -> Optional[str]:
+        """
+        The first worker type whose backlog is at least factor x its cap, if any.
+        """
+        with self._lock:
+            for name, cap in self.caps.items():
+                if self.pending[name] >= cap * factor:
+                    return name
+        return None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {name: {"cap": self.caps[name], "active": self.active[name],
+                           "pending": self.pending[name], "peak": self.peak[name]} for name in self.caps}
+
+
+class TicketQueue:
+    """
+    In-process FIFO. With maxsize, put() blocks once it's full, pushing back on producers.
+    """
+    def __init__(self, maxsize: int = 0):
+        self._q = queue.Queue(maxsize=maxsize)
+
+    def put(self, ticket: Dict, timeout: Optional[float] = None):
+        self._q.put(ticket, timeout=timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[object, Dict]]:
+        try:
+            return None, self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ack(self, handle):
+        self._q.task_done()
+
+    def depth(self) -> int:
+        return self._q.qsize()
+
+
+class FileTicketQueue:
+    """
+    A spool directory shared by processes: tickets wait in pending/ as JSON files and are
+    claimed by an atomic rename into claimed/, so two workers never take the same one.
+    ack() deletes the claim; requeue_claimed() returns claims orphaned by a crashed worker.
+    """
+    def __init__(self, root: str = ".copilot-queue"):
+        self.pending = Path(root) / "pending"
+        self.claimed = Path(root) / "claimed"
+        self.pending.mkdir(parents=True, exist_ok=True)
+        self.claimed.mkdir(parents=True, exist_ok=True)
+
+    def put(self, ticket: Dict, timeout: Optional[float] = None):
+        name = f"{time.time_ns():020d}-{ticket.get('id', 'ticket')}.json"
+        tmp = self.pending / f".{name}.tmp"
+        tmp.write_text(json.dumps(ticket), encoding="utf-8")
+        os.replace(tmp, self.pending / name)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[object, Dict]]:
+        deadline = time.monotonic() + (timeout or 0)
+        while True:
+            for entry in sorted(p for p in self.pending.iterdir() if p.suffix == ".json"):
+                claim = self.claimed / entry.name
+                try:
+                    os.rename(entry, claim)
+                except FileNotFoundError:
+                    continue  # another worker got there first
+                return claim, json.loads(claim.read_text(encoding="utf-8"))
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+
+    def ack(self, handle):
+        Path(handle).unlink(missing_ok=True)
+
+    def requeue_claimed(self) -> int:
+        moved = 0
+        for claim in self.claimed.iterdir():
+            os.replace(claim, self.pending / claim.name)
+            moved += 1
+        return moved
+
+    def depth(self) -> int:
+        return sum(1 for p in self.pending.iterdir() if p.suffix == ".json")
+
+
+class QueueWorker:
+    """
+    Queue-driven supervisor mode: pulls tickets and runs up to max_in_flight of them at once
+    through supervisor.handle_ticket, with the supervisor's per-worker concurrency caps.
+    Backpressure: while any worker type has a backlog of `backpressure` x its cap (tickets
+    admitted but not yet through that stage, i.e. downstream is lagging), no new tickets are
+    admitted; they stay queued, and a bounded queue in turn blocks producers.
+    """
+    def __init__(self, supervisor, ticket_queue, max_in_flight: int = 8, backpressure: float = 2.0,
+                 poll_interval: float = 0.02, throughput_window: float = 60.0):
+        self.supervisor = supervisor
+        self.queue = ticket_queue
+        self.max_in_flight = max_in_flight
+        self.backpressure = backpressure
+        self.poll_interval = poll_interval
+        self.throughput_window = throughput_window
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._finished = deque()  # completion timestamps inside the throughput window
+        self.started_at = None
+        self.counts = {"admitted": 0, "completed": 0, "failed": 0, "throttled_polls": 0, "peak_in_flight": 0}
+        self.results = []
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, until_empty: bool = True, max_tickets: Optional[int] = None) -> Dict:
+        """
+        until_empty: return once the queue is drained and nothing is in flight
+        (False keeps polling until stop()).
+        """
+        self.started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ticket") as pool:
+            while not self._stop.is_set():
+                if max_tickets is not None and self.counts["admitted"] >= max_tickets:
+                    break
+                with self._lock:
+                    in_flight = self._in_flight
+                if in_flight >= self.max_in_flight or self.supervisor.limits.saturated(self.backpressure):
+                    self.counts["throttled_polls"] += 1
+                    time.sleep(self.poll_interval)
+                    continue
+
+                item = self.queue.get(timeout=self.poll_interval)
+                if item is None:
+                    if until_empty and in_flight == 0 and self.queue.depth() == 0:
+                        break
+                    continue
+                handle, ticket = item
+                with self._lock:
+                    self._in_flight += 1
+                    self.counts["admitted"] += 1
+                    self.counts["peak_in_flight"] = max(self.counts["peak_in_flight"], self._in_flight)
+                pool.submit(self._process, handle, ticket)
+        return self.stats()
+
+    def _process(self, handle, ticket):
+        try:
+            out = self.supervisor.handle_ticket(ticket)
+            status = out["status"]
+        except Exception as e:
+            out, status = {"error": f"{type(e).__name__}: {e}"}, "failed"
+        finally:
+            self.queue.ack(handle)
+        with self._lock:
+            self._in_flight -= 1
+            self.counts["completed" if status == "completed" else "failed"] += 1
+            self._finished.append(time.monotonic())
+            self.results.append({"ticket": ticket.get("id"), "status": status,
+                                 "elapsed_s": out.get("elapsed_s")})
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            while self._finished and self._finished[0] < now - self.throughput_window:
+                self._finished.popleft()
+            recent = len(self._finished)
+            elapsed = now - self.started_at if self.started_at else 0.0
+            done = self.counts["completed"] + self.counts["failed"]
+            return dict(
+                self.counts,
+                queue_depth=self.queue.depth(),
+                in_flight=self._in_flight,
+                elapsed_s=round(elapsed, 4),
+                throughput_per_s=round(done / elapsed, 4) if elapsed else 0.0,
+                recent_throughput_per_s=round(recent / min(elapsed, self.throughput_window), 4) if elapsed else 0.0,
+                stages=self.supervisor.limits.snapshot(),
+            )
@@ -0,0 +1,97 @@
+"""
+Benchmark: OpenAPI loading on a synthetic 5k-path spec with deep $ref chains.
+
+    python benchmarks/bench_openapi_loader.py [--paths 5000] [--depth 4]
+
+Compares the old path (yaml.safe_load + naive dict walks) with OpenApiLoader
+(libyaml CSafeLoader, content-hash parse cache, $ref index).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.append(os.path.abspath("."))
+
+from agents.common.openapi import OpenApiLoader, SafeLoader
+
+
+def synthetic_spec(n_paths: int, ref_depth: int) -> dict:
+    schemas = {}
+    paths = {}
+    for i in range(n_paths):
+        # Model{i}_0 -> Model{i}_1 -> ... -> Model{i}_{depth} (concrete object)
+        for d in range(ref_depth):
+            schemas[f"Model{i}_{d}"] = {"$ref": f"#/components/schemas/Model{i}_{d + 1}"}
+        schemas[f"Model{i}_{ref_depth}"] = {
+            "type": "object",
+            "required": ["id", "name"],
+            "properties": {"id": {"type": "string"}, "name": {"type": "string"}, "count": {"type": "integer"}},
+        }
+        ref = {"$ref": f"#/components/schemas/Model{i}_0"}
+        paths[f"/resource{i}/{{id}}"] = {
+            "parameters": [{"in": "path", "name": "id", "required": True, "schema": {"type": "string"}}],
+            "get": {"summary": f"Get {i}", "responses": {"200": {"description": "OK",
+                    "content": {"application/json": {"schema": ref}}}}},
+            "put": {"summary": f"Put {i}", "requestBody": {"content": {"application/json": {"schema": ref}}},
+                    "responses": {"200": {"description": "OK"}}},
+        }
+    return {"openapi": "3.0.3", "info": {"title": "Synthetic", "version": "1"},
+            "paths": paths, "components": {"schemas": schemas}}
+
+
+def naive_resolve(spec: dict, ref: str):
+    node = spec
+    for token in ref[2:].split("/"):
+        node = node[token]
+    if isinstance(node, dict) and "$ref" in node:
+        return naive_resolve(spec, node["$ref"])
+    return node
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = Path(tmp) / "synthetic-openapi.yaml"
+        spec_path.write_text(yaml.dump(synthetic_spec(args.paths, args.depth), Dumper=yaml.SafeDumper),
+                             encoding="utf-8")
+        results = {"paths": args.paths, "ref_depth": args.depth,
+                   "spec_bytes": spec_path.stat().st_size, "libyaml": SafeLoader.__name__ == "CSafeLoader"}
+
+        results["safe_load_s"], spec = timed(lambda: yaml.safe_load(spec_path.read_text(encoding="utf-8")))
+
+        loader = OpenApiLoader(cache_dir=str(Path(tmp) / "cache"))
+        results["loader_cold_s"], doc = timed(lambda: loader.load(spec_path))
+        results["loader_memory_hit_s"], _ = timed(lambda: loader.load(spec_path), repeat=5)
+        disk_loader = OpenApiLoader(cache_dir=str(Path(tmp) / "cache"))
+        results["loader_disk_hit_s"], _ = timed(lambda: disk_loader.load(spec_path))
+
+        refs = [f"#/components/schemas/Model{i}_0" for i in range(args.paths)]
+        routes = [f"/resource{i}/{{id}}" for i in range(args.paths)]
+        results["naive_resolve_all_s"], _ = timed(lambda: [naive_resolve(spec, r) for r in refs])
+        results["indexed_resolve_all_s"], _ = timed(lambda: [doc.resolve(r) for r in refs], repeat=3)
+        results["naive_route_lookup_s"], _ = timed(
+            lambda: [m for r in routes for m in spec["paths"][r] if m != "parameters"])
+        results["indexed_route_lookup_s"], _ = timed(lambda: [doc.operation("GET", r) for r in routes], repeat=3)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
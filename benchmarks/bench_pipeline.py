@@ -0,0 +1,318 @@
+"""
+Benchmark: the real spec -> codegen -> IaC pipeline, end to end, on synthetic tickets.
+
+    python benchmarks/bench_pipeline.py [--tickets 12] [--sizes 1,3,6]
+        [--ttft 0.05,0.3] [--tokens-per-s 2000,0.2] [--seed 0]
+        [--baseline benchmarks/baseline_pipeline.json] [--tolerance 0.25] [--min-delta-s 0.002]
+        [--update-baseline]
+
+SupervisorAgent runs each ticket (deployment and metrics dropped: they need AWS) in a
+temporary workspace, with the spec writer on a local fake bedrock-runtime client. Each model
+call takes a time-to-first-token plus output_tokens / a token rate, both drawn log-normally
+("median,sigma"; a single number is fixed). Tickets cycle through --sizes (API resources per
+ticket), which scales the prompts, the model's answers and the generated service and stack.
+Prints per-stage and end-to-end latency/throughput as JSON, compared against the stored
+baseline; exits 1 when a stage's median or trimmed mean got slower by more than --tolerance
+(and --min-delta-s) on a run and again on one retry. p95 and throughput are reported but not
+gated: over a dozen samples they move with a single slow model call.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.append(os.path.abspath("."))
+
+from agents.common import tracing
+from agents.common.fake_bedrock import FakeBedrockClient
+from agents.spec_writer.agent import SpecWriterAgent
+from agents.supervisor.state import SqliteStateStore
+from agents.supervisor.supervisor import SupervisorAgent
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "baseline_pipeline.json"
+PIPELINE_STAGES = ("spec_writer_agent", "code_generator_agent", "devops_iac_agent")
+FAKE_MODEL = "fake.bench-model"
+RESOURCE_NAMES = ["orders", "invoices", "customers", "products", "shipments", "payments", "refunds",
+                  "reviews", "coupons", "carts", "addresses", "subscriptions"]
+# Settings a baseline is only comparable under
+COMPARABLE = ("tickets", "warmup", "sizes", "ttft", "tokens_per_s", "seed")
+# Latencies that can fail the gate: a dozen samples put p95 on one or two slow calls
+GATED = ("p50_s", "trimmed_mean_s")
+
+
+class PipelineBenchSupervisor(SupervisorAgent):
+    """
+    The supervisor's spec -> codegen -> IaC stages, with the spec writer on the given
+    bedrock-runtime client and checkpoints kept in memory.
+    """
+    def __init__(self, bedrock_client, **kwargs):
+        kwargs.setdefault("state_store", SqliteStateStore(":memory:"))
+        super().__init__(**kwargs)
+        self._spec_writer = SpecWriterAgent(model_id=FAKE_MODEL, bedrock_client=bedrock_client)
+
+    @property
+    def spec_writer(self):
+        return self._spec_writer
+
+    def stages(self, bus=None):
+        return [stage for stage in super().stages(bus) if stage.name in PIPELINE_STAGES]
+
+
+def _distribution(value: str):
+    parts = [float(p) for p in value.split(",")]
+    return tuple(parts) if len(parts) == 2 else parts[0]
+
+
+def _sampler(dist, rng: random.Random, lock: threading.Lock):
+    if not isinstance(dist, tuple):
+        return lambda: dist
+    median, sigma = dist
+
+    def draw():
+        with lock:
+            return rng.lognormvariate(math.log(median), sigma)
+    return draw
+
+
+def synthetic_ticket(i: int, size: int) -> dict:
+    resources = [RESOURCE_NAMES[j % len(RESOURCE_NAMES)] + (str(j // len(RESOURCE_NAMES)) if j >= len(RESOURCE_NAMES) else "")
+                 for j in range(size)]
+    return {
+        "id": f"TKT-BENCH-{i}",
+        "title": f"Synthetic service {i}",
+        "service_name": f"bench-svc-{i}",
+        "description": f"A service managing {', '.join(resources)}.\nResources: {', '.join(resources)}",
+        "acceptance_criteria": [c for r in resources for c in (f"Create {r}: POST /{r} returns 201",
+                                                                f"List {r}: GET /{r} returns 200")],
+        "constraints": ["P95 < 200ms for read APIs"],
+    }
+
+
+def _resources(prompt: str):
+    for line in prompt.splitlines():
+        if line.startswith("Resources: "):
+            return line[len("Resources: "):].split(", ")
+    return ["items"]
+
+
+def synthetic_openapi(title: str, resources) -> str:
+    paths = {"/health": {"get": {"summary": "Liveness probe", "responses": {"200": {"description": "OK"}}}}}
+    schemas = {}
+    for name in resources:
+        model = name.capitalize()
+        ref = {"$ref": f"#/components/schemas/{model}"}
+        schemas[model] = {
+            "type": "object",
+            "required": ["userId", "name"],
+            "properties": {"id": {"type": "string"}, "userId": {"type": "string"}, "name": {"type": "string"},
+                           "status": {"type": "string", "enum": ["OPEN", "CLOSED"]}},
+        }
+        ok = {"description": "OK", "content": {"application/json": {"schema": ref}}}
+        paths[f"/{name}"] = {
+            "get": {"operationId": f"list_{name}", "summary": f"List {name}",
+                    "parameters": [{"in": "query", "name": "userId", "required": True, "schema": {"type": "string"}}],
+                    "responses": {"200": {"description": "OK", "content": {"application/json": {
+                        "schema": {"type": "array", "items": ref}}}}}},
+            "post": {"operationId": f"create_{name}", "summary": f"Create {name}",
+                     "requestBody": {"required": True, "content": {"application/json": {"schema": ref}}},
+                     "responses": {"201": ok, "400": {"description": "Invalid"}}},
+        }
+        paths[f"/{name}/{{id}}"] = {
+            "parameters": [{"in": "path", "name": "id", "required": True, "schema": {"type": "string"}}],
+            "get": {"operationId": f"get_{name}", "summary": f"Get one of {name}",
+                    "responses": {"200": ok, "404": {"description": "Not found"}}},
+            "patch": {"operationId": f"update_{name}", "summary": f"Update one of {name}",
+                      "requestBody": {"content": {"application/json": {"schema": ref}}},
+                      "responses": {"200": ok, "404": {"description": "Not found"}}},
+        }
+    doc = {"openapi": "3.0.3", "info": {"title": f"{title} API", "version": "1.0.0"},
+           "servers": [{"url": "/api"}], "paths": paths, "components": {"schemas": schemas}}
+    return yaml.safe_dump(doc, sort_keys=False)
+
+
+def synthetic_spec(resources) -> str:
+    sections = ["# Technical Specification", "## Summary", "A synthetic service for benchmarking.",
+                "## Functional Requirements"]
+    for name in resources:
+        sections += [f"### {name}", f"- Create, list, fetch and update {name} per user.",
+                     f"- Validation errors on {name} return 400 with details.",
+                     f"- {name} are stored in DynamoDB, keyed by userId and id."]
+    sections += ["## Non-Functional Requirements", "- P95 < 200ms for read APIs",
+                 "- IAM, JWT (Cognito), least-privilege", "## Test Plan", "- Unit and contract tests per route."]
+    return "\n".join(sections) + "\n"
+
+
+def fake_model(payload) -> str:
+    prompt = payload["messages"][-1]["content"][0]["text"]
+    resources = _resources(prompt)
+    if "OpenAPI" in prompt:
+        title = prompt.split("for the service '", 1)[-1].split("'", 1)[0]
+        return synthetic_openapi(title, resources)
+    return synthetic_spec(resources)
+
+
+def _pct(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return round(ordered[max(1, math.ceil(pct / 100.0 * len(ordered))) - 1], 4)
+
+
+def _trimmed_mean(values, trim: float = 0.2):
+    ordered = sorted(values)
+    cut = max(1, int(len(ordered) * trim)) if len(ordered) >= 5 else 0
+    kept = ordered[cut:len(ordered) - cut]
+    return round(statistics.fmean(kept), 4) if kept else None
+
+
+def _summary(durations, busy=None):
+    # throughput: what one worker sustains back to back (stages), or tickets per wall second
+    return {
+        "count": len(durations),
+        "p50_s": _pct(durations, 50),
+        "p95_s": _pct(durations, 95),
+        "mean_s": round(statistics.fmean(durations), 4) if durations else None,
+        "trimmed_mean_s": _trimmed_mean(durations),
+        "throughput_per_s": round(len(durations) / busy, 3) if busy else None,
+    }
+
+
+def run_pipeline(tickets, bedrock_client, warmup: int = 1):
+    """
+    Runs the tickets one at a time in a throwaway workspace; the first `warmup` are not measured.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="copilot-bench-") as workspace:
+        shutil.copytree(REPO_ROOT / "docs", Path(workspace) / "docs")
+        os.chdir(workspace)
+        try:
+            supervisor = PipelineBenchSupervisor(bedrock_client)
+            runs, measured_s = [], 0.0
+            for i, ticket in enumerate(tickets):
+                start = time.perf_counter()
+                out = supervisor.handle_ticket(ticket, resume=False)
+                if out["status"] != "completed":
+                    failed = [o for o in out["outputs"] if o["status"] != "ok"]
+                    raise RuntimeError(f"{ticket['id']} did not complete: {failed}")
+                if i >= warmup:
+                    measured_s += time.perf_counter() - start
+                    runs.append(out)
+        finally:
+            os.chdir(previous)
+
+    stages = {}
+    for name in PIPELINE_STAGES:
+        durations = [o["duration_s"] for run in runs for o in run["outputs"] if o["agent"] == name]
+        stages[name] = _summary(durations, sum(durations))
+    end_to_end = _summary([run["elapsed_s"] for run in runs], measured_s)
+    return {"stages": stages, "end_to_end": end_to_end, "wall_s": round(measured_s, 3)}
+
+
+def compare(results, baseline, tolerance: float, min_delta_s: float):
+    """
+    Latencies (and throughput) against the baseline's. Only the robust ones (GATED) can fail
+    the gate, when worse by more than `tolerance` of that stage's own baseline, so a 10ms stage
+    is held to the same standard as a 1s one. min_delta_s only absorbs timer jitter.
+    """
+    rows = []
+    pairs = [("end_to_end", results["end_to_end"], baseline["end_to_end"])]
+    pairs += [(name, stats, baseline["stages"].get(name)) for name, stats in results["stages"].items()]
+    for name, current, base in pairs:
+        if not base:
+            continue
+        for key in ("p50_s", "trimmed_mean_s", "p95_s"):
+            if current[key] is None or not base.get(key):
+                continue
+            ratio = current[key] / base[key]
+            row = {"metric": f"{name}.{key}", "baseline": base[key], "current": current[key],
+                   "ratio": round(ratio, 3), "gated": key in GATED}
+            row["regressed"] = ratio > 1 + tolerance and current[key] - base[key] > min_delta_s
+            rows.append(row)
+        if current["throughput_per_s"] and base.get("throughput_per_s"):
+            ratio = current["throughput_per_s"] / base["throughput_per_s"]
+            slower_s = 1 / current["throughput_per_s"] - 1 / base["throughput_per_s"]
+            rows.append({"metric": f"{name}.throughput_per_s", "baseline": base["throughput_per_s"],
+                         "current": current["throughput_per_s"], "ratio": round(ratio, 3), "gated": False,
+                         "regressed": ratio < 1 / (1 + tolerance) and slower_s > min_delta_s})
+    regressions = [row["metric"] for row in rows if row["regressed"] and row["gated"]]
+    return {"tolerance": tolerance, "min_delta_s": min_delta_s, "metrics": rows, "regressions": regressions}
+
+
+def main():
+    tracing.enable_from_env()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=12)
+    parser.add_argument("--warmup", type=int, default=1, help="leading tickets left out of the stats")
+    parser.add_argument("--sizes", default="1,3,6", help="API resources per ticket, cycled")
+    parser.add_argument("--ttft", default="0.05,0.3", help="seconds to first token: seconds or median,sigma")
+    parser.add_argument("--tokens-per-s", default="2000,0.2", help="generation rate: tokens/s or median,sigma")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-s", type=float, default=0.002,
+                        help="ignore slowdowns smaller than this (timer jitter), whatever the ratio")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    ttft, rate = _distribution(args.ttft), _distribution(args.tokens_per_s)
+    tickets = [synthetic_ticket(i, sizes[i % len(sizes)]) for i in range(args.tickets + args.warmup)]
+
+    def measure():
+        # A fresh fake per run, so a retry draws the same model latencies as the first run
+        rng, lock = random.Random(args.seed), threading.Lock()
+        fake = FakeBedrockClient(responder=fake_model, latency=_sampler(ttft, rng, lock),
+                                 tokens_per_s=_sampler(rate, rng, lock))
+        with contextlib.redirect_stdout(sys.stderr):  # agents log to stdout; keep it for the JSON
+            return run_pipeline(tickets, fake, warmup=args.warmup), len(fake.calls)
+
+    measured, model_calls = measure()
+    settings = {
+        "tickets": args.tickets,
+        "warmup": args.warmup,
+        "sizes": sizes,
+        "ttft": list(ttft) if isinstance(ttft, tuple) else ttft,
+        "tokens_per_s": list(rate) if isinstance(rate, tuple) else rate,
+        "seed": args.seed,
+    }
+    results = dict(settings, model_calls=model_calls, **measured)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        results["baseline"] = {"updated": str(baseline_path)}
+    elif baseline_path.is_file():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        mismatched = [key for key in COMPARABLE if baseline.get(key) != settings[key]]
+        if mismatched:
+            results["baseline"] = {"skipped": f"recorded with different {', '.join(mismatched)}"}
+        else:
+            results["baseline"] = compare(measured, baseline, args.tolerance, args.min_delta_s)
+            first = results["baseline"]["regressions"]
+            if first:  # one noisy run shouldn't fail the gate: measure again before deciding
+                print(f"Slower than the baseline ({', '.join(first)}); retrying once", file=sys.stderr)
+                measured, _ = measure()
+                results.update(measured)
+                retry = compare(measured, baseline, args.tolerance, args.min_delta_s)
+                # Only a slowdown both runs agree on counts
+                retry["regressions"] = [metric for metric in retry["regressions"] if metric in first]
+                results["baseline"] = dict(retry, retried_after=first)
+    print(json.dumps(results, indent=2))
+    if (results.get("baseline") or {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import json
@@ -5,9 +6,33 @@ import json
 # Ensure the repo root is on sys.path (so 'agents' can be imported)
 sys.path.append(os.path.abspath("."))
 
+from agents.common import tracing
 from agents.code_generator.agent import CodeGeneratorAgent
+from agents.code_generator.batch import run_batch
 
 if __name__ == "__main__":
+    tracing.enable_from_env()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true",
+                        help="scaffold a service for every docs/specs/*-openapi.yaml in parallel")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.all:
+        out = run_batch(
+            specs_dir="docs/specs",
+            services_root="services",
+            region="us-east-1",
+            service_names={"TKT-DEMO": "customer-alerts"},
+            max_workers=args.workers,
+        )
+        for svc in out["services"]:
+            if svc["status"] != "ok":
+                print(f"[CodeGenerator] {svc['spec']} failed: {svc['error']}", file=sys.stderr)
+            svc.pop("traceback", None)
+        print(json.dumps(out, indent=2))
+        sys.exit(0 if out["status"] == "ok" else 1)
+
     openapi_path = "docs/specs/TKT-DEMO-openapi.yaml"  # adjust if using a different ticket id
     agent = CodeGeneratorAgent(
         openapi_path=openapi_path,
@@ -15,4 +40,4 @@ if __name__ == "__main__":
         region="us-east-1"
     )
     out = agent.run({"service_name": "customer-alerts"})
-    print(json.dumps(out, indent=2))
\ No newline at end of file
+    print(json.dumps(out, indent=2))
@@ -1,12 +1,21 @@
-import os, sys, json
+import os, sys, json, argparse
 sys.path.append(os.path.abspath("."))
 
+from agents.common import tracing
 from agents.devops_iac.agent import DevOpsIacAgent
 
 if __name__ == "__main__":
+    tracing.enable_from_env()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-type", choices=["rest", "http"], default="rest",
+                        help="API Gateway REST API (supports stage caching) or HTTP API (v2)")
+    args = parser.parse_args()
+
     agent = DevOpsIacAgent(cdk_dir="infra/cdk")
     out = agent.run({
         "region": "us-east-1",
-        "service_dir": "services/customer-alerts"
+        "service_dir": "services/customer-alerts",
+        "openapi_path": "docs/specs/TKT-DEMO-openapi.yaml",
+        "api_type": args.api_type,
     })
     print(json.dumps(out, indent=2))
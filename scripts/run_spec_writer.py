@@ -3,9 +3,11 @@ import json
 import sys, os
 sys.path.append(os.path.abspath("."))  # ensures repo root is on sys.path
 
+from agents.common import tracing
 from agents.spec_writer.agent import SpecWriterAgent
 
 if __name__ == "__main__":
+    tracing.enable_from_env()
     ticket = {
         "id": "TKT-DEMO",
         "title": "Customer Alerts microservice",
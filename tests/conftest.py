@@ -0,0 +1,49 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    A throwaway repo layout (templates + demo spec) with cwd set to it,
+    since the agents resolve docs/, services/ and infra/ relative to cwd.
+    """
+    shutil.copytree(REPO_ROOT / "docs", tmp_path / "docs")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+SYNTH = """\
+import json
+import aws_cdk as cdk
+from aws_cdk.assertions import Template
+from stacks.alerts_api_stack import AlertsApiStack
+
+app = cdk.App()
+print(json.dumps(Template.from_stack(AlertsApiStack(app, "AlertsApiStack")).to_json()))
+"""
+
+
+@pytest.fixture
+def cdk_synth(monkeypatch):
+    """
+    Synthesizes the generated stack offline (no AWS account/credentials needed) in a
+    subprocess, so each test gets a fresh jsii runtime. Returns the CloudFormation template.
+    """
+    pytest.importorskip("aws_cdk")
+    monkeypatch.setenv("JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION", "1")
+
+    def synth(cdk_dir) -> dict:
+        proc = subprocess.run([sys.executable, "-c", SYNTH], cwd=cdk_dir,
+                              capture_output=True, text=True, timeout=300, env=dict(os.environ))
+        assert proc.returncode == 0, proc.stderr
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    return synth
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.common.artifact_bus import ArtifactBus
+from agents.common.manifest import inputs_hash
+from agents.spec_writer.agent import SpecWriterAgent
+from agents.supervisor.supervisor import SupervisorAgent
+
+TICKET = {"id": "TKT-BUS", "title": "Bus demo", "description": "Alerts"}
+OPENAPI = "docs/specs/TKT-BUS-openapi.yaml"
+
+
+def test_spec_and_code_stay_in_memory_until_flush(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    bus = ArtifactBus()
+    SpecWriterAgent().run({"ticket": TICKET, "bus": bus})
+    out = CodeGeneratorAgent(OPENAPI, "services/bus-demo").run({"ticket": TICKET, "bus": bus})
+
+    assert not Path(OPENAPI).exists() and not Path("services/bus-demo").exists()
+    assert out["files"]["buffered"] > 0 and bus.stats["parses"] == 1
+    assert "services/bus-demo/handler.py" in bus.files("services/bus-demo")
+
+    bus.flush()
+    assert Path(OPENAPI).read_text(encoding="utf-8") == bus.read_text(OPENAPI)
+    assert Path("services/bus-demo/handler.py").exists()
+    assert bus.pending() == [] and bus.flush()["written"] == 0
+
+    # The manifest was recorded against the flushed files, so a disk-mode rerun is a no-op
+    assert CodeGeneratorAgent(OPENAPI, "services/bus-demo").run({"ticket": TICKET})["skipped"] is True
+
+
+def test_bus_hashes_match_the_files_it_writes(workspace):
+    bus = ArtifactBus()
+    spec = Path("docs/specs/x.yaml")
+    bus.put(spec, "openapi: 3.0.0\n")
+    in_memory = inputs_hash(spec, {"a": 1}, hasher=bus.file_hash)
+    bus.flush()
+    assert inputs_hash(spec, {"a": 1}) == in_memory
+    assert in_memory != inputs_hash(str(spec), {"a": 1})  # hashed by content, not by name
+
+
+def test_create_only_artifacts_never_shadow_the_file_on_disk(workspace):
+    path = workspace / "services" / "tests" / "conftest.py"
+    path.parent.mkdir(parents=True)
+    path.write_text("# hand-written\n", encoding="utf-8")
+    bus = ArtifactBus()
+    bus.emitter().emit(path, "# scaffold\n", create_only=True)
+
+    assert bus.read_text(path) == "# hand-written\n"
+    assert bus.flush()["kept"] == 1
+    assert path.read_text(encoding="utf-8") == "# hand-written\n"
+
+
+def test_supervisor_parses_the_spec_once_per_ticket(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    out = SupervisorAgent().handle_ticket(TICKET)
+
+    assert out["status"] == "completed", out["outputs"]
+    assert out["artifacts"]["parses"] == 1  # code generation and IaC share one parsed document
+    assert out["artifacts"]["flushes"] == 2  # before packaging, and at the end of the run
+    assert (workspace / OPENAPI).exists()
+    assert (workspace / "infra/cdk/stacks/alerts_api_stack.py").exists()
@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+from benchmarks.bench_pipeline import DEFAULT_BASELINE, compare
+
+
+def _scaled(baseline, stage, factor):
+    results = json.loads(json.dumps(baseline))
+    stats = results["stages"][stage]
+    for key in ("p50_s", "p95_s", "mean_s", "trimmed_mean_s"):
+        stats[key] = round(stats[key] * factor, 4)
+    stats["throughput_per_s"] = round(stats["throughput_per_s"] / factor, 3)
+    return results
+
+
+def test_a_fast_stage_getting_twice_as_slow_is_a_regression():
+    baseline = json.loads(Path(DEFAULT_BASELINE).read_text(encoding="utf-8"))
+    assert baseline["stages"]["code_generator_agent"]["p50_s"] < 0.05  # a few ms per ticket
+
+    report = compare(_scaled(baseline, "code_generator_agent", 2.0), baseline, tolerance=0.25, min_delta_s=0.002)
+    assert report["regressions"] == ["code_generator_agent.p50_s", "code_generator_agent.trimmed_mean_s"]
+
+    report = compare(_scaled(baseline, "code_generator_agent", 1.1), baseline, tolerance=0.25, min_delta_s=0.002)
+    assert report["regressions"] == []
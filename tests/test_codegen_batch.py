@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+from agents.code_generator.batch import run_batch, service_name_for
+from agents.common.manifest import Manifest
+
+
+def _specs(workspace, n):
+    demo = (workspace / "docs/specs/TKT-DEMO-openapi.yaml").read_text(encoding="utf-8")
+    for i in range(n):
+        (workspace / f"docs/specs/TKT-{i}-openapi.yaml").write_text(demo, encoding="utf-8")
+
+
+def test_service_names_come_from_file_names():
+    assert service_name_for(Path("docs/specs/TKT-42_b-openapi.yaml")) == "tkt-42-b"
+    assert service_name_for(Path("TKT-DEMO-openapi.yaml"), {"TKT-DEMO": "customer-alerts"}) == "customer-alerts"
+
+
+def test_batch_scaffolds_every_spec_in_a_process_pool(workspace):
+    _specs(workspace, 3)
+
+    out = run_batch(max_workers=2)
+
+    assert out["status"] == "ok" and out["total"] == 4 and out["workers"] == 2
+    for name in ("tkt-0", "tkt-1", "tkt-2", "tkt-demo"):
+        assert (workspace / "services" / name / "routes.py").exists()
+    # every worker's manifest entry survived the concurrent writes
+    stages = [f"code_generator:services/{n}" for n in ("tkt-0", "tkt-1", "tkt-2", "tkt-demo")]
+    assert all(Manifest().entry(s) for s in stages)
+
+    assert run_batch(max_workers=2)["skipped"] == 4
+
+
+def test_one_bad_spec_does_not_sink_the_batch(workspace):
+    _specs(workspace, 1)
+    (workspace / "docs/specs/TKT-BAD-openapi.yaml").write_text("paths: [unbalanced", encoding="utf-8")
+
+    out = run_batch(max_workers=2)
+
+    assert out["status"] == "partial"
+    assert out["failed"] == 1 and out["succeeded"] == 2
+    bad = next(s for s in out["services"] if s["status"] == "failed")
+    assert bad["spec"].endswith("TKT-BAD-openapi.yaml")
+    assert bad["error"].startswith("ParserError")
+
+
+def test_specs_that_slug_alike_are_rejected_before_any_work(workspace):
+    _specs(workspace, 1)
+    (workspace / "docs/specs/TKT-0-openapi.yaml").rename(workspace / "docs/specs/TKT_1-openapi.yaml")
+    _specs(workspace, 2)  # TKT-0, TKT-1; TKT-1 and TKT_1 both map to tkt-1
+
+    with pytest.raises(ValueError, match="tkt-1: TKT-1-openapi.yaml, TKT_1-openapi.yaml"):
+        run_batch(max_workers=1)
+    assert not (workspace / "services").exists()
+    assert run_batch(max_workers=1, service_names={"TKT_1": "tkt-1-alt"})["succeeded"] == 4
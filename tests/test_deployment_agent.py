@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from agents.common.openapi import load_openapi
+from agents.deployment.agent import DeploymentAgent, build_probe, percentile
+from agents.deployment.local_server import LambdaProxyServer
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SERVICE_DIR = REPO_ROOT / "services" / "customer-alerts"
+OPENAPI = "docs/specs/TKT-DEMO-openapi.yaml"
+
+
+@pytest.fixture
+def alerts_api(workspace, monkeypatch):
+    """
+    services/customer-alerts/handler.py behind a local HTTP server, on a moto DynamoDB table.
+    """
+    for key in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(key, "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("ALERTS_TABLE", "customer-alerts")
+    monkeypatch.delenv("COPILOT_DEPLOY_BASE_URL", raising=False)
+    with mock_aws():
+        boto3.client("dynamodb").create_table(
+            TableName="customer-alerts",
+            KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "PK", "AttributeType": "S"},
+                                  {"AttributeName": "SK", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        with LambdaProxyServer(SERVICE_DIR, OPENAPI) as server:
+            yield server
+
+
+def _run(server, **kwargs):
+    return DeploymentAgent(requests_per_route=6, concurrency=4).run(
+        dict({"base_url": server.base_url, "openapi_path": OPENAPI}, **kwargs))
+
+
+def test_probes_are_built_from_the_spec(workspace):
+    doc = load_openapi(OPENAPI)
+    create = build_probe(doc, "POST", "/alerts", doc.operation("POST", "/alerts"))
+    assert create["body"] == '{"userId": "smoke-userId", "type": "INFO", "message": "smoke-message"}'
+    listing = build_probe(doc, "GET", "/alerts", doc.operation("GET", "/alerts"))
+    assert listing["path"] == "/alerts?userId=smoke-userId"
+    patch = build_probe(doc, "PATCH", "/alerts/{id}", doc.operation("PATCH", "/alerts/{id}"),
+                        {"path": {"id": "abc"}})
+    assert (patch["path"], patch["body"]) == ("/alerts/abc", '{"read": true}')
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95) == 10
+    assert percentile([1, 2, 3, 4], 50) == 2
+
+
+def test_every_route_passes_smoke_and_the_spec_budget(alerts_api):
+    # TKT-DEMO-spec.md: "P95 < 200ms for read APIs"
+    out = _run(alerts_api)
+
+    assert out["promote"] is True, out
+    routes = {(r["method"], r["route"]): r for r in out["routes"]}
+    assert set(routes) == {("GET", "/health"), ("POST", "/alerts"), ("GET", "/alerts"), ("PATCH", "/alerts/{id}")}
+    assert routes[("GET", "/alerts")]["status_codes"] == {"200": 6}
+    assert routes[("POST", "/alerts")]["status_codes"] == {"201": 1}  # writes get one smoke probe
+    assert routes[("PATCH", "/alerts/{id}")]["undocumented"] == ["404"]  # smoke id doesn't exist
+    get_alerts = routes[("GET", "/alerts")]
+    assert [b["budget_ms"] for b in get_alerts["budgets"]] == [200.0]
+    assert get_alerts["budgets"][0]["observed_ms"] == get_alerts["p95_ms"]
+    assert routes[("POST", "/alerts")]["budgets"] == []  # the NFR only covers reads
+
+
+def test_latency_budget_violation_blocks_promotion(alerts_api):
+    out = _run(alerts_api, constraints=["P95 < 0.001ms for GET /alerts"])
+
+    assert out["status"] == "blocked" and out["promote"] is False
+    assert [(v["method"], v["route"], v["budget_ms"]) for v in out["violations"]] == [("GET", "/alerts", 0.001)]
+    assert out["smoke_failures"] == []
+
+
+def test_writes_are_load_tested_only_when_asked(alerts_api):
+    budget = ["P95 < 0.001ms for POST /alerts"]
+    out = _run(alerts_api, constraints=budget)
+    post = next(r for r in out["routes"] if r["method"] == "POST")
+    assert out["promote"] is True and post["requests"] == 1 and post["load_tested"] is False
+    assert post["budgets"][0]["ok"] is None and "load_test_writes" in post["budgets"][0]["skipped"]
+
+    out = _run(alerts_api, constraints=budget, ticket={"load_test_writes": True})
+    post = next(r for r in out["routes"] if r["method"] == "POST")
+    assert post["status_codes"] == {"201": 6}
+    assert [(v["method"], v["route"]) for v in out["violations"]] == [("POST", "/alerts")]
+
+
+def test_server_errors_fail_the_smoke_check(alerts_api, monkeypatch):
+    monkeypatch.setenv("ALERTS_TABLE", "missing-table")
+    out = _run(alerts_api)
+
+    assert out["promote"] is False
+    assert any(f.startswith("POST /alerts: HTTP 500") for f in out["smoke_failures"])
+    assert not any("/health" in f for f in out["smoke_failures"])
+
+
+def test_wrong_stage_path_fails_the_smoke_check(alerts_api):
+    out = DeploymentAgent(requests_per_route=2).run({"base_url": alerts_api.base_url + "/prod",
+                                                     "openapi_path": OPENAPI})
+
+    assert out["promote"] is False
+    assert "GET /health: HTTP 404 (not a documented response)" in out["smoke_failures"]
+    assert all(r["status_codes"] == {"404": 2 if r["method"] == "GET" else 1} for r in out["routes"])
+
+
+def test_skips_without_an_endpoint(workspace, monkeypatch):
+    monkeypatch.delenv("COPILOT_DEPLOY_BASE_URL", raising=False)
+    out = DeploymentAgent().run({"openapi_path": OPENAPI})
+    assert out == {"status": "ok", "verified": False, "promote": None, "reason": "no deployed endpoint to verify"}
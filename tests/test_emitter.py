@@ -0,0 +1,68 @@
+import os
+import shutil
+import stat
+from pathlib import Path
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.common.emitter import ArtifactEmitter
+from agents.devops_iac.agent import DevOpsIacAgent
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    target = tmp_path / "a.txt"
+    assert ArtifactEmitter().emit(target, "hello\n") == "written"
+    os.utime(target, (1, 1))
+
+    emitter = ArtifactEmitter()
+    assert emitter.emit(target, "hello\n") == "unchanged"
+    assert target.stat().st_mtime == 1
+    assert emitter.summary()["unchanged"] == 1
+
+
+def test_writes_keep_the_existing_mode_or_follow_the_umask(tmp_path):
+    umask = os.umask(0o022)
+    os.umask(umask)
+    fresh = tmp_path / "handler.py"
+    ArtifactEmitter().emit(fresh, "x = 1\n")
+    assert stat.S_IMODE(fresh.stat().st_mode) == 0o666 & ~umask
+
+    script = tmp_path / "deploy.sh"
+    script.write_text("#!/bin/sh\n", encoding="utf-8")
+    script.chmod(0o755)
+    ArtifactEmitter().emit(script, "#!/bin/sh\necho hi\n")
+    assert stat.S_IMODE(script.stat().st_mode) == 0o755
+
+
+def test_dry_run_returns_diff_without_writing(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("one\n", encoding="utf-8")
+
+    emitter = ArtifactEmitter(dry_run=True)
+    emitter.emit(target, "two\n")
+    emitter.emit(tmp_path / "new.txt", "fresh\n")
+
+    assert target.read_text(encoding="utf-8") == "one\n"
+    assert not (tmp_path / "new.txt").exists()
+    diff = emitter.diff()
+    assert "-one" in diff and "+two" in diff and "+fresh" in diff
+
+
+def test_code_generator_keeps_implemented_handler(workspace):
+    service = workspace / "services/customer-alerts"
+    shutil.copytree(REPO_ROOT / "services/customer-alerts", service)
+    implemented = (service / "handler.py").read_text(encoding="utf-8")
+
+    out = CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run({})
+
+    assert (service / "handler.py").read_text(encoding="utf-8") == implemented
+    assert out["files"]["files"][str(Path("services/customer-alerts/handler.py"))] == "kept"
+
+
+def test_second_devops_run_writes_nothing(workspace):
+    DevOpsIacAgent().run({"force": True})
+    out = DevOpsIacAgent().run({"force": True})
+
+    assert out["files"]["written"] == 0
+    assert out["files"]["unchanged"] == 5
@@ -0,0 +1,61 @@
+import json
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.devops_iac.agent import DevOpsIacAgent
+
+SNAPSHOTS = Path(__file__).parent / "snapshots"
+VARIANTS = {
+    "rest": {"api_type": "rest", "cache": {"GET /alerts": 60}},
+    "http": {"api_type": "http"},
+}
+
+
+def _normalize(template: dict) -> dict:
+    # Asset hashes (and the logical ids derived from them) change with any service code edit
+    text = json.dumps(template, indent=1, sort_keys=True)
+    text = re.sub(r"[0-9a-f]{64}\.zip", "<asset>.zip", text)
+    text = re.sub(r"(CurrentVersion[0-9A-F]{8}|Deployment[0-9A-F]{8})[0-9a-f]{32}", r"\1<hash>", text)
+    return json.loads(text)
+
+
+@pytest.mark.parametrize("variant", sorted(VARIANTS))
+def test_stack_matches_snapshot(workspace, cdk_synth, variant):
+    """
+    Set UPDATE_SNAPSHOTS=1 to re-record after an intended template change.
+    """
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run({})
+    DevOpsIacAgent().run(VARIANTS[variant])
+    template = _normalize(cdk_synth(workspace / "infra/cdk"))
+
+    snapshot = SNAPSHOTS / f"alerts_api_{variant}.json"
+    if os.getenv("UPDATE_SNAPSHOTS"):
+        snapshot.parent.mkdir(exist_ok=True)
+        snapshot.write_text(json.dumps(template, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    assert template == json.loads(snapshot.read_text(encoding="utf-8"))
+
+
+def test_cache_keys_and_validation(workspace):
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run({})
+    DevOpsIacAgent().run({"cache": {"GET /alerts": 60, "GET /health": 5}})
+    stack = (workspace / "infra/cdk/stacks/alerts_api_stack.py").read_text(encoding="utf-8")
+    assert "'cache_ttl': 60,\n  'cache_keys': ['method.request.querystring.userId']" in stack
+    assert "'cache_ttl': 5,\n  'cache_keys': []" in stack
+    # Writes are never cached
+    assert "'method': 'POST',\n  'path': '/api/alerts',\n  'memory_size': 512,\n  'timeout': 10,\n" in stack
+
+    with pytest.raises(ValueError):
+        DevOpsIacAgent().run({"cache": {"GET /alerts": 7200}, "force": True})
+
+
+def test_cdk_requirements_cover_the_packaging_step(workspace):
+    DevOpsIacAgent().run({})
+    requirements = (workspace / "infra/cdk/requirements.txt").read_text(encoding="utf-8")
+    workflow = (workspace / ".github/workflows/ci-cd.yml").read_text(encoding="utf-8")
+
+    assert "python -m agents.devops_iac.packager" in workflow
+    assert "PyYAML" in requirements.split()  # lambda_profile -> openapi imports yaml
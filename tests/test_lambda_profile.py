@@ -0,0 +1,47 @@
+import yaml
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.common.lambda_profile import build_profile
+from agents.common.openapi import load_openapi
+from agents.devops_iac.agent import DevOpsIacAgent
+
+CONSTRAINTS = ["Latency P95 < 200ms for GET /alerts", "P99 < 2s for writes"]
+EXPLICIT = {"functions": {"post_alerts": {"reserved_concurrency": 50}}}
+
+
+def test_profile_precedence(workspace):
+    doc = load_openapi("docs/specs/TKT-DEMO-openapi.yaml")
+    fns = build_profile(doc, CONSTRAINTS, EXPLICIT)["functions"]
+
+    assert fns["get_alerts"] == {"memory_size": 1024, "timeout": 3, "reserved_concurrency": None,
+                                 "provisioned_concurrency": 1, "latency_budget_ms": 200.0}
+    assert fns["post_alerts"]["timeout"] == 10 and fns["post_alerts"]["provisioned_concurrency"] == 0
+    assert fns["post_alerts"]["reserved_concurrency"] == 50
+    assert fns["health"]["memory_size"] == 512  # no budget applies to it
+
+
+def test_serverless_and_cdk_render_the_same_profile(workspace, cdk_synth):
+    inputs = {"constraints": CONSTRAINTS, "performance_profile": EXPLICIT}
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run(inputs)
+    DevOpsIacAgent().run(inputs)
+
+    sls = yaml.safe_load((workspace / "services/customer-alerts/serverless.yml").read_text(encoding="utf-8"))
+    assert sls["provider"]["architecture"] == "arm64"
+    assert sls["functions"]["get_alerts"]["provisionedConcurrency"] == 1
+    assert sls["functions"]["post_alerts"]["reservedConcurrency"] == 50
+
+    resources = cdk_synth(workspace / "infra/cdk")["Resources"]
+
+    functions = {r["Properties"]["Handler"]: r["Properties"] for r in resources.values()
+                 if r["Type"] == "AWS::Lambda::Function" and "Handler" in r["Properties"]}
+    for name, settings in sls["functions"].items():
+        props = functions[settings["handler"]]
+        assert props["Architectures"] == ["arm64"]
+        assert props["MemorySize"] == settings["memorySize"]
+        assert props["Timeout"] == settings["timeout"]
+        assert props.get("ReservedConcurrentExecutions") == settings.get("reservedConcurrency")
+
+    aliases = [r["Properties"] for r in resources.values() if r["Type"] == "AWS::Lambda::Alias"]
+    provisioned = sorted(a["ProvisionedConcurrencyConfig"]["ProvisionedConcurrentExecutions"] for a in aliases)
+    assert provisioned == sorted(s["provisionedConcurrency"] for s in sls["functions"].values()
+                                 if "provisionedConcurrency" in s)
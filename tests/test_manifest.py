@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.common.manifest import Manifest
+from agents.devops_iac.agent import DevOpsIacAgent
+from agents.spec_writer.agent import SpecWriterAgent
+
+TICKET = {"id": "TKT-M", "title": "Manifest demo", "description": "Alerts"}
+
+
+def _pipeline(ticket):
+    spec = SpecWriterAgent().run({"ticket": ticket})
+    code = CodeGeneratorAgent(spec["outputs"]["openapi_yaml"], service_dir="services/demo").run({"service_name": "demo"})
+    iac = DevOpsIacAgent().run({"service_dir": "services/demo"})
+    return spec, code, iac
+
+
+def test_rerun_with_unchanged_inputs_skips_every_stage(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    first = _pipeline(TICKET)
+    assert not any(r["skipped"] for r in first)
+    assert (workspace / ".copilot-manifest.json").exists()
+
+    second = _pipeline(TICKET)
+    assert all(r["skipped"] for r in second)
+    assert second[1]["routes"] == first[1]["routes"]
+
+
+def test_ticket_change_redoes_only_spec_stage_when_outputs_are_identical(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    _pipeline(TICKET)
+
+    spec, code, iac = _pipeline(dict(TICKET, constraints=["DynamoDB single-table design preferred"]))
+    assert not spec["skipped"]
+    # The fallback spec/OpenAPI don't render constraints, so downstream stages stay put
+    assert code["skipped"] and iac["skipped"]
+
+    spec, code, iac = _pipeline(dict(TICKET, description="Alerts, now with a longer summary"))
+    # spec.md feeds codegen (latency NFRs), so a new summary reruns codegen but not IaC
+    assert not spec["skipped"] and not code["skipped"]
+    assert iac["skipped"]
+
+
+def test_hand_edited_output_is_detected_and_kept(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    _pipeline(TICKET)
+    handler = Path("services/demo/handler.py")
+    handler.write_text("# implemented by hand\n", encoding="utf-8")
+
+    assert Manifest().hand_edited("code_generator:services/demo") == [str(handler)]
+    out = CodeGeneratorAgent("docs/specs/TKT-M-openapi.yaml", service_dir="services/demo").run(
+        {"service_name": "renamed"})
+
+    assert out["hand_edited"] == [str(handler)]
+    assert handler.read_text(encoding="utf-8") == "# implemented by hand\n"
+    assert "service: renamed" in Path("services/demo/serverless.yml").read_text(encoding="utf-8")
+
+
+def test_kept_hand_edit_survives_later_runs_with_new_inputs(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    _pipeline(TICKET)
+    serverless = Path("services/demo/serverless.yml")
+    serverless.write_text("service: tuned-by-hand\n", encoding="utf-8")
+    agent = CodeGeneratorAgent("docs/specs/TKT-M-openapi.yaml", service_dir="services/demo")
+
+    assert agent.run({"service_name": "b"})["hand_edited"] == [str(serverless)]
+    assert agent.run({"service_name": "c"})["hand_edited"] == [str(serverless)]
+    assert agent.run({"service_name": "c"})["skipped"] is True
+    assert serverless.read_text(encoding="utf-8") == "service: tuned-by-hand\n"
+
+    assert agent.run({"service_name": "c", "force": True})["hand_edited"] == []
+    assert "service: c" in serverless.read_text(encoding="utf-8")
+    assert agent.run({"service_name": "d"})["hand_edited"] == []
@@ -0,0 +1,118 @@
+import random
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from agents.metrics.agent import (FileSnapshotStore, MetricsAgent, S3SnapshotStore, TICKET,
+                                  snapshot_store)
+from agents.metrics.sketch import DDSketch
+from agents.supervisor.stubs import StubSupervisor
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _exact(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def test_sketch_quantiles_are_within_relative_accuracy_and_merge_exactly():
+    rng = random.Random(7)
+    a_values = [rng.lognormvariate(-1, 1) for _ in range(5000)]
+    b_values = [rng.lognormvariate(1, 0.5) for _ in range(5000)]
+    a, b, both = DDSketch(0.01), DDSketch(0.01), DDSketch(0.01)
+    for v in a_values:
+        a.add(v)
+        both.add(v)
+    for v in b_values:
+        b.add(v)
+        both.add(v)
+    a.merge(b)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(a_values + b_values, q)
+        assert abs(a.quantile(q) - exact) <= 0.0101 * exact
+        assert a.quantile(q) == both.quantile(q)
+    assert DDSketch.from_dict(a.to_dict()).quantile(0.95) == a.quantile(0.95)
+
+
+def test_sketch_memory_is_bounded():
+    sketch = DDSketch(0.01, max_buckets=64)
+    for i in range(1, 100_000):
+        sketch.add(i * 1e-3)
+    assert len(sketch.bins) <= 64
+    assert abs(sketch.quantile(0.99) - 99.0) <= 0.0101 * 99.0  # high quantiles unaffected
+
+
+def test_report_and_windows(tmp_path):
+    clock = FakeClock()
+    agent = MetricsAgent(FileSnapshotStore(tmp_path / "m.json"), window_s=60, max_windows=3, clock=clock)
+    for minute in range(5):
+        for i in range(10):
+            agent.record({"stage": "deploy", "status": "failed" if i == 0 else "ok",
+                          "duration_s": 1.0 + minute, "ts": clock.now})
+        agent.record({"stage": TICKET, "status": "ok", "duration_s": 10.0 + minute, "ts": clock.now})
+        clock.now += 60
+
+    clock.now -= 60
+    assert len(agent.windows) == 3
+    report = agent.report()
+    assert report["stages"]["deploy"]["count"] == 50
+    assert report["stages"]["deploy"]["failure_rate"] == 0.1
+    assert report["lead_time"]["tickets"] == 5
+    assert report["lead_time"]["p50_s"] == pytest.approx(12.0, rel=0.01)
+
+    recent = agent.report(last_windows=2)
+    assert recent["stages"]["deploy"]["count"] == 20
+    assert recent["stages"]["deploy"]["p50_s"] == pytest.approx(4.0, rel=0.01)
+    assert recent["lead_time"]["tickets"] == 2
+    assert recent["lead_time"]["p50_s"] == pytest.approx(13.0, rel=0.01)
+
+
+def test_snapshots_round_trip_and_merge(tmp_path):
+    store = FileSnapshotStore(tmp_path / "metrics.json")
+    first = MetricsAgent(store)
+    first.run({"events": [{"stage": "spec", "duration_s": 2.0}, {"stage": "spec", "duration_s": 4.0}]})
+
+    second = MetricsAgent(store)  # restored from the snapshot
+    assert second.report()["stages"]["spec"]["count"] == 2
+
+    other = MetricsAgent(FileSnapshotStore(tmp_path / "other.json"))
+    other.record({"stage": "spec", "status": "timeout", "duration_s": 8.0})
+    second.merge(other.snapshot())
+    spec = second.report()["stages"]["spec"]
+    assert spec["count"] == 3 and spec["outcomes"] == {"ok": 2, "timeout": 1}
+
+
+@mock_aws
+def test_s3_snapshot_store():
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket="copilot-metrics")
+    store = S3SnapshotStore("copilot-metrics", "snapshots/metrics.json", client=client)
+    assert store.load() is None
+
+    out = MetricsAgent(store).run({"events": [{"stage": "deploy", "duration_s": 3.0}]})
+    assert out["snapshot"] == "s3://copilot-metrics/snapshots/metrics.json"
+    assert MetricsAgent(store).report()["stages"]["deploy"]["count"] == 1
+    assert isinstance(snapshot_store("s3://bucket/key.json"), S3SnapshotStore)
+
+
+def test_supervisor_streams_stage_timings(workspace):
+    supervisor = StubSupervisor(latency={"spec_writer_agent": 0.01, "code_generator_agent": 0.01,
+                                         "devops_iac_agent": 0.01, "deployment_agent": 0.02,
+                                         "metrics_agent": 0.0})
+    for i in range(3):
+        supervisor.handle_ticket({"id": f"TKT-M{i}", "title": "Metrics"})
+
+    report = supervisor.registry.get("metrics_agent").report()
+    assert report["lead_time"]["tickets"] == 3
+    assert report["lead_time"]["failure_rate"] == 0.0
+    assert report["stages"]["deployment_agent"]["count"] == 3
+    assert report["stages"]["deployment_agent"]["p50_s"] >= 0.02
@@ -0,0 +1,72 @@
+from agents.common.fake_bedrock import FakeBedrockClient
+from agents.common.model_router import ModelRoute, ModelRouter
+
+
+def _routes():
+    return {
+        "spec": [ModelRoute("big", max_tokens=3000)],
+        "openapi": [ModelRoute("big", temperature=0.0, latency_budget=1.0),
+                    ModelRoute("small", temperature=0.0)],
+    }
+
+
+def test_primary_used_until_observed_slow():
+    router = ModelRouter(_routes(), min_samples=3, probe_every=0)
+    assert router.select("openapi").model_id == "big"
+
+    for _ in range(3):
+        router.record("openapi", "big", 2.5, ok=True)
+    assert router.select("openapi").model_id == "small"
+    # spec has no alternative and no budget, so it stays on the primary
+    assert router.select("spec").model_id == "big"
+
+
+def test_failing_primary_falls_back_and_probe_lets_it_recover():
+    router = ModelRouter(_routes(), min_samples=3, probe_every=4)
+    for _ in range(3):
+        router.record("openapi", "big", 0.1, ok=False)
+
+    picks = [router.select("openapi").model_id for _ in range(4)]
+    assert picks == ["small", "small", "small", "big"]
+
+
+def test_spec_writer_routes_tasks_to_models(workspace):
+    from agents.spec_writer.agent import SpecWriterAgent
+
+    def responder(payload):
+        return "openapi: 3.0.3\ninfo: {}\n" if payload["temperature"] == 0.0 else "# Spec"
+
+    fake = FakeBedrockClient(responder=responder)
+    routes = _routes()
+    agent = SpecWriterAgent(model_id="big", bedrock_client=fake, routes=routes)
+    for _ in range(5):
+        agent.router.record("openapi", "big", 5.0, ok=True)
+
+    agent.run({"ticket": {"id": "TKT-R", "title": "Routing"}})
+
+    assert [c["modelId"] for c in fake.calls] == ["big", "small"]
+    assert fake.calls[0]["payload"]["max_tokens"] == 3000
+    assert (workspace / "docs/specs/TKT-R-openapi.yaml").read_text(encoding="utf-8").startswith("openapi:")
+
+
+def test_slow_calls_for_one_task_dont_reroute_another():
+    router = ModelRouter(_routes(), min_samples=3, probe_every=0)
+    for _ in range(3):
+        router.record("spec", "big", 30.0, ok=True)  # long specs, no budget
+
+    assert router.select("openapi").model_id == "big"
+    assert router.snapshot()["spec"]["big"]["samples"] == 3 and "openapi" not in router.snapshot()
+
+
+def test_open_circuit_on_the_primary_falls_back_without_counting_against_it(workspace):
+    from agents.common.bedrock import CircuitBreaker
+    from agents.spec_writer.agent import SpecWriterAgent
+
+    fake = FakeBedrockClient(responder=lambda payload: "openapi: 3.0.3\ninfo: {}\n")
+    agent = SpecWriterAgent(model_id="big", bedrock_client=fake, routes=_routes(),
+                            breaker_factory=lambda: CircuitBreaker(failure_threshold=1))
+    agent.bedrock.breaker("big").record_failure()
+
+    assert agent._invoke("openapi", []).startswith("openapi:")
+    assert [c["modelId"] for c in fake.calls] == ["small"]
+    assert "big" not in agent.router.snapshot().get("openapi", {})
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from agents.common.openapi import OpenApiDocument, OpenApiLoader
+
+
+SPEC = """\
+openapi: 3.0.3
+paths:
+  /alerts:
+    parameters: []
+    get:
+      responses: {}
+    post:
+      requestBody:
+        content:
+          application/json:
+            schema:
+              $ref: '#/components/schemas/CreateAlias'
+components:
+  schemas:
+    CreateAlias:
+      $ref: '#/components/schemas/Create'
+    Create:
+      type: object
+      required: [userId]
+"""
+
+
+def test_index_skips_non_operation_keys_and_resolves_ref_chains():
+    import yaml
+    doc = OpenApiDocument(yaml.safe_load(SPEC))
+
+    assert doc.route_summary() == ["GET /alerts", "POST /alerts"]
+    body = doc.operation("post", "/alerts")["requestBody"]["content"]["application/json"]["schema"]
+    assert doc.deref(body)["required"] == ["userId"]
+    assert doc.schema("CreateAlias") is doc.schema("Create")
+
+
+def test_circular_refs_are_reported():
+    doc = OpenApiDocument({"components": {"schemas": {
+        "A": {"$ref": "#/components/schemas/B"}, "B": {"$ref": "#/components/schemas/A"}}}})
+    with pytest.raises(ValueError):
+        doc.schema("A")
+
+
+def test_parse_cache_is_keyed_by_content(tmp_path):
+    spec = tmp_path / "svc-openapi.yaml"
+    spec.write_text(SPEC, encoding="utf-8")
+    cache = tmp_path / "cache"
+
+    loader = OpenApiLoader(cache_dir=str(cache))
+    first = loader.load(spec)
+    assert loader.load(spec) is first
+    assert OpenApiLoader(cache_dir=str(cache)).load(spec).data == first.data
+    assert loader.stats["parsed"] == 1
+
+    spec.write_text(SPEC.replace("userId", "accountId"), encoding="utf-8")
+    assert loader.load(spec).schema("Create")["required"] == ["accountId"]
+    assert loader.stats["parsed"] == 2
+
+
+def test_disk_cache_is_plain_json_and_round_trips_yaml_types(tmp_path):
+    spec = tmp_path / "typed-openapi.yaml"
+    spec.write_text(SPEC + "x-released: 2024-05-01\nx-codes: {200: ok}\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    parsed = OpenApiLoader(cache_dir=str(cache)).load(spec).data
+
+    loader = OpenApiLoader(cache_dir=str(cache))
+    assert loader.load(spec).data == parsed
+    assert loader.stats == {"parsed": 0, "memory_hits": 0, "disk_hits": 1}
+    [entry] = cache.iterdir()
+    assert entry.suffix == ".json" and json.loads(entry.read_text(encoding="utf-8"))["openapi"]
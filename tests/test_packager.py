@@ -0,0 +1,100 @@
+import shutil
+import sys
+import zipfile
+from pathlib import Path
+
+from agents.common.manifest import Manifest
+from agents.devops_iac.agent import DevOpsIacAgent
+from agents.devops_iac.packager import build_package, prune_runtime_provided, runtime_requirements
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _service(workspace) -> Path:
+    service = workspace / "services" / "customer-alerts"
+    shutil.copytree(REPO_ROOT / "services" / "customer-alerts", service)
+    (service / "__pycache__").mkdir(exist_ok=True)
+    (service / "__pycache__" / "stale.cpython-311.pyc").write_bytes(b"stale")
+    return service
+
+
+def test_package_is_minimal_and_reproducible(workspace):
+    service = _service(workspace)
+    first = build_package(service, "out-a", manifest=Manifest("m-a.json"))
+    second = build_package(service, "out-b", manifest=Manifest("m-b.json"))
+
+    assert first["sha256"] == second["sha256"]
+    assert first["size_bytes"] == Path(first["path"]).stat().st_size
+    assert first["dependencies"] == [] and "boto3" in first["left_out"]
+
+    names = zipfile.ZipFile(first["path"]).namelist()
+    assert "handler.py" in names
+    assert not [n for n in names if n.startswith("tests/") or n.endswith(("stale.cpython-311.pyc", ".yml"))]
+    if sys.version_info[:2] == (3, 11):
+        assert first["precompiled"] and "__pycache__/handler.cpython-311.pyc" in names
+
+
+def test_package_rebuilds_only_when_sources_change(workspace):
+    service = _service(workspace)
+    manifest = Manifest()
+    built = build_package(service, manifest=manifest)
+    assert build_package(service, manifest=manifest)["skipped"] is True
+
+    # Test-only edits don't touch the artifact
+    (service / "tests" / "test_extra.py").write_text("def test_x():\n    pass\n", encoding="utf-8")
+    assert build_package(service, manifest=manifest)["skipped"] is True
+
+    (service / "handler.py").write_text((service / "handler.py").read_text() + "\n# changed\n", encoding="utf-8")
+    rebuilt = build_package(service, manifest=manifest)
+    assert rebuilt["skipped"] is False and rebuilt["sha256"] != built["sha256"]
+
+
+def test_runtime_requirements_drop_sdk_and_dev_packages(tmp_path):
+    (tmp_path / "requirements.txt").write_text(
+        "boto3>=1.28\npytest\nmoto[dynamodb]\naws-lambda-powertools==2.30.0  # logging\n-r base.txt\n",
+        encoding="utf-8")
+    keep, dropped = runtime_requirements(tmp_path)
+    assert keep == ["aws-lambda-powertools==2.30.0"]
+    assert dropped == ["boto3>=1.28", "pytest", "moto[dynamodb]"]
+
+
+def test_stack_points_at_built_package(workspace):
+    _service(workspace)
+    out = DevOpsIacAgent().run({})
+    assert out["package"]["path"] == ".build/lambda/customer-alerts.zip"
+    stack = (workspace / "infra/cdk/stacks/alerts_api_stack.py").read_text(encoding="utf-8")
+    assert "ASSET_PATH = '../../.build/lambda/customer-alerts.zip'" in stack
+    workflow = (workspace / ".github/workflows/ci-cd.yml").read_text(encoding="utf-8")
+    assert "python -m agents.devops_iac.packager services/customer-alerts --out-dir .build/lambda" in workflow
+    assert "${{ secrets.AWS_CDK_ROLE_ARN }}" in workflow
+
+
+def _dist(target, dist, version, files):
+    info = target / f"{dist}-{version}.dist-info"
+    info.mkdir(parents=True)
+    for rel in files:
+        (target / rel).parent.mkdir(parents=True, exist_ok=True)
+        (target / rel).write_text("", encoding="utf-8")
+    (info / "RECORD").write_text("".join(f"{rel},sha256=x,0\n" for rel in files) + f"{info.name}/RECORD,,\n",
+                                 encoding="utf-8")
+
+
+def test_install_prunes_every_runtime_provided_distribution(tmp_path):
+    _dist(tmp_path, "python_dateutil", "2.9.0.post0", ["dateutil/__init__.py", "dateutil/tz/tz.py"])
+    _dist(tmp_path, "six", "1.16.0", ["six.py"])
+    _dist(tmp_path, "s3transfer", "0.10.1", ["s3transfer/__init__.py"])
+    _dist(tmp_path, "jmespath", "1.0.1", ["jmespath/__init__.py"])
+    _dist(tmp_path, "aws_lambda_powertools", "2.30.0", ["aws_lambda_powertools/__init__.py"])
+
+    prune_runtime_provided(tmp_path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["aws_lambda_powertools", "aws_lambda_powertools-2.30.0.dist-info"]
+
+
+def test_serverless_no_deploy_matches_the_packager(workspace):
+    from agents.code_generator.agent import CodeGeneratorAgent
+    from agents.common.lambda_profile import DEV_ONLY, RUNTIME_PROVIDED
+
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml", service_dir="svc").run({})
+    serverless = (workspace / "svc/serverless.yml").read_text(encoding="utf-8")
+    assert f"noDeploy: [{', '.join(RUNTIME_PROVIDED + DEV_ONLY)}]" in serverless
@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.common.nfr import latency_budgets, parse_constraints
+from agents.common.openapi import OpenApiDocument
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_parse_constraints():
+    rules = parse_constraints([
+        "Latency P95 < 200ms for GET /alerts",
+        "P95 < 200ms for read APIs",
+        "p99 under 1.5s",
+        "JWT auth via API Gateway + Cognito",
+    ])
+    assert [(r["percentile"], r["budget_ms"], r["method"], r["route"], r["scope"]) for r in rules] == [
+        (95.0, 200.0, "GET", "/alerts", None),
+        (95.0, 200.0, None, None, "read"),
+        (99.0, 1500.0, None, None, None),
+    ]
+
+
+def test_route_rules_and_extensions_override_broad_rules():
+    doc = OpenApiDocument({"paths": {
+        "/alerts": {"get": {}, "post": {"x-latency-p95": "300ms"}},
+        "/alerts/{id}": {"get": {}},
+    }})
+    budgets = latency_budgets(doc, ["Latency P95 < 150ms for GET /api/alerts", "P95 < 500ms for all"], "/api")
+
+    assert {k: v["budget_ms"] for k, v in budgets.items()} == {
+        ("GET", "/alerts", 95.0): 150.0,
+        ("POST", "/alerts", 95.0): 300.0,
+        ("GET", "/alerts/{id}", 95.0): 500.0,
+    }
+
+
+def test_generated_perf_tests_enforce_budgets_against_real_handler(workspace):
+    pytest.importorskip("moto")
+    shutil.copytree(REPO_ROOT / "services/customer-alerts", workspace / "services/customer-alerts",
+                    ignore=shutil.ignore_patterns("__pycache__", ".pytest_cache"))
+
+    out = CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run(
+        {"constraints": ["Latency P95 < 200ms for GET /alerts", "P99 < 2s for writes"]})
+    assert "GET /alerts p95 <= 200ms" in out["latency_budgets"]
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests/test_perf_routes.py"],
+        cwd=workspace / "services/customer-alerts", env=dict(os.environ, PERF_SAMPLES="20"),
+        capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "4 passed" in proc.stdout
+
+
+def test_generated_requirements_install_the_perf_test_deps_but_dont_ship_them(workspace):
+    from agents.devops_iac.packager import runtime_requirements
+
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml").run({"constraints": ["P95 < 200ms for GET /alerts"]})
+    service = workspace / "services/customer-alerts"
+    assert (service / "tests/test_perf_routes.py").exists()
+
+    keep, dropped = runtime_requirements(service)
+    assert keep == [] and {"pytest", "moto[dynamodb]"} <= set(dropped)
+    assert "moto" in (service / "serverless.yml").read_text(encoding="utf-8").split("noDeploy:", 1)[1]
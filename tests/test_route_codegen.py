@@ -0,0 +1,167 @@
+import importlib
+import json
+import sys
+import time
+
+import pytest
+
+from agents.code_generator.agent import CodeGeneratorAgent
+from agents.code_generator.routes import SchemaCompiler
+from agents.common.openapi import OpenApiDocument
+
+STUB_HANDLER = """\
+def create_alert(event, context):
+    return {"statusCode": 201, "body": event["body"]}
+"""
+
+
+@pytest.fixture
+def routes(workspace, monkeypatch):
+    service = workspace / "svc"
+    service.mkdir()
+    (service / "handler.py").write_text(STUB_HANDLER, encoding="utf-8")
+    CodeGeneratorAgent("docs/specs/TKT-DEMO-openapi.yaml", service_dir="svc").run({})
+
+    monkeypatch.syspath_prepend(str(service))
+    for name in ("routes", "handler"):
+        sys.modules.pop(name, None)
+    yield importlib.import_module("routes")
+    for name in ("routes", "handler"):
+        sys.modules.pop(name, None)
+
+
+def _errors(resp):
+    assert resp["statusCode"] == 400
+    return json.loads(resp["body"])["errors"]
+
+
+def test_invalid_body_is_rejected_with_every_problem(routes):
+    errors = _errors(routes.post_alerts({"body": json.dumps({"userId": 1, "type": "LOUD"})}, None))
+    assert errors == [
+        "body.message: is required",
+        "body.userId: expected string",
+        "body.type: must be one of INFO, WARNING, CRITICAL",
+    ]
+    assert _errors(routes.post_alerts({"body": "{not json"}, None)) == ["body: invalid JSON"]
+
+
+def test_valid_request_delegates_to_operation_id(routes):
+    body = json.dumps({"userId": "u1", "type": "INFO", "message": "hi"})
+    assert routes.post_alerts({"body": body}, None)["statusCode"] == 201
+    # list_alerts isn't implemented in the stub handler
+    assert routes.get_alerts({"queryStringParameters": {"userId": "u1"}}, None)["statusCode"] == 501
+    assert _errors(routes.get_alerts({"queryStringParameters": None}, None)) == ["query.userId: is required"]
+
+
+def test_validation_costs_microseconds(routes):
+    event = {"pathParameters": {"id": "a1"}, "body": json.dumps({"read": "yes"})}
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        routes.patch_alerts_id(event, None)
+    per_call = (time.perf_counter() - start) / n
+    assert per_call < 200e-6
+
+
+def test_compiler_handles_recursive_refs_and_constraints():
+    doc = OpenApiDocument({"components": {"schemas": {"Node": {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "name": {"type": "string", "pattern": "^[a-z]+$", "maxLength": 5},
+            "size": {"type": "integer", "minimum": 1},
+            "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+        },
+    }}}})
+    compiler = SchemaCompiler(doc)
+    fn = compiler.compile({"$ref": "#/components/schemas/Node"})
+    namespace = {"_MISSING": object()}
+    exec("import re\n" + compiler.source(), namespace)
+
+    errors = []
+    namespace[fn]({"name": "abc", "children": [{"name": "TOOLONG", "size": 0, "x": 1}]}, "n", errors)
+    assert errors == [
+        "n.children[0].name: longer than 5",
+        "n.children[0].name: does not match ^[a-z]+$",
+        "n.children[0].size: out of range (minimum 1)",
+        "n.children[0]: unexpected properties x",
+    ]
+
+
+def test_route_names_are_identifiers_and_unique(workspace):
+    spec = workspace / "docs/specs/odd-openapi.yaml"
+    spec.write_text("""\
+openapi: 3.0.3
+servers: [{url: /api}]
+paths:
+  /user-prefs:
+    get: {responses: {'200': {description: OK}}}
+  /user_prefs:
+    get: {responses: {'200': {description: OK}}}
+  /files/{id}.json:
+    get: {responses: {'200': {description: OK}}}
+""", encoding="utf-8")
+    CodeGeneratorAgent(str(spec), service_dir="odd").run({})
+
+    source = (workspace / "odd/routes.py").read_text(encoding="utf-8")
+    compile(source, "routes.py", "exec")
+    for name in ("get_user_prefs", "get_user_prefs_2", "get_files_id_json"):
+        assert f"def {name}(event, context):" in source
+    assert "handler: routes.get_user_prefs_2" in (workspace / "odd/serverless.yml").read_text(encoding="utf-8")
+
+
+def test_header_parameters_match_any_casing(workspace, monkeypatch):
+    spec = workspace / "docs/specs/keyed-openapi.yaml"
+    spec.write_text("""\
+openapi: 3.0.3
+paths:
+  /things:
+    get:
+      parameters: [{in: header, name: X-Api-Key, required: true, schema: {type: string}}]
+      responses: {'200': {description: OK}}
+""", encoding="utf-8")
+    CodeGeneratorAgent(str(spec), service_dir="keyed").run({})
+    monkeypatch.syspath_prepend(str(workspace / "keyed"))
+    for name in ("routes", "handler"):
+        sys.modules.pop(name, None)
+    routes = importlib.import_module("routes")
+    try:
+        for headers in ({"X-Api-Key": "k"}, {"x-api-key": "k"}):  # REST API v1, HTTP API v2
+            assert routes.get_things({"headers": headers}, None)["statusCode"] == 501
+        assert _errors(routes.get_things({"headers": None}, None)) == ["header.X-Api-Key: is required"]
+    finally:
+        for name in ("routes", "handler"):
+            sys.modules.pop(name, None)
+
+
+def test_array_parameters_are_split_and_coerced(workspace, monkeypatch):
+    spec = workspace / "docs/specs/listy-openapi.yaml"
+    spec.write_text("""\
+openapi: 3.0.3
+paths:
+  /things:
+    get:
+      parameters:
+        - {in: query, name: id, required: true, schema: {type: array, items: {type: integer}}}
+        - {in: query, name: tag, explode: false, schema: {type: array, items: {type: string}}}
+        - {in: header, name: X-Flags, schema: {type: array, items: {type: boolean}}}
+      responses: {'200': {description: OK}}
+""", encoding="utf-8")
+    CodeGeneratorAgent(str(spec), service_dir="listy").run({})
+    monkeypatch.syspath_prepend(str(workspace / "listy"))
+    for name in ("routes", "handler"):
+        sys.modules.pop(name, None)
+    routes = importlib.import_module("routes")
+    try:
+        ok = [
+            {"queryStringParameters": {"id": "1,2", "tag": "a,b"}, "headers": {"x-flags": "true,false"}},  # HTTP API
+            {"queryStringParameters": {"id": "2", "tag": "a,b"},  # REST API: the last repeated value...
+             "multiValueQueryStringParameters": {"id": ["1", "2"], "tag": ["a,b"]}},  # ...and all of them
+        ]
+        for event in ok:
+            assert routes.get_things(event, None)["statusCode"] == 501
+        assert _errors(routes.get_things({"queryStringParameters": {"id": "1,x"}, "headers": {"X-Flags": "maybe"}},
+                                         None)) == ["query.id[1]: expected integer", "header.X-Flags[0]: expected boolean"]
+    finally:
+        for name in ("routes", "handler"):
+            sys.modules.pop(name, None)
@@ -0,0 +1,92 @@
+import pytest
+
+from agents.supervisor.state import DynamoDbStateStore, SqliteStateStore
+from agents.supervisor.supervisor import SupervisorAgent
+
+TICKET = {"id": "TKT-RESUME", "title": "Resume demo", "description": "Alerts"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _exercise(store, clock):
+    store.put("T1", "spec", "ok", "h1", {"openapi_path": "a.yaml"}, {"status": "ok"})
+    store.put("T1", "codegen", "failed", "h2", {}, "boom")
+    store.put("T2", "spec", "ok", "h3", {}, None)
+    saved = store.get("T1")
+    assert saved["spec"]["outputs"] == {"openapi_path": "a.yaml"} and saved["codegen"]["status"] == "failed"
+
+    clock.now += 47 * 3600
+    store.put("T1", "codegen", "ok", "h2", {"service_dir": "s"}, {})  # refreshes only this record
+    clock.now += 2 * 3600
+    assert list(store.get("T1")) == ["codegen"]
+    assert store.get("T2") == {}
+
+
+def test_sqlite_store_expires_records(tmp_path):
+    clock = Clock()
+    store = SqliteStateStore(str(tmp_path / "state.db"), ttl_hours=48, clock=clock)
+    _exercise(store, clock)
+    assert store.purge_expired() == 2
+
+
+def test_dynamodb_store_filters_expired_items():
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    with moto.mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName="agentic_devops_memory",
+            KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "PK", "AttributeType": "S"},
+                                  {"AttributeName": "SK", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        clock = Clock()
+        _exercise(DynamoDbStateStore(client=client, clock=clock), clock)
+
+
+def test_failed_ticket_resumes_from_last_successful_stage(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    supervisor = SupervisorAgent(state_store=SqliteStateStore(":memory:"))
+    deploy = supervisor._deploy
+
+    def flaky_deploy(inputs, bus=None):
+        raise RuntimeError("CloudFormation said no")
+    monkeypatch.setattr(supervisor, "_deploy", flaky_deploy)
+
+    first = supervisor.handle_ticket(TICKET)
+    assert first["status"] == "failed"
+    assert {o["agent"]: o["status"] for o in first["outputs"]}["metrics_agent"] == "cancelled"
+
+    monkeypatch.setattr(supervisor, "_deploy", deploy)
+    second = supervisor.handle_ticket(TICKET)
+    resumed = {o["agent"]: o["resumed"] for o in second["outputs"]}
+    assert second["status"] == "completed"
+    assert resumed == {"spec_writer_agent": True, "code_generator_agent": True, "devops_iac_agent": True,
+                       "deployment_agent": False, "metrics_agent": False}
+    assert second["context"]["service_dir"] == "services/customer-alerts"
+
+    # Files edited on disk invalidate the stages that read them, though their paths are unchanged
+    with open(workspace / "services/customer-alerts/handler.py", "a", encoding="utf-8") as fh:
+        fh.write("\n# hand-tuned\n")
+    resumed = {o["agent"]: o["resumed"] for o in supervisor.handle_ticket(TICKET)["outputs"]}
+    assert resumed == {"spec_writer_agent": True, "code_generator_agent": True, "devops_iac_agent": True,
+                       "deployment_agent": False, "metrics_agent": False}
+    spec = workspace / "docs/specs/TKT-RESUME-openapi.yaml"
+    spec.write_text(spec.read_text(encoding="utf-8") + "x-note: edited\n", encoding="utf-8")
+    resumed = {o["agent"]: o["resumed"] for o in supervisor.handle_ticket(TICKET)["outputs"]}
+    assert resumed == {"spec_writer_agent": True, "code_generator_agent": False, "devops_iac_agent": False,
+                       "deployment_agent": False, "metrics_agent": False}
+
+    # A changed ticket invalidates everything downstream of the spec
+    third = supervisor.handle_ticket(dict(TICKET, description="Alerts v2"))
+    assert not any(o["resumed"] for o in third["outputs"])
+    # ...and resume=False forces a full re-run
+    assert not any(o["resumed"] for o in supervisor.handle_ticket(TICKET, resume=False)["outputs"])
@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.supervisor.dag import DagExecutor, Stage
+from agents.supervisor.state import SqliteStateStore
+from agents.supervisor.supervisor import SupervisorAgent
+
+TICKET = {"id": "TKT-DAG", "title": "DAG demo", "description": "Alerts"}
+
+
+def _sleeper(seconds, outputs=(), fail=False):
+    def run(inputs):
+        time.sleep(seconds)
+        if fail:
+            raise RuntimeError("boom")
+        return {key: f"{key}-value" for key in outputs}
+    return run
+
+
+def _pipeline(codegen=0.3, iac=0.3, replace=()):
+    stages = {
+        "spec": Stage("spec", _sleeper(0.05, ["openapi"]), inputs=["ticket"], outputs=["openapi"]),
+        "codegen": Stage("codegen", _sleeper(codegen, ["service"]), inputs=["openapi"], outputs=["service"]),
+        "iac": Stage("iac", _sleeper(iac, ["cdk"]), inputs=["openapi"], outputs=["cdk"]),
+        "deploy": Stage("deploy", _sleeper(0.05, ["deployment"]), inputs=["service", "cdk"], outputs=["deployment"]),
+        "metrics": Stage("metrics", _sleeper(0.01, ["metrics"]), inputs=["deployment"], outputs=["metrics"]),
+    }
+    stages.update({stage.name: stage for stage in replace})
+    return list(stages.values())
+
+
+def test_independent_stages_overlap_and_latency_tracks_critical_path():
+    out = DagExecutor(_pipeline(codegen=0.3, iac=0.25)).run({"ticket": TICKET})
+
+    assert out["status"] == "completed"
+    assert out["critical_path"] == ["spec", "codegen", "deploy", "metrics"]
+    serial = sum(run.duration for run in out["stages"].values())
+    assert out["elapsed_s"] < serial - 0.15
+    assert out["elapsed_s"] == pytest.approx(out["critical_path_s"], abs=0.1)
+    assert out["context"]["deployment"] == "deployment-value"
+
+
+def test_timeout_cancels_downstream_but_not_sibling_branch():
+    slow_iac = Stage("iac", _sleeper(2.0, ["cdk"]), inputs=["openapi"], outputs=["cdk"], timeout=0.1)
+    started = time.monotonic()
+    out = DagExecutor(_pipeline(replace=[slow_iac])).run({"ticket": TICKET})
+
+    stages = out["stages"]
+    assert out["status"] == "failed"
+    assert stages["iac"].status == "timeout"
+    assert stages["codegen"].status == "ok"
+    assert stages["deploy"].status == "cancelled" and stages["metrics"].status == "cancelled"
+    assert time.monotonic() - started < 1.0  # didn't wait for the abandoned stage
+
+
+def test_failure_cancels_dependents():
+    failing = Stage("codegen", _sleeper(0.0, fail=True), inputs=["openapi"], outputs=["service"])
+    out = DagExecutor(_pipeline(replace=[failing])).run({"ticket": TICKET})
+
+    stages = out["stages"]
+    assert stages["codegen"].status == "failed" and "boom" in stages["codegen"].error
+    assert stages["iac"].status == "ok"
+    assert stages["deploy"].error == "upstream stage codegen failed"
+
+
+def test_invalid_graphs_are_rejected():
+    a = Stage("a", _sleeper(0), inputs=["y"], outputs=["x"])
+    b = Stage("b", _sleeper(0), inputs=["x"], outputs=["y"])
+    with pytest.raises(ValueError, match="Cycle"):
+        DagExecutor([a, b])
+    with pytest.raises(ValueError, match="produced by both"):
+        DagExecutor([a, Stage("c", _sleeper(0), outputs=["x"])])
+    with pytest.raises(ValueError, match="needs"):
+        DagExecutor([Stage("d", _sleeper(0), inputs=["ticket"])]).run({})
+
+
+def test_supervisor_runs_full_pipeline(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    supervisor = SupervisorAgent()
+    out = supervisor.handle_ticket(TICKET)
+
+    assert out["status"] == "completed", out["outputs"]
+    runs = {o["agent"]: o for o in out["outputs"]}
+    assert list(runs) == ["spec_writer_agent", "code_generator_agent", "devops_iac_agent",
+                          "deployment_agent", "metrics_agent"]
+    assert runs["deployment_agent"]["result"]["package"]["size_bytes"] > 0
+    assert out["context"]["openapi_path"].endswith("TKT-DAG-openapi.yaml")
+    assert (workspace / "infra/cdk/stacks/alerts_api_stack.py").exists()
+
+    needs = {t["worker"]: t["needs"] for t in supervisor.create_subtasks(TICKET)}
+    assert needs["code_generator_agent"] == needs["devops_iac_agent"] == ["spec_writer_agent"]
+    assert needs["deployment_agent"] == ["code_generator_agent", "devops_iac_agent", "spec_writer_agent"]
+
+
+def test_tickets_for_different_services_keep_their_own_outputs(workspace, monkeypatch):
+    monkeypatch.delenv("BEDROCK_MODEL_ID", raising=False)
+    supervisor = SupervisorAgent(state_store=SqliteStateStore(":memory:"))
+    tickets = [{"id": "TKT-ORD", "title": "Orders", "description": "Orders", "service_name": "orders"},
+               {"id": "TKT-INV", "title": "Invoices", "description": "Invoices", "service_name": "invoices"}]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        outs = list(pool.map(supervisor.handle_ticket, tickets))
+
+    assert [o["status"] for o in outs] == ["completed", "completed"]
+    for out, name in zip(outs, ("orders", "invoices")):
+        assert out["context"]["cdk_dir"] == f"infra/cdk-{name}"
+        stack = (workspace / f"infra/cdk-{name}/stacks/alerts_api_stack.py").read_text(encoding="utf-8")
+        assert f"{name}.zip" in stack
+        workflow = (workspace / f".github/workflows/ci-cd-{name}.yml").read_text(encoding="utf-8")
+        assert f"working-directory: services/{name}" in workflow and f"infra/cdk-{name}/requirements.txt" in workflow
+    assert "Orders API" in (workspace / "docs/specs/TKT-ORD-openapi.yaml").read_text(encoding="utf-8")
+
+    # Neither ticket clobbered the other's manifest entries: re-running both generates nothing
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        reruns = list(pool.map(lambda t: supervisor.handle_ticket(t, resume=False), tickets))
+    for out in reruns:
+        runs = {o["agent"]: o["result"] for o in out["outputs"]}
+        assert runs["code_generator_agent"]["skipped"] and runs["devops_iac_agent"]["skipped"]
+
+
+def test_tickets_sharing_outputs_take_turns(workspace):
+    supervisor = SupervisorAgent(state_store=SqliteStateStore(":memory:"))
+    a, b = {"id": "TKT-A"}, {"id": "TKT-B"}  # both on the default service and CDK app
+    with supervisor._claim_outputs(a):
+        waiter = threading.Thread(target=lambda: supervisor._claim_outputs(b).close())
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+    waiter.join(1)
+    assert not waiter.is_alive()
+    with supervisor._claim_outputs({"id": "TKT-C", "service_name": "other"}):
+        with supervisor._claim_outputs(a):  # different service: no wait
+            pass
@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+
+from agents.common import tracing
+from agents.common.bedrock import ResilientBedrockClient
+from agents.common.emitter import ArtifactEmitter
+from agents.common.fake_bedrock import FakeBedrockClient
+from agents.common.openapi import OpenApiLoader
+from agents.supervisor.stubs import StubSupervisor
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+def _by_name(tracer, name):
+    return [r for r in tracer.records() if r["name"] == name]
+
+
+def test_disabled_tracing_is_a_shared_noop():
+    assert not tracing.enabled()
+    with tracing.span("anything", key="value") as span:
+        span.set(more=1)
+    assert span is tracing.NOOP_SPAN
+    assert tracing.current() is None
+
+
+def test_spans_nest_and_record_errors(tracer):
+    with tracing.span("outer") as outer:
+        assert tracing.current() is outer
+        with pytest.raises(ValueError):
+            with tracing.span("inner", step=1):
+                raise ValueError("bad input")
+    inner, = _by_name(tracer, "inner")
+    assert inner["parent_id"] == outer.span_id
+    assert inner["attrs"] == {"step": 1, "error": "ValueError: bad input"}
+    assert tracing.current() is None
+
+
+def test_supervisor_stage_spans_are_children_of_the_ticket(tracer):
+    supervisor = StubSupervisor(latency={name: 0.01 for name in
+                                         ("spec_writer_agent", "code_generator_agent", "devops_iac_agent",
+                                          "deployment_agent", "metrics_agent")})
+    supervisor.handle_ticket({"id": "TKT-TRACE", "title": "Tracing"})
+
+    ticket, = _by_name(tracer, "ticket")
+    assert ticket["attrs"]["status"] == "completed"
+    stages = [r for r in tracer.records() if r["name"].startswith("stage ")]
+    assert {r["attrs"]["stage"] for r in stages} == set(supervisor.registry.worker_ids())
+    assert all(r["parent_id"] == ticket["span_id"] for r in stages)
+    # codegen and IaC overlap on different pool threads
+    assert len({r["thread"] for r in stages}) > 1
+
+
+def test_invoke_model_span_carries_tokens_and_body_stays_readable(tracer):
+    client = ResilientBedrockClient(FakeBedrockClient(responder=lambda payload: "x" * 400), sleep=lambda s: None)
+    body = json.dumps({"messages": [{"role": "user", "content": "hello"}]})
+    response = client.invoke_model(modelId="test-model", body=body)
+
+    assert json.loads(response["body"].read())["output"]["message"]["content"][0]["text"] == "x" * 400
+    span, = _by_name(tracer, "bedrock.invoke_model")
+    assert span["attrs"]["model_id"] == "test-model"
+    assert span["attrs"]["output_tokens"] == 100
+    assert span["attrs"]["input_tokens"] > 0
+    assert span["attrs"]["attempts"] == 1
+
+
+def test_yaml_parse_and_artifact_write_spans(tracer, tmp_path):
+    spec = tmp_path / "openapi.yaml"
+    spec.write_text("openapi: 3.0.0\npaths: {}\n", encoding="utf-8")
+    loader = OpenApiLoader(cache_dir=None)
+    loader.load(spec)
+    loader.load(spec)  # memory hit: no second parse
+    ArtifactEmitter().emit(tmp_path / "out.txt", "hello")
+    ArtifactEmitter().emit(tmp_path / "out.txt", "hello")  # unchanged: not written
+
+    parse, = _by_name(tracer, "yaml.parse")
+    assert parse["attrs"]["bytes"] == spec.stat().st_size
+    write, = _by_name(tracer, "artifact.write")
+    assert write["attrs"] == {"path": str(tmp_path / "out.txt"), "bytes": 5}
+
+
+def test_exports(tracer, tmp_path):
+    with tracing.span("stage spec_writer_agent"):
+        with tracing.span("bedrock.invoke_model", model_id="m"):
+            time.sleep(0.001)
+
+    lines = tracer.export_jsonl(tmp_path / "trace.jsonl").read_text().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["name"] for r in records] == ["stage spec_writer_agent", "bedrock.invoke_model"]
+    assert records[1]["parent_id"] == records[0]["span_id"]
+
+    chrome = json.loads(tracer.export_chrome(tmp_path / "trace.chrome.json").read_text())
+    events = chrome["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert [e["cat"] for e in events] == ["stage", "bedrock"]
+    assert events[1]["dur"] >= 1000  # microseconds
+    assert events[1]["ts"] >= events[0]["ts"]
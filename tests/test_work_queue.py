@@ -0,0 +1,109 @@
+import threading
+import time
+
+from agents.supervisor.stubs import StubSupervisor
+from agents.supervisor.work_queue import ConcurrencyLimits, FileTicketQueue, QueueWorker, TicketQueue
+
+FAST = {"spec_writer_agent": 0.02, "code_generator_agent": 0.02, "devops_iac_agent": 0.02,
+        "deployment_agent": 0.02, "metrics_agent": 0.0}
+
+
+def _tickets(n):
+    # Each ticket names its own service, so they don't queue on shared output dirs
+    return [{"id": f"TKT-Q{i}", "title": f"Ticket {i}", "service_name": f"svc-{i}"} for i in range(n)]
+
+
+def test_queue_runs_tickets_concurrently_within_caps():
+    supervisor = StubSupervisor(latency=FAST, concurrency={"spec_writer_agent": 2, "deployment_agent": 1})
+    tickets = TicketQueue()
+    for ticket in _tickets(8):
+        tickets.put(ticket)
+
+    stats = QueueWorker(supervisor, tickets, max_in_flight=8, backpressure=100).run()
+
+    assert stats["completed"] == 8 and stats["failed"] == 0
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert stats["peak_in_flight"] > 1
+    assert stats["stages"]["spec_writer_agent"]["peak"] == 2
+    assert stats["stages"]["deployment_agent"]["peak"] == 1
+    assert all(s["active"] == 0 and s["pending"] == 0 for s in stats["stages"].values())
+    assert stats["throughput_per_s"] > 0
+
+
+def test_tickets_sharing_the_default_service_run_one_at_a_time():
+    supervisor = StubSupervisor(latency=FAST)
+    tickets = TicketQueue()
+    for ticket in _tickets(4):
+        tickets.put(dict(ticket, service_name=None))
+
+    stats = QueueWorker(supervisor, tickets, max_in_flight=4, backpressure=100).run()
+
+    assert stats["completed"] == 4
+    assert all(s["peak"] == 1 for s in stats["stages"].values())
+
+
+def _run_with_steady_arrivals(backpressure):
+    # Tickets arrive faster than the slow, single-slot deployment stage can take them
+    supervisor = StubSupervisor(latency=dict(FAST, deployment_agent=0.08), concurrency={"deployment_agent": 1})
+    tickets = TicketQueue()
+    worker = QueueWorker(supervisor, tickets, max_in_flight=20, backpressure=backpressure)
+
+    def produce():
+        for ticket in _tickets(20):
+            tickets.put(ticket)
+            time.sleep(0.01)
+    producer = threading.Thread(target=produce)
+    producer.start()
+    stats = worker.run(until_empty=False, max_tickets=20)
+    producer.join()
+    return stats
+
+
+def test_lagging_stage_stops_admission():
+    unthrottled = _run_with_steady_arrivals(backpressure=100)
+    throttled = _run_with_steady_arrivals(backpressure=1)
+
+    assert throttled["throttled_polls"] > 0
+    assert throttled["completed"] == unthrottled["completed"] == 20
+    assert throttled["peak_in_flight"] <= unthrottled["peak_in_flight"] // 2
+
+
+def test_limits_track_backlog():
+    limits = ConcurrencyLimits({"codegen": 1})
+    for _ in range(3):
+        limits.expect("codegen")
+    assert limits.try_acquire("codegen") and not limits.try_acquire("codegen")
+    assert limits.saturated(2) == "codegen"  # two tickets still headed for codegen
+    limits.forget("codegen")                 # one got cancelled upstream
+    assert limits.saturated(2) is None
+    limits.release("codegen")
+    assert limits.snapshot()["codegen"] == {"cap": 1, "active": 0, "pending": 1, "peak": 1}
+    assert limits.try_acquire("unlimited")
+
+
+def test_file_queue_claims_each_ticket_once(tmp_path):
+    spool = FileTicketQueue(str(tmp_path / "q"))
+    for ticket in _tickets(20):
+        spool.put(ticket)
+
+    claimed, lock = [], threading.Lock()
+
+    def drain():
+        other = FileTicketQueue(str(tmp_path / "q"))  # separate handle, as another process would have
+        while (item := other.get()) is not None:
+            with lock:
+                claimed.append(item[1]["id"])
+
+    threads = [threading.Thread(target=drain) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(t["id"] for t in _tickets(20))
+    assert spool.depth() == 0
+
+    # Claims left behind by a crashed worker go back to pending
+    assert spool.requeue_claimed() == 20 and spool.depth() == 20
+    handle, ticket = spool.get()
+    spool.ack(handle)
+    assert ticket["id"] == "TKT-Q0" and spool.requeue_claimed() == 0
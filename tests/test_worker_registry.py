@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from agents.supervisor.registry import REPO_ROOT, WorkerRegistry, load_config
+from agents.supervisor.supervisor import SupervisorAgent
+
+BAD_CONFIG = """\
+supervisor:
+  routing:
+    workers: [code_generator_agent, ghost_agent]
+workers:
+  - id: code_generator_agent
+    entrypoint: "agents/code-generator/agent.py"
+    class: CodeGeneratorAgent
+  - id: devops_iac_agent
+    entrypoint: "agents/devops_iac/agent.py"
+"""
+
+
+def test_repo_config_is_valid_and_parsed_once():
+    registry = WorkerRegistry()
+    assert registry.worker_ids() == ["spec_writer_agent", "code_generator_agent", "devops_iac_agent",
+                                     "deployment_agent", "metrics_agent"]
+    assert load_config() is registry.config
+    assert registry.loaded() == []
+
+
+def test_invalid_entrypoints_are_reported(tmp_path):
+    config = tmp_path / "agentcore-config.yml"
+    config.write_text(BAD_CONFIG, encoding="utf-8")
+    with pytest.raises(ValueError) as e:
+        WorkerRegistry(config)
+    message = str(e.value)
+    assert "'agents/code-generator/agent.py' is not a Python file" in message
+    assert "devops_iac_agent: no agent class given" in message
+    assert "unknown worker ghost_agent" in message
+
+
+def test_workers_are_imported_and_constructed_once(workspace):
+    registry = WorkerRegistry()
+    first = registry.get("devops_iac_agent", cdk_dir="infra/cdk")
+    assert registry.get("devops_iac_agent", cdk_dir="infra/cdk") is first
+    assert registry.get("devops_iac_agent", cdk_dir="infra/other") is not first
+    assert registry.loaded() == ["devops_iac_agent"]
+    with pytest.raises(KeyError):
+        registry.get("ghost_agent")
+
+
+def test_instance_cache_is_bounded(workspace):
+    registry = WorkerRegistry(max_instances=2)
+    metrics = registry.get("metrics_agent")
+    a = registry.get("devops_iac_agent", cdk_dir="a")
+    registry.get("devops_iac_agent", cdk_dir="b")
+    assert registry.get("devops_iac_agent", cdk_dir="a") is a  # a is now the most recent
+    registry.get("devops_iac_agent", cdk_dir="c")  # evicts b
+    assert len(registry._instances) == 2
+    assert registry.get("devops_iac_agent", cdk_dir="a") is a
+    assert registry.get("metrics_agent") is metrics  # argument-less agents are never evicted
+
+
+def test_startup_and_codegen_only_runs_skip_boto3(workspace):
+    script = textwrap.dedent(f"""\
+        import sys
+        sys.path.insert(0, {str(REPO_ROOT)!r})
+        from agents.supervisor.supervisor import SupervisorAgent
+        supervisor = SupervisorAgent()
+        supervisor.run_stage("code_generator_agent", {{
+            "ticket": {{"id": "TKT-DEMO"}}, "openapi_path": "docs/specs/TKT-DEMO-openapi.yaml"}})
+        print(supervisor.registry.loaded(), "boto3" in sys.modules)
+    """)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=workspace, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().splitlines()[-1] == "['code_generator_agent'] False"
+    assert (workspace / "services/customer-alerts/routes.py").exists()
+
+
+def test_run_stage_checks_inputs():
+    with pytest.raises(ValueError, match="openapi_path"):
+        SupervisorAgent().run_stage("code_generator_agent", {"ticket": {}})